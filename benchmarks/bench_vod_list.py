@@ -0,0 +1,114 @@
+# benchmarks/bench_vod_list.py
+
+import argparse
+import gc
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5 import QtCore  # noqa: E402
+from PyQt5.QtGui import QIcon  # noqa: E402
+from PyQt5.QtWidgets import QApplication, QListWidget, QListWidgetItem  # noqa: E402
+
+from ui.vod_list_widget import DEFAULT_THUMBNAIL, VODListWidget  # noqa: E402
+
+BATCH_SIZE = 50
+
+
+def gerar_vods(vod_count):
+    return [
+        {
+            "title": f"VOD {i} - Título de exemplo com algumas palavras",
+            "link": f"https://api.vodvod.top/m3u8/{1000 + i}/{i}/index.m3u8",
+            "thumbnail": f"https://vodvod.top/thumbs/{i}.jpg",
+        }
+        for i in range(vod_count)
+    ]
+
+
+def rss_bytes():
+    """
+    Memória residente do processo (Linux), ou None em outros sistemas.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+def popular_qlistwidget(widget, vods):
+    """
+    Lista anterior: um QListWidgetItem por VOD e o ícone padrão lido do disco a cada item.
+    """
+    widget.clear()
+    for vod in vods:
+        item = QListWidgetItem()
+        item.setText(vod["title"])
+        item.setData(QtCore.Qt.UserRole, vod["link"])
+        item.setIcon(QIcon(DEFAULT_THUMBNAIL))
+        widget.addItem(item)
+
+
+def popular_modelo(widget, vods):
+    widget.clear()
+    for start in range(0, len(vods), BATCH_SIZE):
+        widget.append_vods(vods[start : start + BATCH_SIZE])
+
+
+def medir(app, widget, populate, vods):
+    gc.collect()
+    before = rss_bytes()
+    started = time.perf_counter()
+    populate(widget, vods)
+    app.processEvents()
+    elapsed = time.perf_counter() - started
+    after = rss_bytes()
+    memory = (after - before) / 1e6 if before is not None else float("nan")
+    return elapsed, memory
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara o QListWidget anterior com a lista baseada em modelo."
+    )
+    parser.add_argument("--vods", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    for vod_count in args.vods:
+        vods = gerar_vods(vod_count)
+        for name, factory, populate in (
+            ("qlistwidget", QListWidget, popular_qlistwidget),
+            ("model", VODListWidget, popular_modelo),
+        ):
+            widget = factory()
+            widget.resize(300, 600)
+            widget.show()
+            elapsed, memory = medir(app, widget, populate, vods)
+            print(
+                f"{name:>11} | {vod_count:>6} VODs | {elapsed * 1000:9.1f} ms | "
+                f"{memory:7.1f} MB"
+            )
+            widget.close()
+            widget.deleteLater()
+            app.processEvents()
+
+        # Atualização incremental: 20 VODs novos no topo de uma lista já carregada
+        widget = VODListWidget()
+        popular_modelo(widget, vods)
+        refreshed = gerar_vods(vod_count + 20)[vod_count:] + vods
+        started = time.perf_counter()
+        widget.populate_vods(refreshed)
+        print(
+            f"{'model diff':>11} | {vod_count:>6} VODs | "
+            f"{(time.perf_counter() - started) * 1000:9.1f} ms | +20 no topo"
+        )
+        widget.deleteLater()
+
+
+if __name__ == "__main__":
+    main()
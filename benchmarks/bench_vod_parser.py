@@ -0,0 +1,62 @@
+# benchmarks/bench_vod_parser.py
+
+import argparse
+import os
+import sys
+import timeit
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.vod_parser import M3U8_LINK_PATTERN, extrair_vods  # noqa: E402
+
+
+def gerar_pagina_canal(vod_count):
+    """
+    Gera o HTML sintético de uma página de canal com `vod_count` VODs.
+    """
+    items = []
+    for i in range(vod_count):
+        items.append(
+            f'<div class="vod"><a href="https://api.vodvod.top/m3u8/{1000 + i}/{i}/index.m3u8">'
+            f'<img src="https://vodvod.top/thumbs/{i}.jpg"><span>VOD {i}</span></a>'
+            f'<a href="/channels/@streamer/{i}">detalhes</a><p>Descrição do VOD {i}</p></div>'
+        )
+    return (
+        f"<html><head><title>Canal</title></head><body>{''.join(items)}</body></html>"
+    )
+
+
+def extrair_vods_bs4(html):
+    """
+    Extrator anterior: monta a árvore com BeautifulSoup e filtra os <a> por regex.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    vods = {}
+    for link in soup.find_all("a", href=M3U8_LINK_PATTERN):
+        href = link["href"]
+        vods[href] = {
+            "title": link.get_text(strip=True) or "Sem Título",
+            "link": href,
+            "thumbnail": None,
+        }
+    return list(vods.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara os extratores de VODs.")
+    parser.add_argument("--vods", type=int, nargs="+", default=[50, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for vod_count in args.vods:
+        html = gerar_pagina_canal(vod_count)
+        assert len(extrair_vods(html)) == len(extrair_vods_bs4(html)) == vod_count
+        for name, func in (("bs4", extrair_vods_bs4), ("htmlparser", extrair_vods)):
+            best = min(timeit.repeat(lambda: func(html), number=1, repeat=args.repeat))
+            print(f"{name:>10} | {vod_count:>5} VODs | {best * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
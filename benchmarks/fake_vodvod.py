@@ -0,0 +1,201 @@
+# benchmarks/fake_vodvod.py
+
+import argparse
+import asyncio
+import hashlib
+
+from aiohttp import web
+
+# Miniatura mínima válida (PNG 1x1) servida para todas as imagens
+PNG_1X1 = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000b49444154789c6360000200000500017a5eab3f0000000049454e44ae426082"
+)
+
+
+def gerar_pagina_pesquisa(streamer_name):
+    """
+    Página de pesquisa com um único resultado apontando para o canal.
+    """
+    return (
+        "<html><head><title>Pesquisa</title></head><body>"
+        f'<div class="result"><a href="/channels/@{streamer_name}">{streamer_name}</a></div>'
+        "</body></html>"
+    )
+
+
+def gerar_pagina_canal(base_url, streamer_name, page, vod_count, per_page):
+    """
+    Uma página do canal com até `per_page` VODs e link rel="next" para a seguinte.
+    """
+    first = (page - 1) * per_page
+    last = min(first + per_page, vod_count)
+    items = []
+    for i in range(first, last):
+        items.append(
+            f'<div class="vod"><a href="{base_url}/m3u8/{1000 + i}/{i}/index.m3u8">'
+            f'<img data-src="/thumbs/{i}.png" src="data:image/gif;base64,R0lGOD">'
+            f"<span>VOD {i} de {streamer_name}</span></a>"
+            f'<a href="/channels/@{streamer_name}/{i}">detalhes</a>'
+            f"<p>Descrição do VOD {i}</p></div>"
+        )
+    next_link = ""
+    if last < vod_count:
+        next_link = f'<a rel="next" href="/channels/@{streamer_name}?page={page + 1}">Próxima</a>'
+    return (
+        f"<html><head><title>{streamer_name}</title></head><body>"
+        f"{''.join(items)}{next_link}</body></html>"
+    )
+
+
+def gerar_playlist(segment_count, target_duration=10):
+    """
+    Playlist de mídia VOD com `segment_count` segmentos relativos.
+    """
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        f"#EXT-X-TARGETDURATION:{target_duration}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+    ]
+    for i in range(segment_count):
+        lines.append(f"#EXTINF:{target_duration:.3f},")
+        lines.append(f"seg/{i}.ts")
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+
+class FakeVODVOD:
+    """
+    Servidor local que imita o vodvod.top (site e API) com conteúdo gerado.
+
+    Atende a pesquisa, as páginas paginadas do canal, as playlists, segmentos
+    .ts sintéticos e miniaturas, com latência configurável por requisição.
+    As playlists respondem com ETag, então requisições condicionais recebem 304.
+    """
+
+    def __init__(
+        self,
+        vod_count=200,
+        per_page=50,
+        segment_count=720,
+        segment_bytes=256 * 1024,
+        latency=0.0,
+        host="127.0.0.1",
+        port=0,
+    ):
+        self.vod_count = vod_count
+        self.per_page = per_page
+        self.segment_count = segment_count
+        self.segment_bytes = segment_bytes
+        self.latency = latency
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._runner = None
+        self._segment = bytes(range(256)) * (segment_bytes // 256 + 1)
+        self._segment = self._segment[:segment_bytes]
+        self._playlist = gerar_playlist(segment_count)
+        self._playlist_etag = (
+            '"' + hashlib.sha256(self._playlist.encode()).hexdigest()[:16] + '"'
+        )
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def playlist_url(self, index=0):
+        return f"{self.url}/m3u8/{1000 + index}/{index}/index.m3u8"
+
+    async def start(self):
+        app = web.Application(middlewares=[self._delay])
+        app.router.add_get("/search/{name}", self._handle_search)
+        app.router.add_get("/channels/@{name}", self._handle_channel)
+        app.router.add_get("/m3u8/{vod}/{n}/index.m3u8", self._handle_playlist)
+        app.router.add_get("/m3u8/{vod}/{n}/seg/{index}.ts", self._handle_segment)
+        app.router.add_get("/thumbs/{name}", self._handle_thumbnail)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        return self
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _delay(self, request, handler):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return await handler(request)
+
+    async def _handle_search(self, request):
+        return web.Response(
+            text=gerar_pagina_pesquisa(request.match_info["name"]),
+            content_type="text/html",
+        )
+
+    async def _handle_channel(self, request):
+        page = int(request.query.get("page", "1"))
+        html = gerar_pagina_canal(
+            self.url, request.match_info["name"], page, self.vod_count, self.per_page
+        )
+        return web.Response(text=html, content_type="text/html")
+
+    async def _handle_playlist(self, request):
+        if request.headers.get("If-None-Match") == self._playlist_etag:
+            return web.Response(status=304)
+        return web.Response(
+            text=self._playlist,
+            content_type="application/vnd.apple.mpegurl",
+            headers={"ETag": self._playlist_etag},
+        )
+
+    async def _handle_segment(self, request):
+        if int(request.match_info["index"]) >= self.segment_count:
+            raise web.HTTPNotFound()
+        return web.Response(body=self._segment, content_type="video/mp2t")
+
+    async def _handle_thumbnail(self, request):
+        return web.Response(body=PNG_1X1, content_type="image/png")
+
+
+async def serve(args):
+    server = await FakeVODVOD(
+        vod_count=args.vods,
+        per_page=args.per_page,
+        segment_count=args.segments,
+        segment_bytes=args.segment_bytes,
+        latency=args.latency,
+        port=args.port,
+    ).start()
+    print(f"Servidor em {server.url}. Para usar com o aplicativo:")
+    print(f"  VODVOD_BASE_URL={server.url} VODVOD_API_URL={server.url} python main.py")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Servidor local que imita o vodvod.top para testes e benchmarks."
+    )
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--vods", type=int, default=200)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--segments", type=int, default=720)
+    parser.add_argument("--segment-bytes", type=int, default=256 * 1024)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Segundos por requisição"
+    )
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
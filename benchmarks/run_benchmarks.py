@@ -0,0 +1,294 @@
+# benchmarks/run_benchmarks.py
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_vodvod import FakeVODVOD  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# Diferenças abaixo disso (em segundos) são tratadas como ruído na comparação
+NOISE_FLOOR = 0.001
+CASES = ("scrape", "download_m3u8", "parse_playlist", "vod_list", "search_to_list")
+
+
+def resumir(samples):
+    values = sorted(samples)
+    return {
+        "runs": len(values),
+        "min": values[0],
+        "median": statistics.median(values),
+        "p95": values[min(int(0.95 * len(values)), len(values) - 1)],
+        "max": values[-1],
+    }
+
+
+async def medir(func, repeat, warmup=1):
+    """
+    Executa `func` (corrotina) `warmup` vezes sem medir e `repeat` vezes medindo.
+
+    :return: Dicionário {métrica: [segundos, ...]}. `func` pode devolver
+        métricas extras próprias, ex. {"first_row": 0.05}.
+    """
+    for _ in range(warmup):
+        await func()
+    samples = {}
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extra = await func()
+        samples.setdefault("total", []).append(time.perf_counter() - started)
+        for name, value in (extra or {}).items():
+            samples.setdefault(name, []).append(value)
+    return samples
+
+
+async def bench_scrape(server, args):
+    from utils.scraper import Scraper
+
+    scraper = Scraper(fetch_mode="http", use_cache=False, use_index=False)
+
+    async def run():
+        vods = await scraper.realizar_scraping("streamer")
+        assert len(vods) == args.vods, len(vods)
+
+    try:
+        return await medir(run, args.repeat)
+    finally:
+        await scraper.close()
+
+
+async def bench_download_m3u8(server, args):
+    from utils.downloader import Downloader
+
+    downloader = Downloader()
+    url = server.playlist_url()
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = iter(range(args.repeat + 1))
+
+        async def cold():
+            # Diretório novo a cada execução: sempre um download completo
+            await downloader.download_m3u8(url, os.path.join(tmp, str(next(runs))))
+
+        async def revalidate():
+            # Mesma cópia local: requisição condicional respondida com 304
+            await downloader.download_m3u8(url, os.path.join(tmp, "0"))
+
+        try:
+            samples = await medir(cold, args.repeat)
+            samples["not_modified"] = (await medir(revalidate, args.repeat))["total"]
+        finally:
+            await downloader.close()
+    return samples
+
+
+async def bench_parse_playlist(server, args):
+    from fake_vodvod import gerar_playlist
+    from utils.playlist import parse_media_playlist
+    from utils.segment_index import SegmentIndex
+
+    text = gerar_playlist(args.segments)
+    base_url = server.playlist_url()
+    samples = {"parse": [], "index": []}
+
+    async def run():
+        started = time.perf_counter()
+        segments = parse_media_playlist(text, base_url)
+        parsed = time.perf_counter()
+        index = SegmentIndex.from_playlist(text, base_url)
+        samples["parse"].append(parsed - started)
+        samples["index"].append(time.perf_counter() - parsed)
+        assert len(segments) == len(index) == args.segments
+
+    result = await medir(run, args.repeat, warmup=0)
+    result.update(samples)
+    return result
+
+
+def _qt_app():
+    from PyQt5.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication(sys.argv)
+
+
+async def bench_vod_list(server, args):
+    from bench_vod_list import gerar_vods, popular_modelo
+    from ui.vod_list_widget import VODListWidget
+
+    app = _qt_app()
+    vods = gerar_vods(args.vods)
+    widget = VODListWidget()
+    widget.resize(300, 600)
+    widget.show()
+
+    async def run():
+        popular_modelo(widget, vods)
+        app.processEvents()
+
+    try:
+        return await medir(run, args.repeat)
+    finally:
+        widget.close()
+        widget.deleteLater()
+
+
+async def bench_search_to_list(server, args):
+    """
+    Fluxo completo da busca: páginas do canal via HTTP até as linhas na lista,
+    como em MainWindow.perform_scrape.
+    """
+    from ui.vod_list_widget import VODListWidget
+    from utils.scraper import Scraper
+
+    app = _qt_app()
+    scraper = Scraper(fetch_mode="http", use_cache=False, use_index=False)
+    widget = VODListWidget()
+    widget.resize(300, 600)
+    widget.show()
+
+    async def run():
+        started = time.perf_counter()
+        first_row = None
+        widget.clear()
+        async for batch in scraper.stream_vods_async("streamer"):
+            widget.append_vods(batch)
+            app.processEvents()
+            if first_row is None:
+                first_row = time.perf_counter() - started
+        assert widget.count() == args.vods, widget.count()
+        return {"first_row": first_row}
+
+    try:
+        return await medir(run, args.repeat)
+    finally:
+        await scraper.close()
+        widget.close()
+        widget.deleteLater()
+
+
+BENCHMARKS = {
+    "scrape": bench_scrape,
+    "download_m3u8": bench_download_m3u8,
+    "parse_playlist": bench_parse_playlist,
+    "vod_list": bench_vod_list,
+    "search_to_list": bench_search_to_list,
+}
+
+
+async def run_suite(args):
+    server = await FakeVODVOD(
+        vod_count=args.vods,
+        per_page=args.per_page,
+        segment_count=args.segments,
+        latency=args.latency,
+    ).start()
+    # O scraper lê os endereços do site ao ser importado
+    os.environ["VODVOD_BASE_URL"] = server.url
+    os.environ["VODVOD_API_URL"] = server.url
+    results = {}
+    try:
+        for case in args.cases:
+            samples = await BENCHMARKS[case](server, args)
+            results[case] = {name: resumir(values) for name, values in samples.items()}
+            for name, summary in results[case].items():
+                print(
+                    f"{case:>15} {name:<13} | mediana {summary['median'] * 1000:9.2f} ms"
+                    f" | p95 {summary['p95'] * 1000:9.2f} ms"
+                )
+    finally:
+        await server.close()
+    return results
+
+
+def comparar(baseline, current, tolerance):
+    """
+    Compara as medianas com a linha de base.
+
+    :return: Lista de regressões (caso, métrica, antes, depois).
+    """
+    regressions = []
+    for case, metrics in current["results"].items():
+        for name, summary in metrics.items():
+            before = baseline["results"].get(case, {}).get(name)
+            if before is None:
+                continue
+            old, new = before["median"], summary["median"]
+            change = (new - old) / old if old else 0.0
+            flag = ""
+            if new - old > NOISE_FLOOR and change > tolerance:
+                regressions.append((case, name, old, new))
+                flag = "  <-- regressão"
+            print(
+                f"{case:>15} {name:<13} | {old * 1000:9.2f} -> {new * 1000:9.2f} ms"
+                f" ({change:+.1%}){flag}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks offline contra um servidor local que imita o vodvod.top."
+    )
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--vods", type=int, default=500)
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--segments", type=int, default=2000)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Latência por requisição (s)"
+    )
+    parser.add_argument(
+        "--output",
+        default=os.path.join(RESULTS_DIR, "latest.json"),
+        help="Arquivo JSON onde os resultados são gravados",
+    )
+    parser.add_argument(
+        "--baseline",
+        help="Resultados anteriores para comparar (JSON gravado por --output)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Aumento relativo da mediana tratado como regressão",
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run_suite(args))
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            key: getattr(args, key)
+            for key in ("repeat", "vods", "per_page", "segments", "latency")
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados gravados em {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != report["params"]:
+            print("Aviso: parâmetros diferentes dos da linha de base.")
+        regressions = comparar(baseline, report, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regressões acima de {args.tolerance:.0%}.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,26 +2,26 @@
 
 import sys
 import os
+import time
 import asyncio
 
 from PyQt5.QtWidgets import QApplication
 from ui.main_window import MainWindow
 from utils.logger import setup_logger
-from utils.scraper import Scraper
+from utils.metrics import MetricsReporter
+from utils.scraper import BROWSER_STARTUP, Scraper
 
 import qasync
 
+# Instante de início da aplicação, usado para medir o tempo de inicialização
+startup_time = time.perf_counter()
+
 # Reconfigura o stdout para usar 'utf-8' (Python 3.7+)
 if hasattr(sys.stdout, "reconfigure"):
     sys.stdout.reconfigure(encoding="utf-8")
 
-# Configuração do logger com nível de log obtido da variável de ambiente
-log_level = os.getenv("LOG_LEVEL", "DEBUG").upper()
-
-# Configuração do logger para o aplicativo principal
-logger = setup_logger(
-    "MainApp", log_file=os.path.join("logs", "main_app.log"), level=log_level
-)
+# Configuração do logger para o aplicativo principal (nível em LOG_LEVEL)
+logger = setup_logger("MainApp", log_file=os.path.join("logs", "main_app.log"))
 
 
 async def main_async():
@@ -29,27 +29,35 @@ async def main_async():
     Função principal assíncrona que inicializa a aplicação VODPlayer.
     """
     logger.info("Inicializando a aplicação VODPlayer.")
-    app = QApplication(sys.argv)
-
-    # Integração do loop de eventos do asyncio com o loop do Qt
-    loop = qasync.QEventLoop(app)
-    asyncio.set_event_loop(loop)
-
+    # O qasync.run já cria a QApplication e integra o loop do asyncio ao do Qt
+    app = QApplication.instance()
     logger.debug("QApplication inicializada com sucesso.")
 
-    # Inicializar o Scraper
+    # O navegador do Scraper é lançado depois que a janela é exibida
     scraper = Scraper()
-    try:
-        await scraper.initialize()
-    except Exception as e:
-        logger.exception("Falha ao inicializar o Scraper.")
-        sys.exit(1)
+
+    def on_scraper_state(state):
+        if state == "ready":
+            logger.info(
+                f"Scraper pronto em {time.perf_counter() - startup_time:.3f} segundos após o início."
+            )
+
+    scraper.add_state_listener(on_scraper_state)
 
     # Cria a janela principal da aplicação
     window = MainWindow(scraper)  # Passar o scraper para a janela
     logger.debug("Janela principal criada com sucesso.")
     window.show()
-    logger.debug("Janela principal exibida.")
+    logger.info(
+        f"Janela exibida em {time.perf_counter() - startup_time:.3f} segundos após o início."
+    )
+
+    if BROWSER_STARTUP == "background":
+        scraper.start_background()
+
+    # Snapshots periódicos das métricas e, se METRICS_PORT for definido, /metrics
+    metrics_reporter = MetricsReporter()
+    await metrics_reporter.start()
 
     # Cria um evento para aguardar até que a aplicação seja encerrada
     app_exit_event = asyncio.Event()
@@ -65,18 +73,15 @@ async def main_async():
 
     # Após o evento ser acionado, realizar a limpeza
     logger.info("Iniciando limpeza após encerramento da aplicação.")
+    await metrics_reporter.close()
     try:
         await scraper.close()
         logger.info("Scraper fechado com sucesso.")
     except Exception as e:
         logger.exception("Erro ao fechar o Scraper.")
 
-    # Finalizar o loop de eventos
-    loop.stop()
-    logger.debug("Loop de eventos encerrado.")
-
 
-async def main():
+def main():
     """
     Função principal síncrona que inicia a aplicação.
     """
@@ -0,0 +1,86 @@
+# ui/debug_panel.py
+
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QPlainTextEdit,
+    QPushButton,
+)
+from PyQt5.QtGui import QFontDatabase
+from PyQt5 import QtCore
+from utils.logger import setup_logger
+from utils.tracing import tracer
+
+# Configuração do logger
+logger = setup_logger("DebugPanel")
+
+DEBUG_PANEL_REFRESH_MS = 1000
+
+
+class DebugPanel(QWidget):
+    """
+    Janela de depuração com os percentis de latência medidos pelo LatencyTracker.
+
+    O texto é atualizado periodicamente apenas enquanto a janela está visível.
+    """
+
+    def __init__(self, tracker, parent=None):
+        super().__init__(parent, QtCore.Qt.Window)
+        self.tracker = tracker
+        self.setWindowTitle("VODPlayer - Depuração")
+        self.resize(640, 360)
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        self.dump_button = QPushButton("Salvar medições")
+        self.trace_button = QPushButton("Exportar trace")
+
+        buttons = QHBoxLayout()
+        buttons.addStretch()
+        buttons.addWidget(self.trace_button)
+        buttons.addWidget(self.dump_button)
+        layout = QVBoxLayout()
+        layout.addWidget(self.text)
+        layout.addLayout(buttons)
+        self.setLayout(layout)
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(DEBUG_PANEL_REFRESH_MS)
+        self._timer.timeout.connect(self.refresh)
+        self.dump_button.clicked.connect(self.dump)
+        self.trace_button.clicked.connect(self.export_trace)
+
+    def refresh(self):
+        self.text.setPlainText(self.tracker.format_summary())
+
+    def dump(self):
+        try:
+            path = self.tracker.dump()
+        except OSError as e:
+            logger.error(f"Falha ao gravar as medições: {e}")
+            return
+        self.text.appendPlainText(f"\nMedições gravadas em {path}")
+
+    def export_trace(self):
+        """
+        Grava os traces recentes no formato Trace Event (Perfetto/chrome://tracing).
+        """
+        try:
+            path = tracer.export()
+        except OSError as e:
+            logger.error(f"Falha ao exportar os traces: {e}")
+            return
+        self.text.appendPlainText(
+            f"\n{len(tracer.trace_ids())} traces exportados em {path}"
+        )
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
@@ -9,23 +9,95 @@ from PyQt5.QtWidgets import (
     QMessageBox,
     QHBoxLayout,
     QLabel,
+    QCompleter,
+    QProgressBar,
+    QSlider,
+    QComboBox,
+    QShortcut,
 )
+from PyQt5.QtGui import QKeySequence
 from PyQt5 import QtCore
+from .debug_panel import DebugPanel
 from .video_player_widget import VideoPlayerWidget
+from .thumbnail_loader import ThumbnailLoader
 from .vod_list_widget import VODListWidget
-from utils.downloader import download_m3u8
+from utils.abr import choose_rendition, load_renditions
+from utils.downloader import Downloader
+from utils.hls_proxy import HLS_PROXY_ENABLED, HLSProxy
 from utils.logger import setup_logger
+from utils.performance_monitor import LatencyTracker, async_timeit
+from utils.playlist import is_master_playlist
+from utils.resilience import CircuitOpenError
+from utils.segment_index import SegmentIndex
+from utils.task_coordinator import TaskCoordinator
+from utils.tracing import current_trace_id, run_traced, tracer
+from utils.vod_downloader import VODDownload, output_path_for
+from collections import OrderedDict, namedtuple
 import os
 import asyncio
 
 # Configuração do logger
 logger = setup_logger("MainWindow")
 
+PLAYER_MAX_RETRIES = int(os.getenv("PLAYER_MAX_RETRIES", "2"))
+PLAYER_AUTOPLAY_NEXT = os.getenv("PLAYER_AUTOPLAY_NEXT", "1") == "1"
+PRELOAD_NEXT_VOD = os.getenv("PRELOAD_NEXT_VOD", "1") == "1"
+PRELOAD_MAX_VODS = 3
+# Abre o painel com os percentis de latência já no início (F12 alterna)
+DEBUG_PANEL = os.getenv("DEBUG_PANEL", "0") == "1"
+
+# VOD pronto para tocar: mídia entregue ao player e linha do tempo
+PreparedVOD = namedtuple("PreparedVOD", ["media_path", "timeline"])
+
+# Texto do botão de busca conforme o estado do navegador do scraper
+SEARCH_BUTTON_LABELS = {
+    "warming": "Buscar (iniciando navegador...)",
+    "failed": "Buscar (navegador indisponível)",
+}
+
+# Texto de status conforme o estado do player
+PLAYER_STATE_LABELS = {
+    "idle": "",
+    "opening": "Abrindo...",
+    "buffering": "Carregando...",
+    "playing": "Reproduzindo",
+    "paused": "Pausado",
+    "stopped": "Parado",
+    "ended": "Fim do VOD",
+    "error": "Erro na reprodução",
+}
+
+
+def format_time(seconds):
+    """
+    Formata segundos como H:MM:SS.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
 
 class MainWindow(QMainWindow):
     def __init__(self, scraper, parent=None):
         super().__init__(parent)
         self.scraper = scraper  # Armazenar a instância do scraper
+        self.current_streamer = None  # Streamer da busca mais recente
+        self.downloader = Downloader()  # Sessão HTTP compartilhada para os downloads
+        # Proxy local que antecipa os segmentos para o VLC
+        self.hls_proxy = HLSProxy(self.downloader) if HLS_PROXY_ENABLED else None
+        self.download_tasks = {}  # URL -> download completo do VOD em andamento
+        self.current_vod_url = None  # VOD em reprodução
+        self.current_timeline = None  # SegmentIndex do VOD em reprodução
+        self.last_position = 0.0  # Última posição informada pelo player (s)
+        self.playback_retries = 0  # Tentativas de recuperação do VOD atual
+        self.prepared_vods = OrderedDict()  # URL -> PreparedVOD pré-carregado
+        # Uma busca, uma reprodução e um pré-carregamento por vez; pedidos
+        # repetidos se juntam ao em andamento e os superados são cancelados
+        self.tasks = TaskCoordinator()
+        # Tempos de busca até a primeira linha e de clique até a reprodução
+        self.latency = LatencyTracker()
+        self.playback_attempt = None
+        self.playback_trace_id = None  # Trace da reprodução atual (utils.tracing)
         logger.info("Inicializando a MainWindow.")
         self.setWindowTitle("VODPlayer")
         self.setGeometry(
@@ -35,9 +107,28 @@ class MainWindow(QMainWindow):
         # Widgets
         self.search_field = QLineEdit()
         self.search_field.setPlaceholderText("Digite o nome do streamer")
+        # Autocompletar com os streamers do índice local (filtrado pelo próprio índice)
+        self.completer_model = QtCore.QStringListModel()
+        self.completer = QCompleter(self.completer_model, self)
+        self.completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self.search_field.setCompleter(self.completer)
         self.search_button = QPushButton("Buscar")
-        self.vod_list = VODListWidget()
+        # Miniaturas baixadas sob demanda para as linhas visíveis da lista
+        self.thumbnail_loader = ThumbnailLoader(self.downloader, parent=self)
+        self.vod_list = VODListWidget(thumbnail_loader=self.thumbnail_loader)
+        self.download_button = QPushButton("Baixar VOD")
+        self.download_progress = QProgressBar()
+        self.download_progress.setVisible(False)
+        self.download_status = QLabel()
         self.video_player = VideoPlayerWidget()
+        self.seek_slider = QSlider(QtCore.Qt.Horizontal)
+        self.seek_slider.setEnabled(False)
+        self.time_label = QLabel(format_time(0))
+        self.quality_box = QComboBox()
+        self.quality_box.addItem("Automática")
+        self.quality_box.setEnabled(False)
+        self.player_status = QLabel()
+        self.debug_panel = DebugPanel(self.latency, self)
 
         # Layouts
         main_layout = QHBoxLayout()
@@ -48,11 +139,21 @@ class MainWindow(QMainWindow):
         left_layout.addWidget(self.search_button)
         left_layout.addWidget(QLabel("Lista de VODs:"))
         left_layout.addWidget(self.vod_list)
+        left_layout.addWidget(self.download_button)
+        left_layout.addWidget(self.download_progress)
+        left_layout.addWidget(self.download_status)
 
         # Área de player de vídeo
         right_layout = QVBoxLayout()
         right_layout.addWidget(QLabel("Player de Vídeo:"))
         right_layout.addWidget(self.video_player)
+        seek_layout = QHBoxLayout()
+        seek_layout.addWidget(self.seek_slider)
+        seek_layout.addWidget(self.time_label)
+        seek_layout.addWidget(QLabel("Qualidade:"))
+        seek_layout.addWidget(self.quality_box)
+        right_layout.addLayout(seek_layout)
+        right_layout.addWidget(self.player_status)
 
         main_layout.addLayout(left_layout, 30)  # 30% da largura
         main_layout.addLayout(right_layout, 70)  # 70% da largura
@@ -63,9 +164,42 @@ class MainWindow(QMainWindow):
 
         # Signals
         self.search_button.clicked.connect(self.handle_search)
-        self.vod_list.itemClicked.connect(self.handle_vod_selection)
+        self.search_field.textEdited.connect(self.update_completions)
+        self.vod_list.clicked.connect(self.handle_vod_selection)
+        self.download_button.clicked.connect(self.handle_download)
+        self.seek_slider.sliderMoved.connect(self.handle_seek_preview)
+        self.seek_slider.sliderReleased.connect(self.handle_seek)
+        self.video_player.position_changed.connect(self.update_seek_position)
+        self.video_player.state_changed.connect(self.handle_player_state)
+        self.video_player.playback_error.connect(self.handle_playback_error)
+        self.video_player.playback_ended.connect(self.handle_playback_ended)
+        self.quality_box.currentIndexChanged.connect(self.handle_quality_change)
+        QShortcut(QKeySequence("F12"), self, self.toggle_debug_panel)
+        self.scraper.add_state_listener(self.handle_scraper_state)
+        self.handle_scraper_state(self.scraper.state)
+        if DEBUG_PANEL:
+            self.debug_panel.show()
         logger.info("MainWindow inicializada com sucesso.")
 
+    def handle_scraper_state(self, state):
+        """
+        Atualiza o botão de busca conforme o estado do navegador do scraper.
+        """
+        self.search_button.setText(SEARCH_BUTTON_LABELS.get(state, "Buscar"))
+
+    def toggle_debug_panel(self):
+        self.debug_panel.setVisible(not self.debug_panel.isVisible())
+
+    def update_completions(self, text):
+        """
+        Atualiza as sugestões de streamers a partir do prefixo digitado.
+        """
+        if self.scraper.streamer_index is None:
+            return
+        self.completer_model.setStringList(self.scraper.streamer_index.complete(text))
+        if self.completer_model.rowCount():
+            self.completer.complete()
+
     def handle_search(self):
         streamer_name = self.search_field.text().strip()
         logger.debug(f"Usuário iniciou a busca pelo streamer: '{streamer_name}'")
@@ -78,57 +212,416 @@ class MainWindow(QMainWindow):
             )
             return
 
-        # Executa o scraping de forma assíncrona
-        asyncio.create_task(self.perform_scrape(streamer_name))
+        # Executa o scraping de forma assíncrona; a busca anterior é cancelada
+        self.tasks.submit(
+            "search", streamer_name.lower(), lambda: self._start_search(streamer_name)
+        )
+
+    async def _start_search(self, streamer_name):
+        attempt = self.latency.start("search", streamer_name)
+        await run_traced(
+            "search",
+            self.perform_scrape(streamer_name, attempt),
+            streamer=streamer_name,
+        )
 
-    async def perform_scrape(self, streamer_name):
+    async def perform_scrape(self, streamer_name, attempt=None):
+        """
+        :param attempt: LatencyAttempt marcado na primeira linha e ao concluir.
+        """
+        self.current_streamer = streamer_name
         try:
-            vods = await self.scraper.scrape_vods_async(
-                streamer_name
-            )  # Usar o scraper passado
+            # Os VODs são acrescentados à lista em lotes, à medida que chegam
+            self.vod_list.clear()
+            vod_count = 0
+            async for batch in self.scraper.stream_vods_async(
+                streamer_name, on_update=self.handle_vods_refreshed
+            ):  # Usar o scraper passado
+                self.vod_list.append_vods(batch)
+                vod_count += len(batch)
+                if attempt is not None and batch:
+                    attempt.mark("first_row")
             logger.info(
-                f"Encontrados {len(vods)} VODs para o streamer '{streamer_name}'."
+                f"Encontrados {vod_count} VODs para o streamer '{streamer_name}'."
             )
-            if vods:
-                self.vod_list.populate_vods(vods)
-            else:
+            if attempt is not None:
+                attempt.mark("complete")
+                self.latency.finish(attempt, "ok" if vod_count else "empty")
+            if not vod_count:
                 logger.info(f"Nenhum VOD encontrado para o streamer '{streamer_name}'.")
                 QMessageBox.information(
                     self,
                     "Resultados da Busca",
                     "Nenhum VOD encontrado para o streamer informado.",
                 )
+        except asyncio.CancelledError:
+            logger.debug(
+                "Busca por '%s' cancelada por uma mais recente.", streamer_name
+            )
+            self.latency.finish(attempt, "cancelled")
+            raise
+        except CircuitOpenError as e:
+            # O site falhou seguidamente; não adianta insistir por enquanto
+            self.latency.finish(attempt, "error")
+            QMessageBox.warning(
+                self,
+                "Site indisponível",
+                f"Não foi possível contatar o site: {e}",
+            )
         except Exception:
             logger.exception(f"Erro ao buscar VODs para o streamer '{streamer_name}'.")
+            self.latency.finish(attempt, "error")
             QMessageBox.critical(
                 self,
                 "Erro",
                 "Ocorreu um erro ao buscar os VODs. Verifique os logs para mais detalhes.",
             )
 
-    def handle_vod_selection(self, item):
-        vod_url = item.data(QtCore.Qt.UserRole)
+    def handle_vods_refreshed(self, streamer_name, vods):
+        """
+        Atualiza a lista quando a revalidação do cache traz VODs novos.
+        """
+        if streamer_name != self.current_streamer:
+            logger.debug(
+                f"Atualização de '{streamer_name}' ignorada; a busca atual é outra."
+            )
+            return
+        logger.info(f"Lista de VODs de '{streamer_name}' atualizada pelo cache.")
+        self.vod_list.populate_vods(vods)
+
+    def handle_vod_selection(self, index):
+        vod_url = index.data(QtCore.Qt.UserRole)
         logger.debug(f"Usuário selecionou o VOD com URL: {vod_url}")
         if vod_url:
-            # Executa o download do VOD de forma assíncrona
-            asyncio.create_task(self.download_and_play_vod(vod_url))
+            # Executa o download do VOD de forma assíncrona; um clique no
+            # mesmo VOD ainda carregando é ignorado, outro VOD cancela o anterior
+            self.tasks.submit("play", vod_url, lambda: self._start_playback(vod_url))
+
+    async def _start_playback(self, vod_url):
+        self.playback_retries = 0
+        attempt = self.latency.start("playback", vod_url)
+        await run_traced(
+            "play", self.download_and_play_vod(vod_url, attempt=attempt), vod=vod_url
+        )
 
-    async def download_and_play_vod(self, vod_url):
+    async def download_and_play_vod(self, vod_url, start_time=None, attempt=None):
+        """
+        :param start_time: Posição inicial em segundos (retomada após erro).
+        :param attempt: LatencyAttempt marcado a cada fase até o VLC tocar.
+        """
         try:
-            cache_dir = os.path.join(os.getcwd(), "data", "cache", "m3u8_files")
-            os.makedirs(cache_dir, exist_ok=True)
-            m3u8_path = await download_m3u8(vod_url, cache_dir)
-            logger.info(f"Arquivo .m3u8 baixado em: {m3u8_path}")
-            self.video_player.play(m3u8_path)
-            logger.info(f"Reprodução iniciada para o VOD: {m3u8_path}")
+            preload = self.tasks.get("preload", vod_url)
+            if preload is not None:
+                # O VOD já está sendo preparado em segundo plano; aproveita o
+                # resultado (wait não cancela o pré-carregamento nem propaga o dele)
+                await asyncio.wait([preload])
+            prepared = self.prepared_vods.pop(vod_url, None)
+            if prepared is not None and (
+                self.hls_proxy is None or self.hls_proxy.is_registered(vod_url)
+            ):
+                logger.info(f"Usando o VOD pré-carregado: {vod_url}")
+                if self.hls_proxy is not None:
+                    self.hls_proxy.activate(vod_url)
+                if attempt is not None:
+                    attempt.mark("preloaded")
+            else:
+                prepared = await self.prepare_vod(vod_url, attempt=attempt)
+            # As fases seguintes vêm dos estados do player (handle_player_state)
+            self.playback_attempt = attempt
+            self.playback_trace_id = current_trace_id()
+            with tracer.span("VideoPlayerWidget.play"):
+                self.video_player.play(prepared.media_path, start_time)
+            if attempt is not None:
+                attempt.mark("play_call")
+            self.set_timeline(vod_url, prepared.timeline)
+            self.set_quality_options(vod_url)
+            logger.info(f"Reprodução iniciada para o VOD: {prepared.media_path}")
+        except asyncio.CancelledError:
+            logger.debug(
+                "Reprodução de '%s' cancelada por outra mais recente.", vod_url
+            )
+            self.latency.finish(attempt, "cancelled")
+            raise
         except Exception:
             logger.exception(f"Erro ao reproduzir o VOD com URL: {vod_url}")
+            self.latency.finish(attempt, "error")
             QMessageBox.critical(
                 self,
                 "Erro",
                 "Ocorreu um erro ao reproduzir o VOD. Verifique os logs para mais detalhes.",
             )
 
+    @async_timeit
+    async def prepare_vod(self, vod_url, activate=True, attempt=None):
+        """
+        Baixa e interpreta a playlist do VOD e a registra no proxy.
+
+        :param activate: Se False, só pré-carrega (ver HLSProxy.register).
+        :param attempt: LatencyAttempt da reprodução, se houver.
+        :return: PreparedVOD com a mídia para o player e a linha do tempo.
+        """
+        cache_dir = os.path.join(os.getcwd(), "data", "cache", "m3u8_files")
+        os.makedirs(cache_dir, exist_ok=True)
+        m3u8_path = await self.downloader.download_m3u8(vod_url, cache_dir)
+        logger.info(f"Arquivo .m3u8 baixado em: {m3u8_path}")
+        with open(m3u8_path, encoding="utf-8") as f:
+            playlist_text = f.read()
+        if attempt is not None:
+            attempt.mark("playlist")
+        renditions = None
+        if is_master_playlist(playlist_text):
+            # O proxy só alterna entre variantes alinhadas com a de maior banda;
+            # a linha do tempo dela vale para a variante que estiver tocando
+            renditions = await load_renditions(
+                self.downloader, vod_url, playlist_text, cache_dir
+            )
+            timeline = renditions[-1].timeline if renditions else SegmentIndex.empty()
+        else:
+            timeline = await asyncio.to_thread(
+                SegmentIndex.load_or_build, m3u8_path, vod_url
+            )
+        if attempt is not None:
+            attempt.mark("timeline")
+        media_path = m3u8_path
+        if self.hls_proxy is not None:
+            media_path = await self.proxy_playlist(
+                vod_url, playlist_text, timeline, renditions, activate
+            )
+            if attempt is not None:
+                attempt.mark("proxy")
+        elif renditions:
+            # Sem o proxy não há troca durante a reprodução; escolhe só no início
+            bandwidth = self.downloader.throughput.bandwidth
+            media_path = renditions[choose_rendition(renditions, bandwidth)].variant.uri
+        return PreparedVOD(media_path, timeline)
+
+    def preload_next_vod(self):
+        """
+        Prepara em segundo plano o VOD seguinte ao atual na lista.
+        """
+        current = self.vod_list.currentIndex()
+        next_index = self.vod_list.model().index(current.row() + 1, 0)
+        if not current.isValid() or not next_index.isValid():
+            return
+        vod_url = next_index.data(QtCore.Qt.UserRole)
+        if vod_url in self.prepared_vods or vod_url == self.current_vod_url:
+            return
+        self.tasks.submit("preload", vod_url, lambda: self.preload_vod(vod_url))
+
+    async def preload_vod(self, vod_url):
+        try:
+            prepared = await run_traced(
+                "preload", self.prepare_vod(vod_url, activate=False), vod=vod_url
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Falha ao pré-carregar o VOD '{vod_url}': {e}")
+            return
+        self.prepared_vods[vod_url] = prepared
+        while len(self.prepared_vods) > PRELOAD_MAX_VODS:
+            self.prepared_vods.popitem(last=False)
+        self.video_player.preload(prepared.media_path)
+        logger.info(f"Próximo VOD pré-carregado: {vod_url}")
+
+    def handle_download(self):
+        vod = self.vod_list.selected_vod()
+        if vod is None:
+            QMessageBox.warning(self, "Aviso", "Selecione um VOD para baixar.")
+            return
+        vod_url = vod["link"]
+        if vod_url in self.download_tasks:
+            # Dois downloads do mesmo VOD disputariam o mesmo `.part`
+            logger.info(f"Download de '{vod['title']}' já em andamento.")
+            return
+        task = asyncio.create_task(self.perform_vod_download(vod_url, vod["title"]))
+        self.download_tasks[vod_url] = task
+        task.add_done_callback(lambda _: self.download_tasks.pop(vod_url, None))
+
+    async def perform_vod_download(self, vod_url, title):
+        """
+        Baixa o VOD inteiro para um arquivo local, mostrando progresso e vazão.
+        """
+        output_path = output_path_for(title, vod_url)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        logger.info(f"Iniciando download completo do VOD '{title}' em {output_path}")
+        self.download_progress.setValue(0)
+        self.download_progress.setVisible(True)
+        self.download_status.setText(f"Baixando '{title}'...")
+
+        def show_progress(done, total, downloaded_bytes, throughput):
+            self.download_progress.setMaximum(total)
+            self.download_progress.setValue(done)
+            self.download_status.setText(
+                f"{done}/{total} segmentos - "
+                f"{downloaded_bytes / 1_000_000:.1f} MB a {throughput / 1_000_000:.1f} MB/s"
+            )
+
+        download = VODDownload(
+            self.downloader, vod_url, output_path, on_progress=show_progress
+        )
+        try:
+            await download.run()
+            self.download_status.setText(f"VOD salvo em {output_path}")
+        except asyncio.CancelledError:
+            logger.info(f"Download do VOD '{title}' interrompido; pode ser retomado.")
+            raise
+        except Exception:
+            logger.exception(f"Erro ao baixar o VOD com URL: {vod_url}")
+            self.download_status.setText(
+                "Download interrompido. Clique em 'Baixar VOD' para retomar."
+            )
+            QMessageBox.critical(
+                self,
+                "Erro",
+                "Ocorreu um erro ao baixar o VOD. Verifique os logs para mais detalhes.",
+            )
+        finally:
+            self.download_progress.setVisible(False)
+
+    async def proxy_playlist(
+        self, vod_url, playlist_text, timeline=None, renditions=None, activate=True
+    ):
+        """
+        Registra a playlist baixada no proxy HLS e retorna a URL local.
+        """
+        await self.hls_proxy.start()
+        return self.hls_proxy.register(
+            vod_url, playlist_text, timeline, renditions, activate
+        )
+
+    def set_quality_options(self, vod_url):
+        """
+        Preenche o seletor de qualidade com as variantes do VOD em reprodução.
+        """
+        variants = self.hls_proxy.renditions(vod_url) if self.hls_proxy else []
+        self.quality_box.blockSignals(True)
+        self.quality_box.clear()
+        self.quality_box.addItem("Automática")
+        for variant in variants:
+            self.quality_box.addItem(
+                f"{variant.resolution or '?'} ({variant.bandwidth / 1e6:.1f} Mbit/s)"
+            )
+        self.quality_box.blockSignals(False)
+        self.quality_box.setEnabled(len(variants) > 1)
+
+    def handle_quality_change(self, index):
+        """
+        Fixa a variante escolhida ou volta à escolha automática pela banda medida.
+        """
+        if self.hls_proxy is None or self.current_vod_url is None:
+            return
+        self.hls_proxy.set_quality(
+            self.current_vod_url, index - 1 if index > 0 else None
+        )
+
+    def set_timeline(self, vod_url, timeline):
+        """
+        Configura a barra de busca para a linha do tempo do VOD em reprodução.
+        """
+        self.current_vod_url = vod_url
+        self.current_timeline = timeline
+        # Vazia só quando não há segmentos conhecidos (ex.: master playlist sem
+        # variantes legíveis, entregue direto ao VLC); aí não há onde saltar
+        seekable = len(timeline) > 0
+        self.seek_slider.setEnabled(seekable)
+        self.seek_slider.setRange(0, int(timeline.duration))
+        self.seek_slider.setValue(0)
+        self.time_label.setText(format_time(0))
+
+    def update_seek_position(self, position):
+        """
+        Acompanha a posição da reprodução enquanto o usuário não arrasta a barra.
+        """
+        self.last_position = position
+        if self.seek_slider.isSliderDown():
+            return
+        self.seek_slider.setValue(int(position))
+        self.time_label.setText(format_time(position))
+
+    def handle_player_state(self, state):
+        self.player_status.setText(PLAYER_STATE_LABELS.get(state, state))
+        tracer.instant(f"player.{state}", self.playback_trace_id)
+        attempt = self.playback_attempt
+        if attempt is not None and state in ("opening", "buffering", "playing"):
+            attempt.mark(state)
+        if state == "playing":
+            self.latency.finish(attempt)
+            self.playback_attempt = None
+            self.playback_retries = 0
+            if PRELOAD_NEXT_VOD:
+                self.preload_next_vod()
+
+    def handle_playback_error(self, media_path):
+        """
+        Tenta retomar o VOD da última posição antes de desistir.
+        """
+        self.latency.finish(self.playback_attempt, "error")
+        self.playback_attempt = None
+        if self.current_vod_url is None:
+            return
+        if self.playback_retries < PLAYER_MAX_RETRIES:
+            self.playback_retries += 1
+            logger.warning(
+                f"Falha na reprodução; tentativa {self.playback_retries} de "
+                f"{PLAYER_MAX_RETRIES} a partir de {format_time(self.last_position)}."
+            )
+            vod_url = self.current_vod_url
+            self.tasks.submit(
+                "play",
+                (vod_url, "recovery"),
+                lambda: self._start_recovery(vod_url, self.last_position),
+            )
+            return
+        logger.error(f"Reprodução de '{self.current_vod_url}' falhou; desistindo.")
+        QMessageBox.critical(
+            self,
+            "Erro",
+            "Não foi possível reproduzir o VOD. Verifique os logs para mais detalhes.",
+        )
+
+    async def _start_recovery(self, vod_url, start_time):
+        attempt = self.latency.start("recovery", vod_url)
+        await run_traced(
+            "recovery",
+            self.download_and_play_vod(vod_url, start_time, attempt),
+            vod=vod_url,
+        )
+
+    def handle_playback_ended(self, media_path):
+        """
+        Ao fim de um VOD, passa para o próximo da lista.
+        """
+        if not PLAYER_AUTOPLAY_NEXT:
+            return
+        current = self.vod_list.currentIndex()
+        next_index = self.vod_list.model().index(current.row() + 1, 0)
+        if current.isValid() and next_index.isValid():
+            logger.info("VOD encerrado; iniciando o próximo da lista.")
+            self.vod_list.setCurrentIndex(next_index)
+            self.handle_vod_selection(next_index)
+
+    def handle_seek_preview(self, value):
+        self.time_label.setText(format_time(value))
+
+    def handle_seek(self):
+        """
+        Salta para a posição escolhida na barra.
+
+        O segmento de destino é localizado por busca binária no índice e o
+        proxy começa a baixá-lo antes de o VLC pedi-lo.
+        """
+        if self.current_timeline is None:
+            return
+        seconds = self.seek_slider.value()
+        if self.hls_proxy is not None:
+            self.hls_proxy.seek(self.current_vod_url, seconds)
+        self.video_player.seek(seconds)
+        logger.info(
+            f"Salto para {format_time(seconds)} "
+            f"(segmento {self.current_timeline.segment_at(seconds)})."
+        )
+
     def closeEvent(self, event):
         """
         Método sobrescrito para gerenciar o encerramento da aplicação.
@@ -150,6 +643,18 @@ class MainWindow(QMainWindow):
         """
         logger.info("Iniciando tarefas de limpeza.")
         try:
+            for task in list(self.download_tasks.values()):
+                task.cancel()
+            await asyncio.gather(*self.download_tasks.values(), return_exceptions=True)
+            await self.tasks.cancel_all()
+            self.thumbnail_loader.close()
+            if self.latency.recent:
+                await asyncio.to_thread(self.latency.dump)
+            if tracer.spans:
+                await asyncio.to_thread(tracer.export)
+            if self.hls_proxy is not None:
+                await self.hls_proxy.close()
+            await self.downloader.close()
             await self.scraper.close()
             logger.info("Tarefas de limpeza concluídas.")
         except Exception as e:
@@ -0,0 +1,179 @@
+# ui/thumbnail_loader.py
+
+from PyQt5.QtCore import QObject, QBuffer, QByteArray, QIODevice, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5 import QtCore
+from utils.logger import setup_logger
+from utils.thumbnail_cache import ThumbnailCache
+from collections import OrderedDict
+import asyncio
+import os
+import time
+
+# Configuração do logger
+logger = setup_logger("ThumbnailLoader")
+
+THUMBNAIL_SIZE = QtCore.QSize(100, 56)
+THUMBNAIL_CONCURRENCY = int(os.getenv("THUMBNAIL_CONCURRENCY", "4"))
+THUMBNAIL_MEMORY_BYTES = int(os.getenv("THUMBNAIL_MEMORY_BYTES", str(16 * 1024 * 1024)))
+# Segundos até uma miniatura que falhou poder ser pedida de novo
+THUMBNAIL_RETRY_AFTER = float(os.getenv("THUMBNAIL_RETRY_AFTER", "60"))
+
+
+def _decode_and_scale(data):
+    """
+    Decodifica a imagem e a reduz para o tamanho do ícone (executado em thread).
+
+    :return: Tupla (QImage redimensionada, bytes PNG para o cache em disco) ou None.
+    """
+    image = QImage.fromData(data)
+    if image.isNull():
+        return None
+    if image.width() > THUMBNAIL_SIZE.width() or (
+        image.height() > THUMBNAIL_SIZE.height()
+    ):
+        image = image.scaled(
+            THUMBNAIL_SIZE, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation
+        )
+    png = QByteArray()
+    buffer = QBuffer(png)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    return image, bytes(png)
+
+
+class ThumbnailLoader(QObject):
+    """
+    Carrega miniaturas de forma assíncrona para a lista de VODs.
+
+    As imagens são baixadas com concorrência limitada, reduzidas uma única
+    vez para o tamanho do ícone e guardadas em um LRU de QPixmap limitado em
+    bytes, com um ThumbnailCache em disco por trás. Só as URLs marcadas
+    como desejadas (linhas visíveis ou próximas) são baixadas; pedidos que
+    saem da área visível antes de começar são descartados.
+    """
+
+    thumbnail_ready = pyqtSignal(str, QPixmap)
+
+    def __init__(
+        self,
+        downloader,
+        disk_cache=None,
+        concurrency=THUMBNAIL_CONCURRENCY,
+        memory_bytes=THUMBNAIL_MEMORY_BYTES,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.downloader = downloader
+        self.disk_cache = disk_cache if disk_cache is not None else ThumbnailCache()
+        self.memory_bytes = memory_bytes
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._memory = OrderedDict()  # URL -> QPixmap
+        self._memory_size = 0
+        self._wanted = set()
+        self._pending = {}  # URL -> Task
+        self._failed = {}  # URL -> instante da última falha (time.monotonic)
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "downloads": 0, "skipped": 0}
+
+    def cached(self, url):
+        """
+        :return: QPixmap já carregado para a URL, ou None.
+        """
+        pixmap = self._memory.get(url)
+        if pixmap is not None:
+            self._memory.move_to_end(url)
+            self.stats["memory_hits"] += 1
+        return pixmap
+
+    def request(self, urls):
+        """
+        Define as miniaturas desejadas agora e agenda as que faltam.
+
+        :param urls: URLs das linhas visíveis ou próximas da área visível.
+        """
+        self._wanted = set(urls)
+        for url in self._wanted:
+            if (
+                url in self._memory
+                or url in self._pending
+                or self._recently_failed(url)
+            ):
+                continue
+            task = asyncio.create_task(self._load(url))
+            self._pending[url] = task
+            task.add_done_callback(lambda _, url=url: self._pending.pop(url, None))
+
+    def _recently_failed(self, url):
+        """
+        Indica se a URL falhou há menos de THUMBNAIL_RETRY_AFTER segundos;
+        falhas mais antigas são esquecidas e a miniatura volta a ser pedida.
+        """
+        failed_at = self._failed.get(url)
+        if failed_at is None:
+            return False
+        if time.monotonic() - failed_at < THUMBNAIL_RETRY_AFTER:
+            return True
+        del self._failed[url]
+        return False
+
+    async def _load(self, url):
+        async with self._semaphore:
+            if url not in self._wanted:
+                # A linha saiu da área visível enquanto o pedido esperava
+                self.stats["skipped"] += 1
+                return
+            try:
+                result = await self._fetch_scaled(url)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug("Falha ao carregar a miniatura '%s': %s", url, e)
+                self._failed[url] = time.monotonic()
+                return
+        if result is None:
+            self._failed[url] = time.monotonic()
+            return
+        pixmap = QPixmap.fromImage(result)
+        self._remember(url, pixmap)
+        self.thumbnail_ready.emit(url, pixmap)
+
+    async def _fetch_scaled(self, url):
+        """
+        :return: QImage já no tamanho do ícone, ou None se a imagem for inválida.
+        """
+        data = await asyncio.to_thread(self.disk_cache.get, url)
+        if data is not None:
+            self.stats["disk_hits"] += 1
+            image = await asyncio.to_thread(QImage.fromData, data)
+            return None if image.isNull() else image
+
+        if "://" in url:
+            data = await self.downloader.fetch_bytes(url)
+        else:
+            # Miniaturas locais (caminhos de arquivo)
+            data = await asyncio.to_thread(_read_file, url)
+        self.stats["downloads"] += 1
+        decoded = await asyncio.to_thread(_decode_and_scale, data)
+        if decoded is None:
+            return None
+        image, png = decoded
+        await asyncio.to_thread(self.disk_cache.put, url, png)
+        return image
+
+    def _remember(self, url, pixmap):
+        size = pixmap.width() * pixmap.height() * 4
+        self._memory[url] = pixmap
+        self._memory_size += size
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            _, old = self._memory.popitem(last=False)
+            self._memory_size -= old.width() * old.height() * 4
+
+    def close(self):
+        for task in list(self._pending.values()):
+            task.cancel()
+        logger.debug(f"Carregador de miniaturas encerrado. Estatísticas: {self.stats}")
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
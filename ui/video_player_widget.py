@@ -1,32 +1,112 @@
 # ui/video_player_widget.py
 
-from PyQt5.QtWidgets import QWidget
+from PyQt5.QtWidgets import QStackedLayout, QWidget
 from PyQt5 import QtCore
 import vlc
 from utils.logger import setup_logger
+import asyncio
+import shlex
 import sys
 import os
-import asyncio
 
 # Configuração do logger
 logger = setup_logger("VideoPlayerWidget")
 
+# Estado do player a partir de cada evento do VLC (None = tratado à parte)
+VLC_EVENT_STATES = {
+    vlc.EventType.MediaPlayerOpening: "opening",
+    vlc.EventType.MediaPlayerBuffering: None,
+    vlc.EventType.MediaPlayerPlaying: "playing",
+    vlc.EventType.MediaPlayerPaused: "paused",
+    vlc.EventType.MediaPlayerStopped: "stopped",
+    vlc.EventType.MediaPlayerEndReached: "ended",
+    vlc.EventType.MediaPlayerEncounteredError: "error",
+    vlc.EventType.MediaPlayerTimeChanged: None,
+}
+# Estados finais: só um novo play() sai deles
+FINAL_STATES = ("stopped", "ended", "error")
+
+# Opções da instância do VLC, ajustadas para começar a tocar o quanto antes;
+# o proxy HLS é local, então o cache de rede pode ser pequeno
+VLC_NETWORK_CACHING_MS = int(os.getenv("VLC_NETWORK_CACHING_MS", "500"))
+VLC_OPTIONS = [
+    f"--network-caching={VLC_NETWORK_CACHING_MS}",
+    "--file-caching=300",
+    "--no-video-title-show",
+    "--no-snapshot-preview",
+] + shlex.split(os.getenv("VLC_EXTRA_OPTIONS", ""))
+# Segundo media player que recebe a próxima mídia e assume na troca
+PLAYER_PREWARM = os.getenv("PLAYER_PREWARM", "0") == "1"
+PRELOAD_PARSE_TIMEOUT_MS = 5000
+
 
 class VideoPlayerWidget(QWidget):
+    """
+    Player VLC embutido cujo estado é dirigido pelos eventos do próprio VLC.
+
+    Os callbacks do VLC rodam na thread dele; cada evento é repassado por um
+    sinal com conexão enfileirada e processado na thread da interface, que
+    expõe as transições como sinais Qt. Eventos de uma mídia anterior são
+    descartados pelo número da geração de reprodução.
+
+    preload() prepara a próxima mídia (playlist já lida pelo VLC). Com
+    PLAYER_PREWARM=1, um segundo media player abre essa mídia pausada no
+    início, em uma superfície oculta, e na troca é exibido e retomado,
+    enquanto o anterior é parado em segundo plano.
+    """
+
+    # Novo estado: idle, opening, buffering, playing, paused, stopped, ended ou error
+    state_changed = QtCore.pyqtSignal(str)
+    buffering_progress = QtCore.pyqtSignal(float)  # Percentual do cache de rede
+    position_changed = QtCore.pyqtSignal(float)  # Posição em segundos
+    playback_error = QtCore.pyqtSignal(str)  # Mídia que falhou
+    playback_ended = QtCore.pyqtSignal(str)  # Mídia que chegou ao fim
+    # (geração, tipo do evento, valor) vindo da thread do VLC
+    _vlc_event = QtCore.pyqtSignal(int, int, float)
+
     def __init__(self):
         super().__init__()
         logger.info("Inicializando VideoPlayerWidget.")
-        self.instance = vlc.Instance()
-        self.player = self.instance.media_player_new()
+        logger.debug(f"Opções do VLC: {VLC_OPTIONS}")
+        self.instance = vlc.Instance(VLC_OPTIONS)
+        self.state = "idle"
+        self.media_path = None
+        self._generation = 0
+        self._preloaded = None  # (caminho, Media) da próxima mídia provável
+        self._prewarm_task = None  # Abertura da mídia no player reserva
+        self._stop_tasks = set()
+        self._surfaces = {}  # player -> widget onde ele desenha
+
+        # Eventos do VLC chegam na thread do VLC e são processados na thread da UI
+        self._vlc_event.connect(self._handle_vlc_event, QtCore.Qt.QueuedConnection)
+        if PLAYER_PREWARM:
+            # Cada player desenha na sua superfície; só a do player ativo aparece
+            self._stack = QStackedLayout(self)
+            self._stack.setContentsMargins(0, 0, 0, 0)
+            self.player = self._create_player(self._new_surface())
+            self.standby_player = self._create_player(self._new_surface())
+        else:
+            self._stack = None
+            self.player = self._create_player(self)
+            self.standby_player = None
+        logger.debug("VideoPlayerWidget configurado com sucesso.")
+
+    def _new_surface(self):
+        surface = QWidget(self)
+        self._stack.addWidget(surface)
+        return surface
 
+    def _create_player(self, surface):
+        player = self.instance.media_player_new()
+        self._surfaces[player] = surface
         # Integrar o player com o widget
         try:
             if sys.platform.startswith("linux"):  # para Linux usando X Server
-                self.player.set_xwindow(self.winId())
+                player.set_xwindow(surface.winId())
             elif sys.platform == "win32":  # para Windows
-                self.player.set_hwnd(self.winId())
+                player.set_hwnd(surface.winId())
             elif sys.platform == "darwin":  # para MacOS
-                self.player.set_nsobject(int(self.winId()))
+                player.set_nsobject(int(surface.winId()))
             else:
                 logger.error(
                     "Sistema operacional não suportado para integração com VLC."
@@ -34,89 +114,210 @@ class VideoPlayerWidget(QWidget):
         except Exception as e:
             logger.exception(f"Erro ao configurar o video output: {e}")
 
-        logger.debug("VideoPlayerWidget configurado com sucesso.")
+        events = player.event_manager()
+        for event_type in VLC_EVENT_STATES:
+            events.event_attach(event_type, self._on_vlc_event, player)
+        return player
 
-        # Adicionar event manager para capturar eventos de VLC
-        self.events = self.player.event_manager()
-        self.events.event_attach(
-            vlc.EventType.MediaPlayerEncounteredError, self.handle_error
+    def preload(self, media_path):
+        """
+        Prepara a mídia provável da próxima troca: o VLC já lê a playlist e,
+        com o player reserva, abre a mídia e a bufferiza pausada no início.
+
+        :param media_path: Arquivo ou URL que será passado depois a play().
+        """
+        if self._preloaded is not None and self._preloaded[0] == media_path:
+            return
+        media = self.instance.media_new(media_path)
+        if self.standby_player is None:
+            media.parse_with_options(
+                vlc.MediaParseFlag.network, PRELOAD_PARSE_TIMEOUT_MS
+            )
+        else:
+            media.add_option(":start-paused")
+            self._cancel_prewarm()
+            self._prewarm_task = asyncio.ensure_future(
+                self._prewarm(self.standby_player, media)
+            )
+        self._preloaded = (media_path, media)
+        logger.debug(f"Mídia pré-carregada: {media_path}")
+
+    async def _prewarm(self, player, media):
+        """
+        Abre a mídia no player reserva, que para no primeiro quadro.
+
+        :return: True se o player reserva começou a abrir a mídia.
+        """
+        # stop() espera as threads do VLC (ex.: a mídia pré-carregada anterior)
+        await asyncio.to_thread(player.stop)
+        player.set_media(media)
+        if player.play() == -1:
+            logger.warning("Falha ao abrir a mídia no player reserva.")
+            return False
+        return True
+
+    def _prewarmed(self):
+        """
+        :return: True se o player reserva já abriu a mídia pré-carregada.
+        """
+        task = self._prewarm_task
+        if task is None or not task.done() or task.cancelled():
+            return False
+        if task.exception() is not None or not task.result():
+            return False
+        return self.standby_player.get_state() not in (
+            vlc.State.Error,
+            vlc.State.Ended,
+            vlc.State.Stopped,
         )
-        self.events.event_attach(vlc.EventType.MediaPlayerEndReached, self.handle_end)
 
-        # Inicializar variáveis para gerenciamento de tarefas
-        self.check_state_task = None
-        self._stop_flag = False
+    def _cancel_prewarm(self):
+        if self._prewarm_task is not None:
+            self._prewarm_task.cancel()
+            self._prewarm_task = None
+
+    def _stop_in_background(self, player):
+        # stop() espera as threads do VLC; fica fora da thread da interface
+        task = asyncio.ensure_future(asyncio.to_thread(player.stop))
+        self._stop_tasks.add(task)
+        task.add_done_callback(self._stop_tasks.discard)
 
-    def play(self, media_path):
+    def play(self, media_path, start_time=None):
+        """
+        :param media_path: Arquivo ou URL da mídia.
+        :param start_time: Posição inicial em segundos (ex.: ao retomar após um erro).
+        """
         logger.info(f"Reproduzindo mídia: {media_path}")
-        # Cancelar qualquer reprodução anterior antes de iniciar uma nova
-        self.stop()
-        self.check_state_task = asyncio.create_task(self.async_play(media_path))
+        preloaded = self._take_preloaded(media_path)
+        prewarmed = False
+        if self.standby_player is not None and preloaded is not None:
+            prewarmed = self._prewarmed()
+            self._cancel_prewarm()
+            if not prewarmed:
+                # A mídia do reserva abre pausada; não serve ao player atual
+                self._stop_in_background(self.standby_player)
+                preloaded = None
+        if prewarmed:
+            # O player reserva já abriu a mídia e assume; o atual é parado
+            # em segundo plano
+            previous = self.player
+            self.player, self.standby_player = self.standby_player, previous
+            self._stack.setCurrentWidget(self._surfaces[self.player])
+            self._stop_in_background(previous)
+            self._mark_stopped()
+        else:
+            # Cancelar qualquer reprodução anterior antes de iniciar uma nova
+            self.stop()
+        # URLs (ex.: o proxy HLS local) são entregues diretamente ao VLC
+        if "://" not in media_path and not os.path.exists(media_path):
+            logger.error(f"O arquivo de mídia não existe: {media_path}")
+            self.media_path = media_path
+            self._set_state("error")
+            self.playback_error.emit(media_path)
+            return
 
-    async def async_play(self, media_path):
+        self.media_path = media_path
+        self._set_state("opening")
         try:
-            if not os.path.exists(media_path):
-                logger.error(f"O arquivo de mídia não existe: {media_path}")
-                return
-
-            media = self.instance.media_new(media_path)
-            self.player.set_media(media)
-            self.player.play()
+            if prewarmed:
+                # Pausado no primeiro quadro: play() apenas retoma
+                if start_time:
+                    self.player.set_time(int(start_time * 1000))
+            else:
+                media = preloaded or self.instance.media_new(media_path)
+                if start_time:
+                    media.add_option(f":start-time={start_time:.1f}")
+                self.player.set_media(media)
+            if self.player.play() == -1:
+                raise RuntimeError("libvlc_media_player_play retornou -1")
             logger.debug("Mídia iniciada com sucesso.")
-
-            # Verificar se o player está realmente reproduzindo
-            await asyncio.sleep(1)  # Aguarda um tempo para iniciar a reprodução
-            state = self.player.get_state()
-            logger.debug(f"Estado inicial do player após play(): {state}")
-
-            # Adicionar verificação periódica do estado do player
-            self.check_state_task = asyncio.create_task(self.check_player_state())
         except Exception as e:
             logger.exception(f"Erro ao reproduzir mídia '{media_path}': {e}")
+            self._set_state("error")
+            self.playback_error.emit(media_path)
 
-    async def check_player_state(self):
-        try:
-            while not self._stop_flag:
-                await asyncio.sleep(
-                    5
-                )  # Espera alguns segundos antes de verificar o estado
-                state = self.player.get_state()
-                logger.debug(f"Estado do player após 5 segundos: {state}")
-                if state == vlc.State.Error:
-                    logger.error(
-                        "Erro detectado no player após tentativa de reprodução."
-                    )
-                elif state == vlc.State.Ended:
-                    logger.info("Reprodução da mídia encerrada.")
-                elif state == vlc.State.Playing:
-                    logger.debug("Mídia está sendo reproduzida.")
-                else:
-                    logger.warning(f"Estado inesperado do player: {state}")
-        except asyncio.CancelledError:
-            logger.debug("Tarefa check_player_state cancelada.")
-        except Exception as e:
-            logger.exception(f"Erro na tarefa check_player_state: {e}")
+    def _take_preloaded(self, media_path):
+        if self._preloaded is None or self._preloaded[0] != media_path:
+            return None
+        media = self._preloaded[1]
+        self._preloaded = None
+        logger.debug(f"Usando a mídia pré-carregada: {media_path}")
+        return media
 
-    def stop(self):
+    def _on_vlc_event(self, event, player):
         """
-        Método para parar a reprodução e cancelar tarefas assíncronas relacionadas.
+        Callback na thread do VLC: apenas repassa o evento para a thread da UI.
         """
-        if self.player.is_playing():
-            self.player.stop()
-            logger.info("Playback interrompido.")
+        if player is not self.player:
+            return  # Player reserva
+        event_type = event.type
+        value = 0.0
+        if event_type == vlc.EventType.MediaPlayerBuffering:
+            value = event.u.new_cache
+        elif event_type == vlc.EventType.MediaPlayerTimeChanged:
+            value = event.u.new_time / 1000
+        self._vlc_event.emit(self._generation, event_type.value, value)
+
+    def _handle_vlc_event(self, generation, event_type, value):
+        if generation != self._generation:
+            return  # Evento de uma reprodução anterior
+        event_type = vlc.EventType(event_type)
+        if event_type == vlc.EventType.MediaPlayerTimeChanged:
+            self.position_changed.emit(value)
+            return
+        if self.state in FINAL_STATES:
+            return
+        if event_type == vlc.EventType.MediaPlayerBuffering:
+            self.buffering_progress.emit(value)
+            if value < 100:
+                self._set_state("buffering")
+            elif self.state == "buffering":
+                self._set_state("playing" if self.player.is_playing() else "paused")
+            return
 
-        # Sinalizar para a tarefa de verificação de estado que deve parar
-        self._stop_flag = True
+        new_state = VLC_EVENT_STATES[event_type]
+        self._set_state(new_state)
+        if new_state == "error":
+            logger.error("Erro encontrado durante a reprodução da mídia.")
+            self.playback_error.emit(self.media_path)
+        elif new_state == "ended":
+            logger.info("Reprodução da mídia encerrada.")
+            self.playback_ended.emit(self.media_path)
 
-        # Cancelar a tarefa de verificação de estado, se existir
-        if self.check_state_task and not self.check_state_task.done():
-            self.check_state_task.cancel()
-            logger.debug("Tarefa check_player_state foi cancelada.")
+    def _set_state(self, state):
+        if state == self.state:
+            return
+        logger.debug("Estado do player: %s -> %s", self.state, state)
+        self.state = state
+        self.state_changed.emit(state)
 
-    def handle_error(self, event):
-        logger.error("Erro encontrado durante a reprodução da mídia.")
-        # Opcional: Implementar diálogo ou notificação na UI
+    def seek(self, seconds):
+        """
+        Salta para o instante informado da mídia atual.
+
+        :param seconds: Posição de destino em segundos.
+        """
+        self.player.set_time(int(seconds * 1000))
+        logger.debug("Salto solicitado para %.1fs.", seconds)
+
+    def current_time(self):
+        """
+        :return: Posição atual da reprodução em segundos, ou None sem mídia.
+        """
+        time_ms = self.player.get_time()
+        return time_ms / 1000 if time_ms >= 0 else None
 
-    def handle_end(self, event):
-        logger.info("Reprodução da mídia encerrada.")
-        # Opcional: Resetar o player ou atualizar a UI
+    def stop(self):
+        """
+        Para a reprodução; eventos ainda pendentes da mídia atual são ignorados.
+        """
+        # Também para mídias pausadas ou ainda abrindo, não só as em reprodução
+        self.player.stop()
+        self._mark_stopped()
+
+    def _mark_stopped(self):
+        if self.state not in ("idle", "stopped", "ended", "error"):
+            logger.info("Playback interrompido.")
+        self._generation += 1
+        if self.state not in ("idle", "stopped"):
+            self._set_state("stopped")
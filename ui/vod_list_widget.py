@@ -1,51 +1,289 @@
 # ui/vod_list_widget.py
 
-from PyQt5.QtWidgets import QListWidget, QListWidgetItem
+from PyQt5.QtWidgets import QListView
 from PyQt5.QtGui import QIcon
 from PyQt5 import QtCore
+from .thumbnail_loader import THUMBNAIL_SIZE
 from utils.logger import setup_logger
-import asyncio
+import os
 
 # Configuração do logger
 logger = setup_logger("VODListWidget")
 
+DEFAULT_THUMBNAIL = "resources/icons/default_thumbnail.png"
+THUMBNAIL_ROLE = QtCore.Qt.UserRole + 1
+# Linhas fora da área visível (acima e abaixo) cujas miniaturas já são pedidas
+THUMBNAIL_PREFETCH_ROWS = int(os.getenv("THUMBNAIL_PREFETCH_ROWS", "10"))
+THUMBNAIL_REQUEST_DELAY_MS = 50
+
+
+class VODListModel(QtCore.QAbstractListModel):
+    """
+    Modelo da lista de VODs guardado em listas paralelas (título, link e
+    miniatura), sem um objeto por linha.
+
+    Lotes novos entram com um único beginInsertRows/endInsertRows, e
+    set_vods() aplica só a diferença entre a lista atual e a nova.
+    """
 
-class VODListWidget(QListWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setIconSize(
-            QtCore.QSize(100, 56)
-        )  # Define o tamanho do ícone das miniaturas
+        self.default_icon = QIcon(DEFAULT_THUMBNAIL)
+        self._titles = []
+        self._links = []
+        self._thumbnails = []
+        self._link_set = set()
+        self._icons = {}  # URL da miniatura -> QIcon aplicado às linhas visíveis
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._links)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == QtCore.Qt.DisplayRole:
+            return self._titles[row]
+        if role == QtCore.Qt.UserRole:
+            return self._links[row]
+        if role == QtCore.Qt.DecorationRole:
+            return self._icons.get(self._thumbnails[row], self.default_icon)
+        if role == THUMBNAIL_ROLE:
+            return self._thumbnails[row]
+        return None
+
+    def vod(self, row):
+        return {
+            "title": self._titles[row],
+            "link": self._links[row],
+            "thumbnail": self._thumbnails[row],
+        }
+
+    def clear(self):
+        self.beginResetModel()
+        self._titles, self._links, self._thumbnails = [], [], []
+        self._link_set.clear()
+        self._icons.clear()
+        self.endResetModel()
+
+    def append_vods(self, vods):
+        """
+        Acrescenta os VODs ainda ausentes ao final, em uma única inserção.
+
+        :return: Número de linhas inseridas.
+        """
+        vods = [vod for vod in vods if vod["link"] not in self._link_set]
+        if not vods:
+            return 0
+        self._insert(len(self._links), vods)
+        return len(vods)
+
+    def _insert(self, row, vods):
+        self.beginInsertRows(QtCore.QModelIndex(), row, row + len(vods) - 1)
+        self._titles[row:row] = [vod["title"] for vod in vods]
+        self._links[row:row] = [vod["link"] for vod in vods]
+        self._thumbnails[row:row] = [vod["thumbnail"] for vod in vods]
+        self._link_set.update(vod["link"] for vod in vods)
+        self.endInsertRows()
+
+    def _remove(self, first, last):
+        self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+        self._link_set.difference_update(self._links[first : last + 1])
+        del self._titles[first : last + 1]
+        del self._links[first : last + 1]
+        del self._thumbnails[first : last + 1]
+        self.endRemoveRows()
+
+    def set_vods(self, vods):
+        """
+        Atualiza o modelo para a nova lista aplicando só as diferenças.
+
+        Linhas que sumiram são removidas e linhas novas são inseridas em
+        blocos contíguos; títulos e miniaturas alterados geram dataChanged.
+        Se os VODs já existentes mudaram de ordem, o modelo é recarregado.
+        """
+        new_links = [vod["link"] for vod in vods]
+        new_set = set(new_links)
+        old_set = set(self._link_set)
+
+        # Remove de baixo para cima os blocos de linhas que não existem mais
+        row = len(self._links) - 1
+        while row >= 0:
+            if self._links[row] in new_set:
+                row -= 1
+                continue
+            last = row
+            while row >= 0 and self._links[row] not in new_set:
+                row -= 1
+            self._remove(row + 1, last)
+
+        if self._links != [link for link in new_links if link in old_set]:
+            logger.debug("Ordem dos VODs mudou; recarregando o modelo.")
+            self.beginResetModel()
+            self._titles = [vod["title"] for vod in vods]
+            self._links = new_links
+            self._thumbnails = [vod["thumbnail"] for vod in vods]
+            self._link_set = new_set
+            self.endResetModel()
+            return
+
+        row = 0
+        while row < len(vods):
+            if row < len(self._links) and self._links[row] == new_links[row]:
+                vod = vods[row]
+                if (self._titles[row], self._thumbnails[row]) != (
+                    vod["title"],
+                    vod["thumbnail"],
+                ):
+                    self._titles[row] = vod["title"]
+                    self._thumbnails[row] = vod["thumbnail"]
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index)
+                row += 1
+                continue
+            end = row
+            while end < len(vods) and new_links[end] not in old_set:
+                end += 1
+            self._insert(row, vods[row:end])
+            row = end
+
+    def set_icon(self, url, icon):
+        """
+        Define (ou remove, com icon=None) o ícone das linhas com a miniatura `url`.
+        """
+        if icon is None:
+            self._icons.pop(url, None)
+        else:
+            self._icons[url] = icon
+
+    def icons_changed(self, rows):
+        """
+        Notifica a view de que os ícones das linhas em `rows` (um range) mudaram.
+        """
+        last = min(rows.stop, len(self._links)) - 1
+        if last >= rows.start:
+            self.dataChanged.emit(
+                self.index(rows.start), self.index(last), [QtCore.Qt.DecorationRole]
+            )
+
+
+class VODListWidget(QListView):
+    """
+    Lista virtualizada de VODs: a view só desenha as linhas visíveis e, com
+    tamanhos uniformes, não precisa medir cada linha para rolar.
+    """
+
+    def __init__(self, parent=None, thumbnail_loader=None):
+        super().__init__(parent)
+        self.vod_model = VODListModel(self)
+        self.setModel(self.vod_model)
+        self.setUniformItemSizes(True)
+        self.setIconSize(THUMBNAIL_SIZE)  # Define o tamanho do ícone das miniaturas
+        self.thumbnail_loader = thumbnail_loader
+        self._shown = set()  # URLs cujas miniaturas estão aplicadas ao modelo
+        self._window = range(0)  # Linhas cujas miniaturas foram pedidas
+
+        # Os pedidos de miniaturas são agrupados enquanto a lista rola
+        self._thumbnail_timer = QtCore.QTimer(self)
+        self._thumbnail_timer.setSingleShot(True)
+        self._thumbnail_timer.setInterval(THUMBNAIL_REQUEST_DELAY_MS)
+        self._thumbnail_timer.timeout.connect(self.request_visible_thumbnails)
+        if thumbnail_loader is not None:
+            thumbnail_loader.thumbnail_ready.connect(self.set_thumbnail)
+            self.verticalScrollBar().valueChanged.connect(self.schedule_thumbnails)
         logger.debug("VODListWidget inicializado.")
 
+    def clear(self):
+        self._shown.clear()
+        self._window = range(0)
+        self.vod_model.clear()
+
+    def count(self):
+        return self.vod_model.rowCount()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_thumbnails()
+
     def populate_vods(self, vods):
         """
-        Popula a lista de VODs de forma assíncrona.
+        Atualiza a lista para os VODs informados, aplicando só as diferenças.
+
+        :param vods: Lista de dicionários contendo 'title', 'link' e 'thumbnail'
+        """
+        self.vod_model.set_vods(vods)
+        self.schedule_thumbnails()
+        logger.info(f"Lista de VODs atualizada ({len(vods)} VODs).")
+
+    def append_vods(self, vods):
+        """
+        Acrescenta um lote de VODs ao final da lista, sem limpar os existentes.
 
         :param vods: Lista de dicionários contendo 'title', 'link' e 'thumbnail'
         """
-        asyncio.create_task(self.async_populate_vods(vods))
-
-    async def async_populate_vods(self, vods):
-        logger.debug("Populando a lista de VODs.")
-        self.clear()
-        for vod in vods:
-            await asyncio.sleep(0)  # Yield para manter a interface responsiva
-            item = QListWidgetItem()
-            item.setText(vod["title"])
-            item.setData(
-                QtCore.Qt.UserRole, vod["link"]
-            )  # Armazena o link do VOD no dado do item
-            if vod["thumbnail"]:
-                try:
-                    # Se o thumbnail for uma URL, você pode baixar a imagem ou usar diretamente se suportado
-                    item.setIcon(QIcon(vod["thumbnail"]))
-                except Exception as e:
-                    logger.warning(
-                        f"Falha ao definir o ícone para o VOD '{vod['title']}': {e}"
-                    )
+        inserted = self.vod_model.append_vods(vods)
+        self.schedule_thumbnails()
+        logger.debug("%d VODs acrescentados à lista.", inserted)
+
+    def selected_vod(self):
+        """
+        :return: Dicionário do VOD selecionado, ou None.
+        """
+        index = self.currentIndex()
+        return self.vod_model.vod(index.row()) if index.isValid() else None
+
+    def schedule_thumbnails(self, *args):
+        if self.thumbnail_loader is not None:
+            self._thumbnail_timer.start()
+
+    def visible_rows(self, margin=0):
+        """
+        :param margin: Linhas extras antes e depois da área visível.
+        :return: range com as linhas visíveis (mais a margem).
+        """
+        if not self.count():
+            return range(0)
+        viewport = self.viewport().rect()
+        first = self.indexAt(viewport.topLeft())
+        last = self.indexAt(viewport.bottomLeft())
+        first_row = first.row() if first.isValid() else 0
+        last_row = last.row() if last.isValid() else self.count() - 1
+        return range(
+            max(first_row - margin, 0), min(last_row + margin + 1, self.count())
+        )
+
+    def request_visible_thumbnails(self):
+        """
+        Aplica as miniaturas das linhas visíveis e das próximas, pedindo ao
+        carregador as que não estão em memória.
+
+        As linhas que saíram dessa janela voltam ao ícone padrão, de modo que
+        só o LRU do carregador decide quantas imagens ficam em memória.
+        """
+        self._window = self.visible_rows(THUMBNAIL_PREFETCH_ROWS)
+        wanted = []
+        for row in self._window:
+            thumbnail = self.vod_model.data(self.vod_model.index(row), THUMBNAIL_ROLE)
+            if thumbnail:
+                wanted.append(thumbnail)
+        for url in self._shown - set(wanted):
+            self.vod_model.set_icon(url, None)
+        self._shown &= set(wanted)
+
+        missing = []
+        for url in wanted:
+            if url in self._shown:
+                continue
+            pixmap = self.thumbnail_loader.cached(url)
+            if pixmap is not None:
+                self.vod_model.set_icon(url, QIcon(pixmap))
+                self._shown.add(url)
             else:
-                # Opcional: Definir um ícone padrão se não houver miniatura
-                item.setIcon(QIcon("resources/icons/default_thumbnail.png"))
-            self.addItem(item)
-        logger.info(f"{len(vods)} VODs adicionados à lista.")
+                missing.append(url)
+        self.vod_model.icons_changed(self._window)
+        self.thumbnail_loader.request(missing)
+
+    def set_thumbnail(self, url, pixmap):
+        self.vod_model.set_icon(url, QIcon(pixmap))
+        self._shown.add(url)
+        self.vod_model.icons_changed(self._window)
@@ -0,0 +1,130 @@
+# utils/abr.py
+
+import asyncio
+import os
+from collections import namedtuple
+
+from utils.logger import setup_logger
+from utils.performance_monitor import async_timeit
+from utils.playlist import parse_master_playlist
+from utils.segment_index import SegmentIndex
+
+# Configuração do logger
+logger = setup_logger("ABR")
+
+DEFAULT_BANDWIDTH = float(os.getenv("ABR_DEFAULT_BANDWIDTH", str(5_000_000)))
+SAFETY_FACTOR = float(os.getenv("ABR_SAFETY_FACTOR", "0.8"))
+MIN_SAMPLE_BYTES = 16 * 1024
+FAST_HALF_LIFE = 2.0
+SLOW_HALF_LIFE = 5.0
+
+# Variante de uma master playlist com a playlist de mídia e a linha do tempo já carregadas
+Rendition = namedtuple("Rendition", ["variant", "playlist_text", "timeline"])
+
+
+class _Ewma:
+    """
+    Média móvel exponencial ponderada pelo tempo de cada amostra.
+    """
+
+    def __init__(self, half_life):
+        self.half_life = half_life
+        self.estimate = 0.0
+        self.total_weight = 0.0
+
+    def sample(self, weight, value):
+        alpha = 0.5 ** (weight / self.half_life)
+        self.estimate = value * (1 - alpha) + alpha * self.estimate
+        self.total_weight += weight
+
+    def value(self):
+        # Corrige o viés em direção a zero das primeiras amostras
+        zero_factor = 1 - 0.5 ** (self.total_weight / self.half_life)
+        return self.estimate / zero_factor
+
+
+class ThroughputEstimator:
+    """
+    Estimativa da banda de download a partir das transferências recentes.
+
+    Combina uma EWMA rápida e uma lenta e usa a menor das duas, de modo que
+    quedas de banda são percebidas logo e picos isolados não levam a trocas
+    de qualidade. Transferências muito pequenas são ignoradas, pois medem
+    mais a latência do que a banda.
+    """
+
+    def __init__(self, default_bandwidth=DEFAULT_BANDWIDTH):
+        self.default_bandwidth = default_bandwidth
+        self._fast = _Ewma(FAST_HALF_LIFE)
+        self._slow = _Ewma(SLOW_HALF_LIFE)
+        self.samples = 0
+
+    def record(self, num_bytes, seconds):
+        """
+        :param num_bytes: Bytes transferidos.
+        :param seconds: Duração da transferência em segundos.
+        """
+        if num_bytes < MIN_SAMPLE_BYTES or seconds <= 0:
+            return
+        bits_per_second = num_bytes * 8 / seconds
+        self._fast.sample(seconds, bits_per_second)
+        self._slow.sample(seconds, bits_per_second)
+        self.samples += 1
+
+    @property
+    def bandwidth(self):
+        """
+        :return: Banda estimada em bits/s.
+        """
+        if not self.samples:
+            return self.default_bandwidth
+        return min(self._fast.value(), self._slow.value())
+
+
+def choose_rendition(renditions, bandwidth, safety_factor=SAFETY_FACTOR):
+    """
+    Escolhe a variante de maior qualidade que cabe na banda estimada.
+
+    :param renditions: Lista de Rendition ordenada por banda crescente.
+    :param bandwidth: Banda estimada em bits/s.
+    :return: Índice da variante escolhida (a mais leve se nenhuma couber).
+    """
+    chosen = 0
+    for index, rendition in enumerate(renditions):
+        if rendition.variant.bandwidth <= bandwidth * safety_factor:
+            chosen = index
+    return chosen
+
+
+@async_timeit
+async def load_renditions(downloader, master_url, master_text, cache_dir):
+    """
+    Baixa as playlists de mídia de uma master playlist e gera suas linhas do tempo.
+
+    :param downloader: Downloader compartilhado.
+    :param master_url: URL da master playlist.
+    :param master_text: Conteúdo da master playlist.
+    :param cache_dir: Diretório do cache de playlists.
+    :return: Lista de Rendition ordenada por banda crescente.
+    """
+    variants = sorted(
+        parse_master_playlist(master_text, master_url), key=lambda v: v.bandwidth
+    )
+    paths = await asyncio.gather(
+        *(downloader.download_m3u8(variant.uri, cache_dir) for variant in variants)
+    )
+
+    def load(variant, path):
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        return Rendition(variant, text, SegmentIndex.load_or_build(path, variant.uri))
+
+    renditions = [
+        await asyncio.to_thread(load, variant, path)
+        for variant, path in zip(variants, paths)
+    ]
+    logger.debug(
+        f"{len(renditions)} variantes carregadas de {master_url}: "
+        f"{[r.variant.resolution for r in renditions]}"
+    )
+    return renditions
@@ -2,46 +2,257 @@
 
 import asyncio
 import os
+import time
 import aiohttp
+from utils.abr import ThroughputEstimator
 from utils.logger import setup_logger
+from utils.performance_monitor import async_timeit
+from utils.playlist_cache import PlaylistCache
+from utils.resilience import AdaptiveTimeout, Step
 
 # Configuração do logger
 logger = setup_logger("Downloader")
 
+DOWNLOADER_LIMIT = int(os.getenv("DOWNLOADER_LIMIT", "20"))
+DOWNLOADER_LIMIT_PER_HOST = int(os.getenv("DOWNLOADER_LIMIT_PER_HOST", "6"))
+DOWNLOADER_TIMEOUT = float(os.getenv("DOWNLOADER_TIMEOUT", "10"))
+KEEPALIVE_TIMEOUT = float(os.getenv("DOWNLOADER_KEEPALIVE_TIMEOUT", "60"))
+# Pisos dos tempos limite adaptativos (o teto é DOWNLOADER_TIMEOUT)
+PLAYLIST_TIMEOUT_FLOOR = float(os.getenv("DOWNLOADER_PLAYLIST_TIMEOUT_FLOOR", "1"))
+SEGMENT_TIMEOUT_FLOOR = float(os.getenv("DOWNLOADER_SEGMENT_TIMEOUT_FLOOR", "3"))
+# Segmentos são grandes: a segunda requisição dobraria o tráfego na cauda
+SEGMENT_HEDGING = os.getenv("DOWNLOADER_SEGMENT_HEDGING", "0") == "1"
 
-async def download_m3u8(vod_link, cache_dir):
+
+class Downloader:
     """
-    Baixa o arquivo .m3u8 de forma assíncrona e o salva no diretório de cache.
+    Serviço de download com uma sessão HTTP compartilhada e de longa duração.
 
-    :param vod_link: Link do arquivo .m3u8 a ser baixado.
-    :param cache_dir: Diretório de cache onde o arquivo será salvo.
-    :return: Caminho do arquivo baixado.
+    As conexões (DNS, TCP e TLS) são reaproveitadas entre downloads, e as
+    playlists em cache (ver PlaylistCache) são revalidadas com
+    ETag/If-Modified-Since. Cada transferência alimenta `throughput`, a
+    estimativa de banda usada na escolha de variantes. Playlists e
+    segmentos do player passam pelas políticas de etapa de utils.resilience.
+    Quem cria o Downloader deve chamar close() no encerramento.
     """
-    logger.info(f"Iniciando download do arquivo .m3u8: {vod_link}")
-    try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(vod_link, timeout=10) as response:
-                response.raise_for_status()
-                logger.debug(
-                    f"Resposta HTTP para o download recebida com status code {response.status}"
-                )
 
-                filename = os.path.basename(vod_link)
-                filepath = os.path.join(cache_dir, filename)
-                os.makedirs(cache_dir, exist_ok=True)
+    def __init__(
+        self,
+        limit=DOWNLOADER_LIMIT,
+        limit_per_host=DOWNLOADER_LIMIT_PER_HOST,
+        timeout=DOWNLOADER_TIMEOUT,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.session = None
+        self._caches = {}  # Cache de playlists por diretório
+        self.stats = {"downloads": 0, "not_modified": 0}
+        self.throughput = ThroughputEstimator()
+        self.playlist_step = Step(
+            "playlist",
+            AdaptiveTimeout(floor=PLAYLIST_TIMEOUT_FLOOR, ceiling=timeout),
+            hedge=True,
+        )
+        self.segment_step = Step(
+            "segment",
+            AdaptiveTimeout(floor=SEGMENT_TIMEOUT_FLOOR, ceiling=timeout),
+            hedge=SEGMENT_HEDGING,
+        )
+        # Downloads para arquivo: sem limite total (vale o sock_read de
+        # fetch_to_file) e fora do disjuntor que o player usa
+        self.segment_file_step = Step("segment_file", None, breaker=False)
+
+    async def _get_session(self):
+        """
+        Retorna a sessão HTTP compartilhada, criando-a na primeira chamada.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self.session
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+            logger.debug(f"Sessão do Downloader fechada. Estatísticas: {self.stats}")
 
-                with open(filepath, "wb") as f:
-                    while True:
-                        chunk = await response.content.read(8192)
-                        if not chunk:
-                            break
+    async def fetch_bytes(self, url):
+        """
+        Baixa um recurso inteiro para a memória usando a sessão compartilhada.
+
+        :param url: URL do recurso.
+        :return: Conteúdo em bytes.
+        """
+        session = await self._get_session()
+        started = time.perf_counter()
+        async with session.get(url) as response:
+            response.raise_for_status()
+            data = await response.read()
+        self.throughput.record(len(data), time.perf_counter() - started)
+        return data
+
+    async def fetch_segment(self, url):
+        """
+        Baixa um segmento HLS para o player, com novas tentativas e tempo
+        limite adaptativo (ver utils.resilience.Step).
+
+        :param url: URL do segmento.
+        :return: Conteúdo em bytes.
+        """
+        return await self.segment_step.run(url, lambda: self.fetch_bytes(url))
+
+    async def fetch_segment_to_file(self, url, path):
+        """
+        Variante de fetch_segment que grava o segmento em um arquivo (ver
+        fetch_to_file). Repete as falhas, mas sem tempo limite para a chamada
+        inteira, sem hedge (as duas requisições escreveriam no mesmo arquivo
+        temporário) e sem afetar o disjuntor do host usado na reprodução.
+
+        :return: Tamanho do arquivo em bytes.
+        """
+        return await self.segment_file_step.run(
+            url, lambda: self.fetch_to_file(url, path)
+        )
+
+    async def fetch_to_file(self, url, path):
+        """
+        Baixa um recurso direto para um arquivo, em blocos, sem mantê-lo em memória.
+
+        O tempo limite vale por leitura, e não para o download inteiro, para
+        que recursos grandes não expirem em conexões lentas.
+
+        :param url: URL do recurso.
+        :param path: Caminho final do arquivo (escrito via arquivo temporário + rename).
+        :return: Tamanho do arquivo em bytes.
+        """
+        session = await self._get_session()
+        tmp_path = f"{path}.tmp"
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=self.timeout)
+        started = time.perf_counter()
+        try:
+            async with session.get(url, timeout=timeout) as response:
+                response.raise_for_status()
+                size = 0
+                with open(tmp_path, "wb") as f:
+                    async for chunk in response.content.iter_chunked(64 * 1024):
                         f.write(chunk)
+                        size += len(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.throughput.record(size, time.perf_counter() - started)
+        return size
 
+    def get_cache(self, cache_dir):
+        """
+        Retorna o cache de playlists do diretório, criando-o na primeira chamada.
+        """
+        if cache_dir not in self._caches:
+            self._caches[cache_dir] = PlaylistCache(cache_dir)
+        return self._caches[cache_dir]
+
+    @async_timeit
+    async def download_m3u8(self, vod_link, cache_dir):
+        """
+        Baixa o arquivo .m3u8 de forma assíncrona e o salva no diretório de cache.
+
+        O arquivo é nomeado pelo hash da URL completa. Se já houver uma cópia,
+        a requisição é condicional e uma resposta 304 reaproveita o arquivo.
+
+        :param vod_link: Link do arquivo .m3u8 a ser baixado.
+        :param cache_dir: Diretório de cache onde o arquivo será salvo.
+        :return: Caminho do arquivo baixado.
+        """
+        logger.info(f"Iniciando download do arquivo .m3u8: {vod_link}")
+        cache = self.get_cache(cache_dir)
+        tmp_path = None
+        try:
+            async with cache.lock(vod_link):
+                entry = cache.lookup(vod_link)
+                headers = {}
+                if entry and entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry and entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+
+                status, data, response_headers = await self.playlist_step.run(
+                    vod_link, lambda: self._get_playlist(vod_link, headers)
+                )
+                if status == 304 and entry:
+                    self.stats["not_modified"] += 1
+                    filepath = cache.touch(vod_link)
+                    logger.info(
+                        f"Arquivo .m3u8 não modificado; reutilizando cache: {filepath}"
+                    )
+                    return filepath
+
+                fd, tmp_path = cache.temp_file()
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                filepath = cache.commit(
+                    vod_link,
+                    tmp_path,
+                    etag=response_headers.get("ETag"),
+                    last_modified=response_headers.get("Last-Modified"),
+                )
+                tmp_path = None
+                self.stats["downloads"] += 1
                 logger.info(f"Arquivo .m3u8 salvo em: {filepath}")
                 return filepath
-    except aiohttp.ClientError as e:
-        logger.exception(f"Erro ao baixar o arquivo .m3u8 de '{vod_link}': {e}")
-        raise
-    except Exception as e:
-        logger.exception(f"Erro ao salvar o arquivo .m3u8 em '{filepath}': {e}")
-        raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.exception(f"Erro ao baixar o arquivo .m3u8 de '{vod_link}': {e}")
+            raise
+        except Exception as e:
+            logger.exception(f"Erro ao salvar o arquivo .m3u8 de '{vod_link}': {e}")
+            raise
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def _get_playlist(self, vod_link, headers):
+        """
+        Uma requisição (possivelmente condicional) da playlist.
+
+        :return: Tupla (status, conteúdo em bytes ou None se 304, cabeçalhos).
+        """
+        session = await self._get_session()
+        started = time.perf_counter()
+        async with session.get(vod_link, headers=headers) as response:
+            if response.status == 304 and headers:
+                return response.status, None, response.headers
+            response.raise_for_status()
+            logger.debug(
+                "Resposta HTTP para o download recebida com status code %d",
+                response.status,
+            )
+            data = await response.read()
+        self.throughput.record(len(data), time.perf_counter() - started)
+        return response.status, data, response.headers
+
+
+async def download_m3u8(vod_link, cache_dir, downloader=None):
+    """
+    Baixa o arquivo .m3u8 de forma assíncrona e o salva no diretório de cache.
+
+    :param vod_link: Link do arquivo .m3u8 a ser baixado.
+    :param cache_dir: Diretório de cache onde o arquivo será salvo.
+    :param downloader: Downloader compartilhado; sem ele, uma sessão temporária é usada.
+    :return: Caminho do arquivo baixado.
+    """
+    if downloader is not None:
+        return await downloader.download_m3u8(vod_link, cache_dir)
+    downloader = Downloader()
+    try:
+        return await downloader.download_m3u8(vod_link, cache_dir)
+    finally:
+        await downloader.close()
@@ -0,0 +1,578 @@
+# utils/hls_proxy.py
+
+import asyncio
+import contextlib
+import hashlib
+import os
+import shutil
+from collections import OrderedDict
+
+from aiohttp import web
+
+from utils.abr import Rendition, choose_rendition
+from utils.logger import setup_logger
+from utils.playlist import is_master_playlist, rewrite_playlist
+from utils.segment_index import SegmentIndex
+from utils.tracing import tracer
+
+# Configuração do logger
+logger = setup_logger("HLSProxy")
+
+HLS_PROXY_ENABLED = os.getenv("HLS_PROXY_ENABLED", "1") == "1"
+HLS_PROXY_HOST = "127.0.0.1"
+READ_AHEAD_SEGMENTS = int(os.getenv("HLS_READ_AHEAD_SEGMENTS", "5"))
+PREFETCH_CONCURRENCY = int(os.getenv("HLS_PREFETCH_CONCURRENCY", "2"))
+# Segmentos iniciais baixados ao pré-carregar um VOD que ainda não está tocando
+PRELOAD_SEGMENTS = int(os.getenv("HLS_PRELOAD_SEGMENTS", "3"))
+# Playlists pré-carregadas mantidas à espera de activate(); as mais antigas saem
+MAX_PRELOADED_SESSIONS = 3
+MEMORY_BUFFER_BYTES = int(os.getenv("HLS_MEMORY_BUFFER_BYTES", str(64 * 1024 * 1024)))
+DISK_BUFFER_BYTES = int(os.getenv("HLS_DISK_BUFFER_BYTES", str(512 * 1024 * 1024)))
+DISK_BUFFER_DIR = os.path.join("data", "cache", "segments")
+
+
+class SegmentBuffer:
+    """
+    Buffer LRU de segmentos em memória que transborda para um diretório em disco.
+
+    Os dois níveis têm limite em bytes; o que sai da memória vai para o
+    disco e o que sai do disco é apagado. Leituras, gravações e remoções no
+    disco rodam em threads, fora do loop de eventos; um segmento que ainda
+    está sendo gravado continua servido da memória.
+    """
+
+    def __init__(
+        self,
+        disk_dir=DISK_BUFFER_DIR,
+        memory_bytes=MEMORY_BUFFER_BYTES,
+        disk_bytes=DISK_BUFFER_BYTES,
+    ):
+        self.disk_dir = disk_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()  # chave -> bytes
+        self._memory_size = 0
+        self._spilling = OrderedDict()  # chave -> bytes à espera da gravação
+        self._writer = None  # Tarefa que grava _spilling no disco
+        self._disk = OrderedDict()  # chave -> tamanho em bytes
+        self._disk_size = 0
+        os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key.replace("/", "_") + ".ts")
+
+    def __contains__(self, key):
+        return key in self._memory or key in self._spilling or key in self._disk
+
+    async def get(self, key):
+        """
+        :return: Tupla (dados, nível) com nível "memory" ou "disk", ou (None, None).
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key], "memory"
+        if key in self._spilling:
+            return self._spilling[key], "memory"
+        if key in self._disk:
+            self._disk.move_to_end(key)
+            try:
+                return await asyncio.to_thread(self._read, key), "disk"
+            except FileNotFoundError:
+                return None, None  # Removido do disco durante a leitura
+        return None, None
+
+    def put(self, key, data):
+        if key in self._memory:
+            return
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            old_key, old_data = self._memory.popitem(last=False)
+            self._memory_size -= len(old_data)
+            self._schedule_spill(old_key, old_data)
+
+    def _schedule_spill(self, key, data):
+        if key in self._disk or key in self._spilling or len(data) > self.disk_bytes:
+            return
+        self._spilling[key] = data
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.ensure_future(self._write_spills())
+
+    async def _write_spills(self):
+        while self._spilling:
+            key, data = next(iter(self._spilling.items()))
+            try:
+                await asyncio.to_thread(self._write, key, data)
+            except OSError as e:
+                logger.warning(f"Falha ao gravar o segmento '{key}' no disco: {e}")
+                self._spilling.pop(key, None)
+                continue
+            del self._spilling[key]
+            self._disk[key] = len(data)
+            self._disk_size += len(data)
+            evicted = []
+            while self._disk_size > self.disk_bytes:
+                old_key, old_size = self._disk.popitem(last=False)
+                self._disk_size -= old_size
+                evicted.append(self._disk_path(old_key))
+            if evicted:
+                await asyncio.to_thread(self._remove, evicted)
+
+    def _read(self, key):
+        with open(self._disk_path(key), "rb") as f:
+            return f.read()
+
+    def _write(self, key, data):
+        tmp_path = self._disk_path(key) + ".part"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._disk_path(key))
+
+    @staticmethod
+    def _remove(paths):
+        for path in paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+    def clear(self):
+        if self._writer is not None:
+            self._writer.cancel()
+            self._writer = None
+        self._memory.clear()
+        self._memory_size = 0
+        self._spilling.clear()
+        self._disk.clear()
+        self._disk_size = 0
+        shutil.rmtree(self.disk_dir, ignore_errors=True)
+
+
+class _ProxySession:
+    """
+    Estado de uma playlist servida pelo proxy: variantes disponíveis, variante
+    atual, posição de reprodução e downloads antecipados em andamento.
+    """
+
+    def __init__(self, session_id, playlist_url, playlist_text, renditions, current):
+        self.session_id = session_id
+        self.playlist_url = playlist_url
+        self.playlist_text = playlist_text
+        self.renditions = renditions
+        self.current = current  # Índice da variante usada nos próximos segmentos
+        self.override = None  # Variante fixada pelo usuário (None = automática)
+        self.position = 0
+        self.inflight = {}  # índice -> Task do download
+
+    @property
+    def timeline(self):
+        if not self.renditions:
+            return SegmentIndex.empty()
+        return self.renditions[self.current].timeline
+
+    def key(self, index, rendition=None):
+        rendition = self.current if rendition is None else rendition
+        return f"{self.session_id}/{rendition}/{index}"
+
+    def keys(self, index):
+        """
+        Chaves do segmento em todas as variantes, começando pela atual.
+        """
+        others = (r for r in range(len(self.renditions)) if r != self.current)
+        return [self.key(index)] + [self.key(index, r) for r in others]
+
+
+class HLSProxy:
+    """
+    Proxy HTTP local que serve uma playlist reescrita ao VLC e baixa os
+    próximos segmentos antes que o player os peça.
+
+    A janela de leitura antecipada acompanha a posição de reprodução: a
+    cada segmento pedido, os `read_ahead` seguintes são agendados e os
+    downloads fora da janela (por exemplo, após um salto) são cancelados.
+
+    Com várias variantes, o player recebe uma única playlist de mídia e a
+    variante de cada segmento é escolhida no momento do pedido, conforme a
+    banda medida pelo Downloader ou a qualidade fixada pelo usuário.
+    """
+
+    def __init__(
+        self,
+        downloader,
+        host=HLS_PROXY_HOST,
+        port=0,
+        read_ahead=READ_AHEAD_SEGMENTS,
+        prefetch_concurrency=PREFETCH_CONCURRENCY,
+        buffer=None,
+        preload_segments=PRELOAD_SEGMENTS,
+    ):
+        self.downloader = downloader
+        self.host = host
+        self.port = port
+        self.read_ahead = read_ahead
+        self.preload_segments = preload_segments
+        self.buffer = buffer if buffer is not None else SegmentBuffer()
+        self._prefetch_semaphore = asyncio.Semaphore(prefetch_concurrency)
+        self._sessions = {}
+        self._active = None  # ID da sessão em reprodução
+        self._preloaded = (
+            OrderedDict()
+        )  # IDs pré-carregados, do mais antigo ao mais novo
+        self._runner = None
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stalls": 0,
+            "prefetched": 0,
+            "buffer_fill": 0,
+            "switches": 0,
+            "preloaded": 0,
+        }
+
+    @property
+    def running(self):
+        return self._runner is not None
+
+    async def start(self):
+        """
+        Inicia o servidor local (idempotente).
+        """
+        if self._runner is not None:
+            return
+        app = web.Application()
+        app.router.add_get("/{session_id}/index.m3u8", self._handle_playlist)
+        app.router.add_get(r"/{session_id}/seg/{index:\d+}.ts", self._handle_segment)
+        # O servidor sobrevive à ação que o iniciou; suas tarefas não herdam o trace
+        with tracer.detached():
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+        self.port = self._runner.addresses[0][1]
+        logger.info(f"Proxy HLS iniciado em http://{self.host}:{self.port}")
+
+    async def close(self):
+        for session in self._sessions.values():
+            self._cancel_prefetch(session)
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        self.buffer.clear()
+        logger.info(f"Proxy HLS encerrado. Estatísticas: {self.stats}")
+
+    @staticmethod
+    def _session_id(playlist_url):
+        return hashlib.sha256(playlist_url.encode("utf-8")).hexdigest()[:16]
+
+    def register(
+        self,
+        playlist_url,
+        playlist_text,
+        timeline=None,
+        renditions=None,
+        activate=True,
+    ):
+        """
+        Registra uma playlist e retorna a URL local que deve ser entregue ao player.
+
+        :param playlist_url: URL de origem da playlist (base das URIs relativas).
+        :param playlist_text: Conteúdo da playlist.
+        :param timeline: SegmentIndex já carregado; sem ele, é gerado do texto.
+        :param renditions: Variantes de uma master playlist (ver abr.load_renditions),
+            em ordem crescente de banda.
+        :param activate: Se False, a playlist é só pré-carregada: os primeiros
+            segmentos são baixados sem interromper a reprodução atual, e
+            activate() a torna a playlist ativa depois.
+        :return: URL local da playlist reescrita.
+        """
+        session_id = self._session_id(playlist_url)
+        current = 0
+        if renditions:
+            renditions = self._switchable(renditions)
+            current = choose_rendition(renditions, self.downloader.throughput.bandwidth)
+            start = renditions[current]
+            logger.info(
+                f"Variante inicial: {start.variant.resolution} "
+                f"({start.variant.bandwidth} bit/s) de {len(renditions)} disponíveis."
+            )
+            rewritten = rewrite_playlist(
+                start.playlist_text,
+                start.variant.uri,
+                lambda index, _: f"seg/{index}.ts",
+            )
+        elif is_master_playlist(playlist_text):
+            # Sem as variantes carregadas, a master playlist vai direto ao player
+            renditions = []
+            rewritten = rewrite_playlist(playlist_text, playlist_url)
+        else:
+            if timeline is None:
+                timeline = SegmentIndex.from_playlist(playlist_text, playlist_url)
+            renditions = [Rendition(None, playlist_text, timeline)]
+            rewritten = rewrite_playlist(
+                playlist_text, playlist_url, lambda index, _: f"seg/{index}.ts"
+            )
+        session = _ProxySession(
+            session_id, playlist_url, rewritten, renditions, current
+        )
+        previous = self._sessions.get(session_id)
+        if previous is not None:
+            self._cancel_prefetch(previous)
+        self._sessions[session_id] = session
+        if activate:
+            self.activate(playlist_url)
+        else:
+            self._preloaded[session_id] = True
+            self._preloaded.move_to_end(session_id)
+            while len(self._preloaded) > MAX_PRELOADED_SESSIONS:
+                oldest, _ = self._preloaded.popitem(last=False)
+                if oldest != self._active:
+                    self._drop(oldest)
+            self._preload(session)
+        logger.debug(
+            f"Playlist registrada no proxy ({len(session.timeline)} segmentos): {playlist_url}"
+        )
+        return self.local_url(playlist_url)
+
+    def local_url(self, playlist_url):
+        return f"http://{self.host}:{self.port}/{self._session_id(playlist_url)}/index.m3u8"
+
+    def is_registered(self, playlist_url):
+        return self._session_id(playlist_url) in self._sessions
+
+    def activate(self, playlist_url):
+        """
+        Torna a playlist (já registrada) a ativa: os downloads antecipados das
+        demais são cancelados e a leitura antecipada recomeça do início.
+
+        As sessões que não são a ativa nem estão pré-carregadas são descartadas.
+        """
+        session_id = self._session_id(playlist_url)
+        session = self._sessions[session_id]
+        self._active = session_id
+        self._preloaded.pop(session_id, None)
+        for other_id, other in list(self._sessions.items()):
+            if other is session:
+                continue
+            if other_id in self._preloaded:
+                self._cancel_prefetch(other)
+            else:
+                self._drop(other_id)
+        session.position = 0
+        self._schedule_read_ahead(session, 0)
+
+    def _drop(self, session_id):
+        session = self._sessions.pop(session_id, None)
+        self._preloaded.pop(session_id, None)
+        if session is not None:
+            self._cancel_prefetch(session)
+            logger.debug("Sessão descartada do proxy: %s", session.playlist_url)
+
+    def _preload(self, session):
+        for index in range(min(self.preload_segments, len(session.timeline))):
+            if index not in session.inflight and not self._buffered(session, index):
+                self._start_fetch(session, index, prefetch=True)
+                self.stats["preloaded"] += 1
+
+    @staticmethod
+    def _switchable(renditions):
+        """
+        Mantém só as variantes alinhadas segmento a segmento com a de maior
+        banda, condição para trocar de variante entre segmentos.
+        """
+        reference = renditions[-1].timeline
+        aligned = [
+            r
+            for r in renditions
+            if len(r.timeline) == len(reference)
+            and abs(r.timeline.duration - reference.duration) < 1.0
+        ]
+        if len(aligned) < len(renditions):
+            logger.warning(
+                f"{len(renditions) - len(aligned)} variantes descartadas por não "
+                "estarem alinhadas com as demais."
+            )
+        return aligned
+
+    def renditions(self, playlist_url):
+        """
+        :return: Variantes (Variant) da playlist registrada, em ordem crescente de banda.
+        """
+        session = self._sessions.get(self._session_id(playlist_url))
+        if session is None:
+            return []
+        return [r.variant for r in session.renditions if r.variant is not None]
+
+    def set_quality(self, playlist_url, rendition):
+        """
+        Fixa a variante dos próximos segmentos ou volta à escolha automática.
+
+        :param playlist_url: URL de origem da playlist registrada.
+        :param rendition: Índice em renditions(), ou None para a escolha automática.
+        """
+        session = self._sessions.get(self._session_id(playlist_url))
+        if session is None:
+            return
+        session.override = rendition
+        logger.info(
+            "Qualidade automática."
+            if rendition is None
+            else f"Qualidade fixada em {session.renditions[rendition].variant.resolution}."
+        )
+
+    def _select_rendition(self, session):
+        """
+        Reavalia a variante dos próximos segmentos; chamado a cada segmento
+        pedido, ou seja, sempre em uma fronteira de segmento.
+        """
+        if len(session.renditions) < 2:
+            return
+        if session.override is not None:
+            selected = session.override
+        else:
+            selected = choose_rendition(
+                session.renditions, self.downloader.throughput.bandwidth
+            )
+        if selected != session.current:
+            self.stats["switches"] += 1
+            logger.info(
+                f"Trocando de variante no segmento {session.position}: "
+                f"{session.renditions[session.current].variant.resolution} -> "
+                f"{session.renditions[selected].variant.resolution} "
+                f"(banda estimada {self.downloader.throughput.bandwidth / 1e6:.1f} Mbit/s)"
+            )
+            session.current = selected
+
+    async def _handle_playlist(self, request):
+        session = self._sessions.get(request.match_info["session_id"])
+        if session is None:
+            raise web.HTTPNotFound()
+        return web.Response(
+            text=session.playlist_text, content_type="application/vnd.apple.mpegurl"
+        )
+
+    async def _handle_segment(self, request):
+        session = self._sessions.get(request.match_info["session_id"])
+        index = int(request.match_info["index"])
+        if session is None or not 0 <= index < len(session.timeline):
+            raise web.HTTPNotFound()
+
+        session.position = index
+        self._select_rendition(session)
+        self._schedule_read_ahead(session, index + 1)
+        try:
+            data = await self.get_segment(session, index)
+        except Exception as e:
+            logger.warning("Falha ao obter o segmento %d para o player: %s", index, e)
+            raise web.HTTPBadGateway()
+        self.stats["buffer_fill"] = self._buffer_fill(session)
+        return web.Response(body=data, content_type="video/mp2t")
+
+    async def get_segment(self, session, index):
+        """
+        Retorna os bytes de um segmento, do buffer ou baixando-o agora.
+
+        Um segmento já baixado em outra variante é aproveitado em vez de
+        baixado de novo na variante atual.
+        """
+        for key in session.keys(index):
+            data, level = await self.buffer.get(key)
+            if data is not None:
+                self.stats[f"{level}_hits"] += 1
+                return data
+
+        # O player pediu um segmento que ainda não está pronto
+        self.stats["stalls"] += 1
+        while True:
+            task = session.inflight.get(index)
+            if task is None:
+                self.stats["misses"] += 1
+                logger.debug("Segmento %d fora do buffer; baixando sob demanda.", index)
+                task = self._start_fetch(session, index, prefetch=False)
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Se foi o download antecipado que saiu da janela, baixa de novo
+                if asyncio.current_task().cancelling():
+                    raise
+
+    def seek(self, playlist_url, seconds):
+        """
+        Prioriza o segmento que contém `seconds` antes de o player pedi-lo.
+
+        O segmento alvo é baixado imediatamente, fora do limite de downloads
+        antecipados, e a janela de leitura antecipada passa a segui-lo.
+
+        :param playlist_url: URL de origem da playlist registrada.
+        :param seconds: Instante de destino em segundos.
+        :return: Índice do segmento alvo, ou None se a playlist não estiver registrada.
+        """
+        session = self._sessions.get(self._session_id(playlist_url))
+        if session is None or not len(session.timeline):
+            return None
+        index = session.timeline.segment_at(seconds)
+        session.position = index
+        if index not in session.inflight and not self._buffered(session, index):
+            self._start_fetch(session, index, prefetch=False)
+        self._schedule_read_ahead(session, index + 1)
+        logger.debug("Salto para %.1fs: segmento %d priorizado.", seconds, index)
+        return index
+
+    def _schedule_read_ahead(self, session, start):
+        """
+        Agenda os próximos segmentos a partir de `start` e cancela os
+        downloads que saíram da janela de leitura antecipada.
+        """
+        window = range(start, min(start + self.read_ahead, len(session.timeline)))
+        for index, task in list(session.inflight.items()):
+            if index not in window and index != session.position:
+                task.cancel()
+        for index in window:
+            if index not in session.inflight and not self._buffered(session, index):
+                self._start_fetch(session, index, prefetch=True)
+
+    def _buffered(self, session, index):
+        return any(key in self.buffer for key in session.keys(index))
+
+    def _start_fetch(self, session, index, prefetch):
+        task = asyncio.create_task(self._fetch_segment(session, index, prefetch))
+        session.inflight[index] = task
+        task.add_done_callback(lambda done: self._on_fetch_done(session, index, done))
+        return task
+
+    def _on_fetch_done(self, session, index, task):
+        if session.inflight.get(index) is task:
+            del session.inflight[index]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(
+                "Falha ao baixar o segmento %d de '%s': %s",
+                index,
+                session.playlist_url,
+                task.exception(),
+            )
+
+    async def _fetch_segment(self, session, index, prefetch):
+        # A variante é fixada no início do download do segmento
+        rendition = session.current
+        uri = session.renditions[rendition].timeline.uri(index)
+        if prefetch:
+            async with self._prefetch_semaphore:
+                data = await self.downloader.fetch_segment(uri)
+            self.stats["prefetched"] += 1
+        else:
+            data = await self.downloader.fetch_segment(uri)
+        self.buffer.put(session.key(index, rendition), data)
+        return data
+
+    def _buffer_fill(self, session):
+        """
+        Número de segmentos já disponíveis à frente da posição de reprodução.
+        """
+        fill = 0
+        for index in range(session.position + 1, len(session.timeline)):
+            if not self._buffered(session, index):
+                break
+            fill += 1
+        return fill
+
+    def _cancel_prefetch(self, session):
+        for task in list(session.inflight.values()):
+            task.cancel()
@@ -1,33 +1,109 @@
 # utils/logger.py
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import sys
 import qasync
 import asyncio
+from utils.tracing import current_trace_id
 
+# Nível padrão de todos os loggers; DEBUG só quando pedido explicitamente
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# Registros DEBUG/INFO por segundo aceitos de um mesmo ponto de log (0 desativa)
+LOG_RATE_LIMIT = float(os.getenv("LOG_RATE_LIMIT", "20"))
 
-def setup_logger(name=__name__, log_file="logs/app.log", level=logging.DEBUG):
+# %(trace)s é o ID do trace da ação em andamento, quando houver (ver utils.tracing)
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s%(trace)s - %(message)s"
+
+# Arquivo de log -> (QueueHandler compartilhado, QueueListener)
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+class _DeferredQueueHandler(QueueHandler):
     """
-    Configura e retorna um logger.
-    :param name: Nome do logger.
-    :param log_file: Caminho para o arquivo de log.
-    :param level: Nível de severidade do logger.
-    :return: Configuração do logger.
+    Enfileira o registro sem formatá-lo; data, formato e escrita ficam com a
+    thread do QueueListener.
+
+    Só a mensagem (%-args) é resolvida aqui, para que mudanças posteriores
+    nos argumentos não alterem o que será gravado.
     """
-    # Criar diretório de logs se não existir
-    os.makedirs(os.path.dirname(log_file), exist_ok=True)
 
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
 
-    # Evitar duplicação de handlers
-    if not logger.handlers:
-        # Formato do log
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
+
+class TraceFilter(logging.Filter):
+    """
+    Anota o registro com o ID do trace atual, lido na thread que registrou.
+    """
+
+    def filter(self, record):
+        trace_id = current_trace_id()
+        record.trace = f" [{trace_id}]" if trace_id else ""
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita os registros DEBUG/INFO de cada ponto de log (logger, arquivo e
+    linha) a `rate` por segundo, com um balde de fichas. Quando um registro
+    volta a passar, ele informa quantos foram descartados no intervalo.
+
+    Avisos e erros nunca são descartados.
+    """
+
+    def __init__(self, rate=LOG_RATE_LIMIT):
+        super().__init__()
+        self.rate = rate
+        self._buckets = {}  # ponto de log -> [fichas, último instante, descartados]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno > logging.INFO:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [self.rate, now, 0]
+            bucket[0] = min(self.rate, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            suppressed, bucket[2] = bucket[2], 0
+        if suppressed:
+            record.msg = f"{record.getMessage()} (+{suppressed} registros suprimidos)"
+            record.args = None
+        return True
+
+
+def _queue_handler(log_file):
+    """
+    Retorna o QueueHandler do arquivo, criando na primeira chamada os
+    handlers de arquivo e console e o QueueListener que os atende.
+
+    O arquivo recebe tudo o que os loggers deixam passar; o nível de cada
+    logger é o que decide.
+    """
+    with _queues_lock:
+        entry = _queues.get(log_file)
+        if entry is not None:
+            return entry[0]
+
+        # Criar diretório de logs se não existir
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        formatter = logging.Formatter(LOG_FORMAT)
 
         # Handler para o arquivo de log com rotação e codificação UTF-8
         file_handler = RotatingFileHandler(
@@ -37,7 +113,6 @@ def setup_logger(name=__name__, log_file="logs/app.log", level=logging.DEBUG):
             encoding="utf-8",  # Especifica a codificação UTF-8
         )
         file_handler.setFormatter(formatter)
-        file_handler.setLevel(level)
 
         # Handler para a saída no console com codificação UTF-8
         console_handler = logging.StreamHandler(stream=sys.stdout)
@@ -45,8 +120,55 @@ def setup_logger(name=__name__, log_file="logs/app.log", level=logging.DEBUG):
         console_handler.setLevel(logging.INFO)
         console_handler.encoding = "utf-8"  # Define a codificação para UTF-8
 
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        handler = _DeferredQueueHandler(queue.SimpleQueue())
+        handler.addFilter(TraceFilter())
+        if LOG_RATE_LIMIT > 0:
+            handler.addFilter(RateLimitFilter(LOG_RATE_LIMIT))
+        listener = QueueListener(
+            handler.queue, file_handler, console_handler, respect_handler_level=True
+        )
+        listener.start()
+        _queues[log_file] = (handler, listener)
+        return handler
+
+
+def shutdown_logging():
+    """
+    Esvazia as filas e encerra as threads de escrita dos logs.
+    """
+    with _queues_lock:
+        entries = list(_queues.values())
+        _queues.clear()
+    for _, listener in entries:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(shutdown_logging)
+
+
+def setup_logger(name=__name__, log_file="logs/app.log", level=LOG_LEVEL):
+    """
+    Configura e retorna um logger.
+
+    As mensagens vão para uma fila e são gravadas por uma thread própria, de
+    modo que escrita e rotação do arquivo não bloqueiam o loop de eventos.
+    Nos pontos de log frequentes, prefira o estilo %
+    (logger.debug("Segmento %d", index)) às f-strings: a mensagem só é
+    montada se o nível estiver ativo.
+
+    :param name: Nome do logger.
+    :param log_file: Caminho para o arquivo de log.
+    :param level: Nível de severidade do logger.
+    :return: Configuração do logger.
+    """
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+
+    # Evitar duplicação de handlers
+    if not logger.handlers:
+        logger.addHandler(_queue_handler(log_file))
 
     return logger
 
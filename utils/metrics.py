@@ -0,0 +1,353 @@
+# utils/metrics.py
+
+import asyncio
+import bisect
+import json
+import math
+import os
+import threading
+import time
+
+from aiohttp import web
+
+from utils.logger import setup_logger
+
+# Configuração do logger
+logger = setup_logger("Metrics")
+
+# Intervalo entre os snapshots gravados em disco (0 desativa)
+METRICS_SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL", "60"))
+METRICS_SNAPSHOT_PATH = os.getenv(
+    "METRICS_SNAPSHOT_PATH", os.path.join("logs", "metrics.json")
+)
+# Porta local do endpoint /metrics no formato do Prometheus (0 desativa)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = "127.0.0.1"
+
+# Limites dos buckets de latência, em segundos
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text="", labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}  # tupla com os valores dos rótulos -> valor
+
+    def _key(self, labels):
+        if not self.labelnames:
+            return ()
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _label_text(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ""
+        body = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+        return "{" + body + "}"
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """
+    Valor que só cresce (ex.: requisições, erros).
+    """
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                {"labels": dict(zip(self.labelnames, key)), "value": value}
+                for key, value in self._values.items()
+            ]
+
+    def prometheus(self):
+        lines = self._header()
+        with self._lock:
+            for key, value in self._values.items():
+                lines.append(f"{self.name}{self._label_text(key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    """
+    Valor que sobe e desce (ex.: tamanho de buffer, downloads em andamento).
+    """
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """
+    Distribuição em buckets fixos, com soma e contagem por conjunto de rótulos.
+
+    Observar custa uma busca binária nos limites; os percentis são estimados
+    por interpolação linear dentro do bucket.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text="", labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                # [contagens por bucket (+Inf no fim), soma, máximo]
+                data = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0.0]
+            data[0][index] += 1
+            data[1] += value
+            if value > data[2]:
+                data[2] = value
+
+    def percentile(self, fraction, **labels):
+        """
+        :return: Estimativa do percentil (0 a 1), ou None sem observações.
+        """
+        with self._lock:
+            data = self._values.get(self._key(labels))
+            if data is None:
+                return None
+            return self._percentile(data, fraction)
+
+    def _percentile(self, data, fraction):
+        counts, _, maximum = data
+        total = sum(counts)
+        if not total:
+            return None
+        target = fraction * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if cumulative + count >= target and count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else maximum
+                position = (target - cumulative) / count
+                return min(lower + (upper - lower) * position, maximum)
+            cumulative += count
+        return maximum
+
+    def snapshot(self):
+        result = []
+        with self._lock:
+            for key, data in self._values.items():
+                counts, total_sum, maximum = data
+                result.append(
+                    {
+                        "labels": dict(zip(self.labelnames, key)),
+                        "count": sum(counts),
+                        "sum": round(total_sum, 6),
+                        "max": round(maximum, 6),
+                        "p50": _round(self._percentile(data, 0.50)),
+                        "p95": _round(self._percentile(data, 0.95)),
+                        "p99": _round(self._percentile(data, 0.99)),
+                    }
+                )
+        return result
+
+    def prometheus(self):
+        lines = self._header()
+        with self._lock:
+            for key, (counts, total_sum, _) in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else repr(bound)
+                    lines.append(
+                        f"{self.name}_bucket{self._label_text(key, [('le', le)])} "
+                        f"{cumulative}"
+                    )
+                labels = self._label_text(key)
+                lines.append(f"{self.name}_sum{labels} {total_sum}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _round(value):
+    return None if value is None else round(value, 6)
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas nomeadas, criadas sob demanda.
+
+    Pedir de novo uma métrica com o mesmo nome devolve a existente; tipo ou
+    rótulos diferentes geram ValueError.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(
+                    name, help_text, labelnames, **kwargs
+                )
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(
+                    f"Métrica '{name}' já registrada como {metric.kind} "
+                    f"com rótulos {metric.labelnames}."
+                )
+            return metric
+
+    def counter(self, name, help_text="", labelnames=()):
+        return self._get(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text="", labelnames=()):
+        return self._get(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text="", labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._get(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def snapshot(self):
+        """
+        :return: Dicionário {nome: {"type", "values"}} serializável em JSON.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {
+            metric.name: {"type": metric.kind, "values": metric.snapshot()}
+            for metric in metrics
+        }
+
+    def prometheus_text(self):
+        """
+        :return: Métricas no formato texto de exposição do Prometheus.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.prometheus())
+        return "\n".join(lines) + "\n"
+
+    def write_snapshot(self, path=METRICS_SNAPSHOT_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {"generated_at": time.time(), "metrics": self.snapshot()}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+# Registro padrão usado pelos decoradores de utils.performance_monitor
+REGISTRY = MetricsRegistry()
+
+
+class MetricsReporter:
+    """
+    Grava snapshots periódicos do registro e, opcionalmente, expõe /metrics
+    no formato do Prometheus em uma porta local.
+    """
+
+    def __init__(
+        self,
+        registry=REGISTRY,
+        snapshot_path=METRICS_SNAPSHOT_PATH,
+        interval=METRICS_SNAPSHOT_INTERVAL,
+        port=METRICS_PORT,
+        host=METRICS_HOST,
+    ):
+        self.registry = registry
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.port = port
+        self.host = host
+        self._task = None
+        self._runner = None
+
+    async def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._write_periodically())
+        if self.port and self._runner is None:
+            app = web.Application()
+            app.router.add_get("/metrics", self._handle_metrics)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+            self.port = self._runner.addresses[0][1]
+            logger.info(f"Métricas expostas em http://{self.host}:{self.port}/metrics")
+
+    async def _write_periodically(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(
+                    self.registry.write_snapshot, self.snapshot_path
+                )
+            except OSError as e:
+                logger.warning(f"Falha ao gravar o snapshot de métricas: {e}")
+
+    async def _handle_metrics(self, request):
+        return web.Response(
+            body=self.registry.prometheus_text().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def close(self):
+        """
+        Encerra o servidor e grava um último snapshot.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self.interval > 0:
+            try:
+                await asyncio.to_thread(
+                    self.registry.write_snapshot, self.snapshot_path
+                )
+            except OSError as e:
+                logger.warning(f"Falha ao gravar o snapshot de métricas: {e}")
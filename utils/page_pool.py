@@ -0,0 +1,130 @@
+# utils/page_pool.py
+
+import asyncio
+import contextlib
+import os
+from urllib.parse import urlparse
+
+from utils.logger import setup_logger
+
+# Configuração do logger
+logger = setup_logger("PagePool")
+
+PAGE_POOL_SIZE = int(os.getenv("SCRAPER_PAGE_POOL_SIZE", "3"))
+PAGE_POOL_WARM = int(os.getenv("SCRAPER_PAGE_POOL_WARM", "1"))
+# Tipos de recurso que as páginas podem carregar; o restante é abortado
+ALLOWED_RESOURCE_TYPES = os.getenv(
+    "SCRAPER_ALLOWED_RESOURCES", "document,script,xhr,fetch"
+).split(",")
+BLOCKED_HOSTS = os.getenv(
+    "SCRAPER_BLOCKED_HOSTS",
+    "google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com",
+).split(",")
+
+
+class PagePool:
+    """
+    Pool limitado de contextos e páginas do Playwright reutilizados entre buscas.
+
+    Cada contexto tem uma única página e bloqueia os recursos que não são
+    usados na extração (imagens, fontes, estilos, analytics).
+    """
+
+    def __init__(
+        self,
+        browser,
+        size=PAGE_POOL_SIZE,
+        allowed_resource_types=ALLOWED_RESOURCE_TYPES,
+        blocked_hosts=BLOCKED_HOSTS,
+    ):
+        self.browser = browser
+        self.size = size
+        self.allowed_resource_types = {t.strip() for t in allowed_resource_types if t}
+        self.blocked_hosts = tuple(h.strip() for h in blocked_hosts if h)
+        self._semaphore = asyncio.Semaphore(size)
+        self._idle = []  # Pares (context, page) prontos para uso
+        self._contexts = set()
+        self.stats = {"created": 0, "reused": 0, "discarded": 0, "blocked_requests": 0}
+
+    async def warm(self, count=PAGE_POOL_WARM):
+        """
+        Cria antecipadamente até `count` páginas ociosas.
+        """
+        while len(self._contexts) < min(count, self.size):
+            self._idle.append(await self._create())
+        logger.debug(f"{len(self._idle)} páginas pré-aquecidas no pool.")
+
+    @contextlib.asynccontextmanager
+    async def page(self):
+        """
+        Empresta uma página do pool, devolvendo-a após a limpeza.
+
+        Se a tarefa for cancelada com a página emprestada (ex.: uma busca
+        substituída por outra), o contexto é fechado em vez de reaproveitado,
+        encerrando a navegação e as requisições pendentes.
+        """
+        async with self._semaphore:
+            if self._idle:
+                context, page = self._idle.pop()
+                self.stats["reused"] += 1
+            else:
+                context, page = await self._create()
+            cancelled = False
+            try:
+                yield page
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                if cancelled:
+                    # shield: o fechamento termina mesmo se houver novo cancelamento
+                    await asyncio.shield(self._discard(context))
+                else:
+                    await self._release(context, page)
+
+    async def _create(self):
+        context = await self.browser.new_context()
+        await context.route("**/*", self._handle_route)
+        page = await context.new_page()
+        self._contexts.add(context)
+        self.stats["created"] += 1
+        logger.debug("Novo contexto do navegador criado para o pool.")
+        return context, page
+
+    async def _release(self, context, page):
+        """
+        Reinicia a página e a devolve ao pool; descarta o contexto se falhar.
+        """
+        try:
+            await page.goto("about:blank")
+            await context.clear_cookies()
+            self._idle.append((context, page))
+            logger.debug("Página devolvida ao pool.")
+        except Exception as e:
+            logger.warning(f"Descartando contexto do pool após falha na limpeza: {e}")
+            await self._discard(context)
+
+    async def _discard(self, context):
+        self.stats["discarded"] += 1
+        self._contexts.discard(context)
+        with contextlib.suppress(Exception):
+            await context.close()
+
+    async def _handle_route(self, route):
+        request = route.request
+        host = urlparse(request.url).hostname or ""
+        if request.resource_type not in self.allowed_resource_types or any(
+            host.endswith(blocked) for blocked in self.blocked_hosts
+        ):
+            self.stats["blocked_requests"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def close(self):
+        for context in list(self._contexts):
+            with contextlib.suppress(Exception):
+                await context.close()
+        self._contexts.clear()
+        self._idle.clear()
+        logger.debug(f"Pool de páginas fechado. Estatísticas: {self.stats}")
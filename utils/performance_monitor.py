@@ -3,47 +3,318 @@
 import time
 import asyncio
 import functools
+import inspect
+import json
+import math
+import os
+from collections import deque
 from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+from utils.tracing import tracer
 
 logger = setup_logger("PerformanceMonitor")
 
+# Amostras guardadas por fase para os percentis (janela deslizante)
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", "500"))
+LATENCY_RECENT_ATTEMPTS = 50
+LATENCY_DUMP_PATH = os.getenv("LATENCY_DUMP_PATH", os.path.join("logs", "latency.json"))
+# Histograma padrão dos decoradores de tempo
+FUNCTION_METRIC = "function_duration_seconds"
 
-def async_timeit(func):
+
+def _timing_setup(func, metric, labels, span_attrs):
+    """
+    Prepara o histograma e a extração dos rótulos a partir dos argumentos.
+
+    :param labels: {rótulo: nome do argumento de func}. Só para valores de
+        cardinalidade limitada: cada valor distinto cria uma série nova.
+    :param span_attrs: {atributo: nome do argumento}, registrados apenas no
+        span (ex.: {"streamer": "streamer_name"}).
+    :return: (histograma, contador de erros, função que extrai (rótulos,
+        atributos do span)). Os rótulos também viram atributos do span.
     """
-    Decorador para medir o tempo de execução de funções assíncronas.
+    labels = labels or {}
+    span_attrs = span_attrs or {}
+    histogram = REGISTRY.histogram(
+        metric,
+        "Duração das funções medidas por async_timeit/timeit_sync.",
+        ("function",) + tuple(labels),
+    )
+    errors = REGISTRY.counter(
+        "function_errors_total",
+        "Exceções levantadas pelas funções medidas.",
+        ("function",),
+    )
+    name = func.__qualname__
+    if not labels and not span_attrs:
+        fixed = {"function": name}
+        return histogram, errors, lambda args, kwargs: (fixed, fixed)
+
+    # Posição de cada argumento resolvida uma vez, fora do caminho quente
+    parameters = list(inspect.signature(func).parameters)
+
+    def resolve(mapping):
+        return [
+            (key, argument, parameters.index(argument))
+            for key, argument in mapping.items()
+        ]
+
+    label_positions = resolve(labels)
+    attr_positions = resolve(span_attrs)
+
+    def read(positions, values, args, kwargs):
+        for key, argument, position in positions:
+            if argument in kwargs:
+                values[key] = kwargs[argument]
+            elif position < len(args):
+                values[key] = args[position]
+        return values
+
+    def extract(args, kwargs):
+        metric_labels = read(label_positions, {"function": name}, args, kwargs)
+        if not attr_positions:
+            return metric_labels, metric_labels
+        return metric_labels, read(attr_positions, dict(metric_labels), args, kwargs)
+
+    return histogram, errors, extract
+
+
+def async_timeit(func=None, *, metric=FUNCTION_METRIC, labels=None, span_attrs=None):
     """
+    Decorador que registra a duração de funções assíncronas no REGISTRY.
+
+    Pode ser usado sem argumentos (@async_timeit) ou com um histograma e
+    rótulos próprios (@async_timeit(metric=..., labels={...})); cada
+    combinação de rótulos precisa de um nome de métrica próprio. Valores de
+    cardinalidade ilimitada (ex.: nome do streamer) vão em `span_attrs`.
+    """
+    if func is None:
+        return functools.partial(
+            async_timeit, metric=metric, labels=labels, span_attrs=span_attrs
+        )
+    histogram, errors, extract = _timing_setup(func, metric, labels, span_attrs)
 
     @functools.wraps(func)
     async def wrapper(*args, **kwargs):
         start_time = time.perf_counter()
+        labels, attrs = extract(args, kwargs)
         try:
-            result = await func(*args, **kwargs)
-            return result
+            with tracer.span(func.__qualname__, **attrs):
+                return await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            errors.inc(function=func.__qualname__)
+            raise
         finally:
-            end_time = time.perf_counter()
-            elapsed = end_time - start_time
-            logger.info(
-                f"Função '{func.__name__}' executada em {elapsed:.4f} segundos."
-            )
+            histogram.observe(time.perf_counter() - start_time, **labels)
 
     return wrapper
 
 
-def timeit_sync(func):
+def timeit_sync(func=None, *, metric=FUNCTION_METRIC, labels=None, span_attrs=None):
     """
-    Decorador para medir o tempo de execução de funções síncronas.
+    Decorador que registra a duração de funções síncronas no REGISTRY.
     """
+    if func is None:
+        return functools.partial(
+            timeit_sync, metric=metric, labels=labels, span_attrs=span_attrs
+        )
+    histogram, errors, extract = _timing_setup(func, metric, labels, span_attrs)
 
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         start_time = time.perf_counter()
+        labels, attrs = extract(args, kwargs)
         try:
-            return func(*args, **kwargs)
+            with tracer.span(func.__qualname__, **attrs):
+                return func(*args, **kwargs)
+        except Exception:
+            errors.inc(function=func.__qualname__)
+            raise
         finally:
-            end_time = time.perf_counter()
-            elapsed = end_time - start_time
-            logger.info(
-                f"Função '{func.__name__}' executada em {elapsed:.4f} segundos."
-            )
+            histogram.observe(time.perf_counter() - start_time, **labels)
 
     return wrapper
+
+
+def percentile(sorted_values, fraction):
+    """
+    Percentil pelo método do posto mais próximo.
+
+    :param sorted_values: Amostras já ordenadas (não vazias).
+    :param fraction: Entre 0 e 1 (ex.: 0.95).
+    """
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class LatencyAttempt:
+    """
+    Uma tentativa medida (ex.: um clique em um VOD até o VLC tocar), com o
+    instante de cada fase concluída.
+    """
+
+    __slots__ = ("kind", "key", "started", "marks", "status")
+
+    def __init__(self, kind, key):
+        self.kind = kind
+        self.key = key
+        self.started = time.perf_counter()
+        self.marks = []  # (fase, instante perf_counter)
+        self.status = None
+
+    def mark(self, phase):
+        """
+        Registra o fim de uma fase; fases repetidas mantêm o primeiro instante.
+        """
+        if self.status is None and all(name != phase for name, _ in self.marks):
+            self.marks.append((phase, time.perf_counter()))
+
+    def phases(self):
+        """
+        :return: Lista de (fase, segundos desde a fase anterior).
+        """
+        durations = []
+        previous = self.started
+        for phase, instant in self.marks:
+            durations.append((phase, instant - previous))
+            previous = instant
+        return durations
+
+    @property
+    def elapsed(self):
+        end = self.marks[-1][1] if self.marks else time.perf_counter()
+        return end - self.started
+
+    def as_dict(self):
+        return {
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status,
+            "total": round(self.elapsed, 4),
+            "phases": {phase: round(seconds, 4) for phase, seconds in self.phases()},
+        }
+
+
+class LatencyTracker:
+    """
+    Agrega as tentativas concluídas em percentis (p50/p95/p99) por fase.
+
+    Só tentativas bem-sucedidas entram nas amostras de tempo; as que
+    falharam ou foram substituídas por outra do mesmo tipo são apenas
+    contadas. Todos os métodos são chamados da thread da interface.
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self._samples = {}  # (tipo, fase) -> deque de segundos
+        self._counts = {}  # tipo -> {status: quantidade}
+        self._active = {}  # tipo -> LatencyAttempt em andamento
+        self.recent = deque(maxlen=LATENCY_RECENT_ATTEMPTS)
+        self._histogram = REGISTRY.histogram(
+            "latency_phase_seconds",
+            "Duração de cada fase das tentativas medidas pelo LatencyTracker.",
+            ("kind", "phase"),
+        )
+
+    def start(self, kind, key=None):
+        """
+        Inicia uma tentativa; a anterior do mesmo tipo é dada como abandonada.
+
+        :return: LatencyAttempt a ser marcado com as fases.
+        """
+        previous = self._active.get(kind)
+        if previous is not None:
+            self.finish(previous, "abandoned")
+        attempt = LatencyAttempt(kind, key)
+        self._active[kind] = attempt
+        return attempt
+
+    def active(self, kind):
+        return self._active.get(kind)
+
+    def finish(self, attempt, status="ok"):
+        """
+        Encerra a tentativa e registra suas fases nas amostras.
+        """
+        if attempt is None or attempt.status is not None:
+            return
+        attempt.status = status
+        if self._active.get(attempt.kind) is attempt:
+            del self._active[attempt.kind]
+        counts = self._counts.setdefault(attempt.kind, {})
+        counts[status] = counts.get(status, 0) + 1
+        self.recent.append(attempt)
+        if status != "ok":
+            logger.debug(f"Tentativa '{attempt.kind}' encerrada como {status}.")
+            return
+        for phase, seconds in attempt.phases() + [("total", attempt.elapsed)]:
+            samples = self._samples.get((attempt.kind, phase))
+            if samples is None:
+                samples = self._samples[(attempt.kind, phase)] = deque(
+                    maxlen=self.window
+                )
+            samples.append(seconds)
+            self._histogram.observe(seconds, kind=attempt.kind, phase=phase)
+        logger.info(
+            f"{attempt.kind} em {attempt.elapsed:.3f}s ("
+            + ", ".join(
+                f"{phase} {seconds:.3f}s" for phase, seconds in attempt.phases()
+            )
+            + ")"
+        )
+
+    def summary(self):
+        """
+        :return: {tipo: {"counts": {...}, "phases": {fase: {count, p50, p95, p99}}}}
+        """
+        result = {
+            kind: {"counts": dict(counts), "phases": {}}
+            for kind, counts in self._counts.items()
+        }
+        for (kind, phase), samples in self._samples.items():
+            values = sorted(samples)
+            result[kind]["phases"][phase] = {
+                "count": len(values),
+                "p50": round(percentile(values, 0.50), 4),
+                "p95": round(percentile(values, 0.95), 4),
+                "p99": round(percentile(values, 0.99), 4),
+            }
+        return result
+
+    def format_summary(self):
+        """
+        :return: Resumo em texto, uma linha por fase, para o painel de depuração.
+        """
+        lines = []
+        for kind, data in sorted(self.summary().items()):
+            counts = ", ".join(f"{k}={v}" for k, v in sorted(data["counts"].items()))
+            lines.append(f"{kind} ({counts})")
+            for phase, stats in data["phases"].items():
+                lines.append(
+                    f"  {phase:<12} n={stats['count']:<4} "
+                    f"p50 {stats['p50'] * 1000:7.0f} ms  "
+                    f"p95 {stats['p95'] * 1000:7.0f} ms  "
+                    f"p99 {stats['p99'] * 1000:7.0f} ms"
+                )
+        return "\n".join(lines) or "Nenhuma medição ainda."
+
+    def dump(self, path=LATENCY_DUMP_PATH):
+        """
+        Grava o resumo e as tentativas recentes em JSON.
+
+        :return: Caminho do arquivo gravado.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {
+            "generated_at": time.time(),
+            "summary": self.summary(),
+            "recent": [attempt.as_dict() for attempt in self.recent],
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        logger.info(f"Medições de latência gravadas em {path}")
+        return path
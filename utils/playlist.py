@@ -0,0 +1,100 @@
+# utils/playlist.py
+
+import re
+from collections import namedtuple
+from urllib.parse import urljoin
+
+# Segmento de uma playlist de mídia: URI absoluta e duração (#EXTINF) em segundos
+Segment = namedtuple("Segment", ["uri", "duration"])
+# Variante de uma master playlist: URI absoluta, banda declarada (bits/s) e resolução
+Variant = namedtuple("Variant", ["uri", "bandwidth", "resolution"])
+
+URI_ATTRIBUTE_PATTERN = re.compile(r'URI="([^"]+)"')
+ATTRIBUTE_PATTERN = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+
+
+def is_master_playlist(text):
+    """
+    Indica se a playlist é uma master playlist (lista de variantes).
+    """
+    return "#EXT-X-STREAM-INF" in text
+
+
+def parse_media_playlist(text, base_url):
+    """
+    Extrai os segmentos de uma playlist de mídia HLS.
+
+    :param text: Conteúdo do arquivo .m3u8.
+    :param base_url: URL da playlist, usada para resolver URIs relativas.
+    :return: Lista de Segment na ordem da playlist.
+    """
+    segments = []
+    duration = 0.0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#EXTINF:"):
+            duration = float(line[len("#EXTINF:") :].split(",", 1)[0])
+        elif not line.startswith("#"):
+            segments.append(Segment(urljoin(base_url, line), duration))
+            duration = 0.0
+    return segments
+
+
+def rewrite_playlist(text, base_url, segment_uri=None):
+    """
+    Reescreve as URIs de uma playlist.
+
+    Atributos URI="..." (chaves, mapas de inicialização) são sempre
+    convertidos em URLs absolutas. As linhas de URI são passadas para
+    `segment_uri(indice, url_absoluta)`; sem essa função viram URLs absolutas.
+
+    :param text: Conteúdo do arquivo .m3u8.
+    :param base_url: URL da playlist, usada para resolver URIs relativas.
+    :param segment_uri: Função opcional que define a nova URI de cada linha de URI.
+    :return: Texto da playlist reescrita.
+    """
+    lines = []
+    index = 0
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("#"):
+            line = URI_ATTRIBUTE_PATTERN.sub(
+                lambda m: f'URI="{urljoin(base_url, m.group(1))}"', line
+            )
+        elif stripped:
+            absolute = urljoin(base_url, stripped)
+            line = segment_uri(index, absolute) if segment_uri else absolute
+            index += 1
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def parse_master_playlist(text, base_url):
+    """
+    Extrai as variantes (#EXT-X-STREAM-INF) de uma master playlist.
+
+    :param text: Conteúdo do arquivo .m3u8.
+    :param base_url: URL da playlist, usada para resolver URIs relativas.
+    :return: Lista de Variant na ordem da playlist.
+    """
+    variants = []
+    attributes = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("#EXT-X-STREAM-INF:"):
+            attributes = dict(
+                (key, value.strip('"'))
+                for key, value in ATTRIBUTE_PATTERN.findall(line.split(":", 1)[1])
+            )
+        elif line and not line.startswith("#") and attributes is not None:
+            variants.append(
+                Variant(
+                    urljoin(base_url, line),
+                    int(attributes.get("BANDWIDTH", 0)),
+                    attributes.get("RESOLUTION"),
+                )
+            )
+            attributes = None
+    return variants
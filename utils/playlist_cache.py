@@ -0,0 +1,179 @@
+# utils/playlist_cache.py
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from utils.logger import setup_logger
+
+# Configuração do logger
+logger = setup_logger("PlaylistCache")
+
+PLAYLIST_CACHE_MAX_BYTES = int(
+    os.getenv("PLAYLIST_CACHE_MAX_BYTES", str(50 * 1024 * 1024))
+)
+INDEX_FILENAME = "index.json"
+
+
+class PlaylistCache:
+    """
+    Cache de playlists endereçado pela URL completa, com remoção LRU por tamanho.
+
+    Cada arquivo é nomeado pelo hash da URL e o índice guarda tamanho, último
+    acesso, URL de origem e os validadores HTTP (ETag/Last-Modified). As
+    escritas usam arquivo temporário + rename, e downloads da mesma URL são
+    serializados por um lock por chave. O tamanho de cada entrada inclui o
+    índice de segmentos (.idx) salvo ao lado da playlist.
+    """
+
+    def __init__(self, cache_dir, max_bytes=PLAYLIST_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, INDEX_FILENAME)
+        self._locks = {}  # chave -> [asyncio.Lock, tarefas usando ou esperando]
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        os.makedirs(cache_dir, exist_ok=True)
+        self.entries = self._load_index()
+
+    @staticmethod
+    def key_for(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+    def path_for(self, url):
+        return os.path.join(self.cache_dir, f"{self.key_for(url)}.m3u8")
+
+    @contextlib.asynccontextmanager
+    async def lock(self, url):
+        """
+        Lock que serializa os downloads concorrentes da mesma URL.
+
+        O lock é descartado quando ninguém mais o usa ou espera por ele.
+        """
+        key = self.key_for(url)
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._locks[key]
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return {}
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Índice do cache de playlists inválido; recriando: {e}")
+            return {}
+        # Descarta entradas cujo arquivo não existe mais
+        return {
+            key: entry
+            for key, entry in entries.items()
+            if os.path.exists(os.path.join(self.cache_dir, f"{key}.m3u8"))
+        }
+
+    def _save_index(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.index_path)
+
+    def lookup(self, url):
+        """
+        :param url: URL de origem da playlist.
+        :return: Entrada do índice ou None se a URL não estiver em cache.
+        """
+        entry = self.entries.get(self.key_for(url))
+        if entry is None or not os.path.exists(self.path_for(url)):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return entry
+
+    def touch(self, url):
+        """
+        Marca a entrada como usada agora (para a ordem LRU) e retorna o caminho.
+        """
+        entry = self.entries.get(self.key_for(url))
+        if entry is not None:
+            entry["last_access"] = time.time()
+            self._save_index()
+        return self.path_for(url)
+
+    def temp_file(self):
+        """
+        Cria um arquivo temporário no diretório do cache para uma nova escrita.
+
+        :return: Tupla (descritor de arquivo, caminho temporário).
+        """
+        return tempfile.mkstemp(dir=self.cache_dir, suffix=".part")
+
+    def commit(self, url, tmp_path, etag=None, last_modified=None):
+        """
+        Move o arquivo temporário para o caminho final e atualiza o índice.
+
+        :return: Caminho final da playlist.
+        """
+        path = self.path_for(url)
+        os.replace(tmp_path, path)
+        self.entries[self.key_for(url)] = {
+            "url": url,
+            "size": os.path.getsize(path),
+            "last_access": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        self._evict(keep=self.key_for(url))
+        self._save_index()
+        return path
+
+    def _entry_bytes(self, key, entry):
+        """
+        Tamanho da playlist mais o do índice de segmentos, se já gravado.
+        """
+        try:
+            sidecar = os.path.getsize(os.path.join(self.cache_dir, f"{key}.idx"))
+        except OSError:
+            sidecar = 0
+        return entry["size"] + sidecar
+
+    def total_bytes(self):
+        return sum(self._entry_bytes(key, entry) for key, entry in self.entries.items())
+
+    def _evict(self, keep=None):
+        """
+        Remove as entradas menos usadas até o cache caber em max_bytes.
+        """
+        sizes = {
+            key: self._entry_bytes(key, entry) for key, entry in self.entries.items()
+        }
+        total = sum(sizes.values())
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(
+            self.entries.items(), key=lambda item: item[1]["last_access"]
+        ):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            # Remove a playlist e o índice de segmentos salvo ao lado dela
+            for suffix in (".m3u8", ".idx"):
+                try:
+                    os.remove(os.path.join(self.cache_dir, f"{key}{suffix}"))
+                except FileNotFoundError:
+                    pass
+            total -= sizes[key]
+            del self.entries[key]
+            self.stats["evictions"] += 1
+            logger.debug(f"Playlist removida do cache (LRU): {entry['url']}")
@@ -0,0 +1,363 @@
+# utils/resilience.py
+
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+import aiohttp
+
+from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+from utils.performance_monitor import percentile
+from utils.tracing import tracer
+
+# Configuração do logger
+logger = setup_logger("Resilience")
+
+# Tentativas por etapa (pesquisa, canal, playlist, segmento) e atrasos entre elas
+STEP_RETRY_ATTEMPTS = int(os.getenv("STEP_RETRY_ATTEMPTS", "3"))
+STEP_RETRY_BASE_DELAY = float(os.getenv("STEP_RETRY_BASE_DELAY", "0.2"))
+STEP_RETRY_MAX_DELAY = float(os.getenv("STEP_RETRY_MAX_DELAY", "2"))
+# Falhas seguidas que abrem o circuito de um host e tempo até tentar de novo
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+# Segunda requisição para as etapas idempotentes que a permitem (0 desativa)
+HEDGED_REQUESTS = os.getenv("HEDGED_REQUESTS", "1") == "1"
+# Atraso da segunda requisição enquanto não há amostras de latência suficientes
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "1.5"))
+
+
+class CircuitOpenError(Exception):
+    """
+    O host falhou seguidamente e as chamadas estão sendo recusadas sem rede.
+    """
+
+
+def is_retryable(error):
+    """
+    Indica se vale tentar de novo: falhas de rede, tempo esgotado, 429 e 5xx.
+    Respostas 4xx dizem que o pedido em si está errado e não são repetidas.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status == 429 or error.status >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+class RetryPolicy:
+    """
+    Número de tentativas e backoff exponencial com jitter completo: o atraso
+    da tentativa n é sorteado entre 0 e min(max_delay, base_delay * 2**(n-1)).
+    """
+
+    def __init__(
+        self,
+        attempts=STEP_RETRY_ATTEMPTS,
+        base_delay=STEP_RETRY_BASE_DELAY,
+        max_delay=STEP_RETRY_MAX_DELAY,
+    ):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        return random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        )
+
+
+class AdaptiveTimeout:
+    """
+    Tempo limite derivado das latências observadas de uma etapa.
+
+    O limite é o percentil `fraction` das durações recentes vezes
+    `multiplier`, restrito a [floor, ceiling]; com menos de `min_samples`
+    amostras vale `ceiling`. Tentativas que esgotam o tempo entram como
+    amostras do próprio limite, para que ele suba se a rede piorar.
+    """
+
+    def __init__(
+        self,
+        floor,
+        ceiling,
+        fraction=0.95,
+        multiplier=3.0,
+        window=200,
+        min_samples=10,
+    ):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.fraction = fraction
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction):
+        """
+        :return: Percentil das durações recentes, ou None com poucas amostras.
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        return percentile(sorted(self._samples), fraction)
+
+    @property
+    def value(self):
+        observed = self.percentile(self.fraction)
+        if observed is None:
+            return self.ceiling
+        return min(self.ceiling, max(self.floor, observed * self.multiplier))
+
+    @property
+    def hedge_delay(self):
+        """
+        Espera antes da segunda requisição: o próprio percentil observado,
+        de modo que só a cauda lenta é duplicada.
+        """
+        observed = self.percentile(self.fraction)
+        return HEDGE_DEFAULT_DELAY if observed is None else observed
+
+
+class CircuitBreaker:
+    """
+    Disjuntor de um host: após `failure_threshold` falhas seguidas as chamadas
+    são recusadas com CircuitOpenError por `reset_timeout` segundos. Passado
+    esse tempo uma única chamada de teste é liberada e as demais continuam
+    recusadas até ela terminar; um sucesso fecha o circuito e uma nova falha
+    o reabre imediatamente.
+    """
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=BREAKER_RESET_TIMEOUT,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False  # Chamada de teste do estado half_open em andamento
+        self._gauge = REGISTRY.gauge(
+            "circuit_open", "1 quando o circuito do host está aberto.", ("host",)
+        )
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_call(self):
+        """
+        Deve ser seguido de release(probe) quando a chamada terminar.
+
+        :return: True se a chamada é o teste do estado half_open.
+        :raises CircuitOpenError: Se o circuito estiver aberto ou se outra
+            chamada de teste estiver em andamento.
+        """
+        state = self.state
+        if state == "open":
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+            raise CircuitOpenError(
+                f"{self.name} indisponível; novas tentativas em {remaining:.0f}s."
+            )
+        if state == "half_open":
+            if self._probing:
+                raise CircuitOpenError(
+                    f"{self.name} indisponível; aguardando a chamada de teste."
+                )
+            self._probing = True
+            return True
+        return False
+
+    def release(self, probe):
+        """
+        Libera a vaga de teste ocupada por uma chamada que terminou, com
+        qualquer resultado (inclusive erro não repetível ou cancelamento).
+        """
+        if probe:
+            self._probing = False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info(f"Circuito de '{self.name}' fechado.")
+            self._gauge.set(0, host=self.name)
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                logger.warning(
+                    f"Circuito de '{self.name}' aberto após {self.failures} falhas "
+                    f"seguidas; chamadas recusadas por {self.reset_timeout:.0f}s."
+                )
+            self.opened_at = time.monotonic()
+            self._gauge.set(1, host=self.name)
+
+
+# Disjuntores compartilhados por host (pesquisa e canal dividem o do site)
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(url):
+    """
+    Retorna o disjuntor do host da URL, criando-o na primeira chamada.
+    """
+    host = urlparse(url).hostname or url
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+class Step:
+    """
+    Política de uma etapa de rede: novas tentativas só da própria etapa,
+    tempo limite adaptativo, disjuntor do host e, nas etapas idempotentes,
+    uma segunda requisição ("hedge") quando a primeira passa do percentil
+    observado. A resposta que chegar primeiro é usada e a outra é cancelada.
+
+    Com `timeout=None` a etapa não limita a chamada inteira e o tempo fica a
+    cargo da própria corrotina (ex.: `sock_read` em downloads para arquivo).
+    Com `breaker=False` as falhas da etapa não abrem nem consultam o
+    disjuntor do host. `retryable` decide quais erros são repetidos (e
+    contam como falha no disjuntor).
+    """
+
+    def __init__(
+        self,
+        name,
+        timeout,
+        retry=None,
+        hedge=False,
+        breaker=True,
+        retryable=is_retryable,
+        registry=REGISTRY,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.hedge = hedge
+        self.breaker = breaker
+        self.retryable = retryable
+        self._attempts = registry.counter(
+            "step_attempts_total",
+            "Tentativas por etapa de rede e resultado.",
+            ("step", "outcome"),
+        )
+        self._hedges = registry.counter(
+            "step_hedges_total",
+            "Segundas requisições disparadas, por etapa e vencedora.",
+            ("step", "winner"),
+        )
+        self._timeout_gauge = registry.gauge(
+            "step_timeout_seconds", "Tempo limite atual por etapa.", ("step",)
+        )
+
+    async def run(self, url, factory, hedge=None):
+        """
+        Executa `factory()` (corrotina nova a cada chamada) sob a política.
+
+        O tempo limite dobra a cada nova tentativa, até o teto da etapa.
+
+        :param url: URL do recurso; escolhe o disjuntor do host.
+        :param hedge: Sobrepõe o hedge da etapa nesta chamada (ex.: False
+            quando duas requisições escreveriam no mesmo arquivo).
+        :return: Resultado da primeira tentativa bem-sucedida.
+        :raises CircuitOpenError: Se o host estiver com o circuito aberto.
+        """
+        breaker = breaker_for(url) if self.breaker else None
+        for attempt in range(1, self.retry.attempts + 1):
+            probe = breaker.before_call() if breaker else False
+            limit = self._limit(attempt)
+            if limit is not None:
+                self._timeout_gauge.set(round(limit, 3), step=self.name)
+            started = time.perf_counter()
+            try:
+                try:
+                    with tracer.span(f"step.{self.name}", attempt=attempt):
+                        result = await self._attempt(factory, limit, hedge)
+                finally:
+                    if breaker:
+                        breaker.release(probe)
+            except Exception as e:
+                if not self.retryable(e):
+                    self._attempts.inc(step=self.name, outcome="error")
+                    raise
+                if isinstance(e, asyncio.TimeoutError) and limit is not None:
+                    self.timeout.record(limit)
+                if breaker:
+                    breaker.record_failure()
+                if attempt == self.retry.attempts:
+                    self._attempts.inc(step=self.name, outcome="failed")
+                    raise
+                self._attempts.inc(step=self.name, outcome="retry")
+                delay = self.retry.delay(attempt)
+                logger.warning(
+                    "Etapa '%s' falhou (tentativa %d de %d): %r. Nova tentativa em %.2fs.",
+                    self.name,
+                    attempt,
+                    self.retry.attempts,
+                    e,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                continue
+            if self.timeout is not None:
+                self.timeout.record(time.perf_counter() - started)
+            if breaker:
+                breaker.record_success()
+            self._attempts.inc(step=self.name, outcome="ok")
+            return result
+
+    def _limit(self, attempt):
+        if self.timeout is None:
+            return None
+        return min(self.timeout.ceiling, self.timeout.value * 2 ** (attempt - 1))
+
+    async def _attempt(self, factory, limit, hedge):
+        if hedge is None:
+            hedge = self.hedge
+        if self.timeout is None:
+            hedge = False  # Sem amostras de latência não há atraso de hedge
+        if not (hedge and HEDGED_REQUESTS):
+            return await asyncio.wait_for(factory(), limit)
+
+        primary = asyncio.ensure_future(asyncio.wait_for(factory(), limit))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.timeout.hedge_delay)
+            if done:
+                return primary.result()
+            logger.debug("Etapa '%s' lenta; disparando segunda requisição.", self.name)
+            tasks.append(asyncio.ensure_future(asyncio.wait_for(factory(), limit)))
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                succeeded = [task for task in done if task.exception() is None]
+                if succeeded:
+                    winner = "primary" if succeeded[0] is primary else "hedge"
+                    self._hedges.inc(step=self.name, winner=winner)
+                    return succeeded[0].result()
+                error = error or next(iter(done)).exception()
+            self._hedges.inc(step=self.name, winner="none")
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
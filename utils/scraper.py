@@ -1,26 +1,130 @@
 # utils/scraper.py
 
+import argparse
 import asyncio
+import contextlib
+import json
 import logging
-import random
-import re
-from bs4 import BeautifulSoup
+import os
+import sys
+import time
+
+import aiohttp
 from playwright.async_api import (
+    Error as PlaywrightError,
     TimeoutError as PlaywrightTimeoutError,
     async_playwright,
 )
 
 from utils.logger import setup_logger
-from utils.performance_monitor import async_timeit  # Importar o decorador
+from utils.page_pool import PAGE_POOL_SIZE, PagePool
+from utils.performance_monitor import async_timeit, timeit_sync  # Decoradores
+from utils.resilience import AdaptiveTimeout, CircuitOpenError, Step, is_retryable
+from utils.streamer_index import StreamerIndex
+from utils.tracing import tracer
+from utils.vod_cache import VODCache
+from utils.vod_parser import (
+    BASE_URL,
+    CHANNEL_PAGE_JS,
+    extrair_link_canal,
+    extrair_pagina_canal,
+    montar_vods,
+)
 
 # Configuração do logger
 logger = setup_logger("Scraper")
 
+# Modo de busca: "http" tenta o HTML estático primeiro e recorre ao navegador
+# apenas quando não há resultados; "browser" usa sempre o Playwright
+FETCH_MODE = os.getenv("SCRAPER_FETCH_MODE", "http").lower()
+# Extração no navegador: "page" extrai os VODs dentro da página; "html"
+# serializa o DOM com page.content() e o analisa em Python
+EXTRACTION_MODE = os.getenv("SCRAPER_EXTRACTION_MODE", "page").lower()
+# Inicialização do navegador: "background" lança o Chromium logo após a janela
+# ser exibida; "lazy" adia o lançamento até a primeira busca que precisar dele
+BROWSER_STARTUP = os.getenv("SCRAPER_BROWSER_STARTUP", "background").lower()
+# Tamanho dos lotes gerados por stream_vods_async e limite de páginas do canal
+STREAM_BATCH_SIZE = int(os.getenv("SCRAPER_STREAM_BATCH_SIZE", "50"))
+MAX_CHANNEL_PAGES = int(os.getenv("SCRAPER_MAX_CHANNEL_PAGES", "20"))
+BATCH_CONCURRENCY = int(os.getenv("SCRAPER_BATCH_CONCURRENCY", "4"))
+# Teto e piso do tempo limite adaptativo das páginas buscadas via HTTP
+HTTP_TIMEOUT = float(os.getenv("SCRAPER_HTTP_TIMEOUT", "10"))
+HTTP_TIMEOUT_FLOOR = float(os.getenv("SCRAPER_HTTP_TIMEOUT_FLOOR", "1"))
+# Espera pelos links de canal ou de VOD depois que a página carrega (ms)
+BROWSER_SELECTOR_TIMEOUT = int(os.getenv("SCRAPER_BROWSER_SELECTOR_TIMEOUT", "10000"))
+HTTP_LIMIT_PER_HOST = int(os.getenv("SCRAPER_HTTP_LIMIT_PER_HOST", "4"))
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml",
+}
+
+
+def _is_browser_retryable(error):
+    """
+    Além das falhas de rede, repete as do Playwright (navegação que falha ou
+    expira, página ou contexto fechados).
+    """
+    return isinstance(error, PlaywrightError) or is_retryable(error)
+
 
 class Scraper:
-    def __init__(self):
+    def __init__(
+        self,
+        fetch_mode=FETCH_MODE,
+        cache=None,
+        use_cache=True,
+        extraction_mode=EXTRACTION_MODE,
+        use_index=True,
+        page_pool_size=PAGE_POOL_SIZE,
+        http_limit_per_host=HTTP_LIMIT_PER_HOST,
+    ):
         self.playwright = None
         self.browser = None
+        self.page_pool = None
+        self.page_pool_size = page_pool_size
+        self.http_session = None
+        self.http_limit_per_host = http_limit_per_host
+        self.fetch_mode = fetch_mode
+        self.extraction_mode = extraction_mode
+
+        # Estado do navegador: "idle", "warming", "ready" ou "failed"
+        self.state = "idle"
+        self._init_task = None
+        self._state_listeners = []
+
+        # Cache persistente das buscas e tarefas de atualização em segundo plano
+        self.cache = cache if cache is not None else (VODCache() if use_cache else None)
+        self._refresh_tasks = {}
+
+        # Índice local de streamers para pular a página de pesquisa
+        self.streamer_index = StreamerIndex() if use_index else None
+
+        # Métrica de qual caminho atendeu cada busca (ex.: "http", "http+browser", "index+http")
+        self.last_fetch_path = None
+        self.last_fetch_paths = {}  # Último caminho por streamer
+        self.fetch_path_counts = {}
+
+        # Políticas por etapa: uma falha na página do canal não repete a pesquisa
+        self.search_step = Step(
+            "search",
+            AdaptiveTimeout(floor=HTTP_TIMEOUT_FLOOR, ceiling=HTTP_TIMEOUT),
+            hedge=True,
+        )
+        self.channel_step = Step(
+            "channel",
+            AdaptiveTimeout(floor=HTTP_TIMEOUT_FLOOR, ceiling=HTTP_TIMEOUT),
+            hedge=True,
+        )
+        # No navegador o tempo limite fica com o Playwright (navegação e seletores)
+        self.browser_search_step = Step(
+            "browser_search", None, retryable=_is_browser_retryable
+        )
+        self.browser_channel_step = Step(
+            "browser_channel", None, retryable=_is_browser_retryable
+        )
 
     @async_timeit
     async def initialize(self):
@@ -28,154 +132,597 @@ class Scraper:
         self.playwright = await async_playwright().start()
         self.browser = await self.playwright.chromium.launch(headless=True)
         logger.debug("Navegador Playwright lançado com sucesso.")
+        self.page_pool = PagePool(self.browser, size=self.page_pool_size)
+        await self.page_pool.warm()
+
+    def add_state_listener(self, callback):
+        """
+        Registra um callback chamado com o novo estado do navegador.
+        """
+        self._state_listeners.append(callback)
+
+    def _set_state(self, state):
+        self.state = state
+        logger.debug(f"Estado do scraper: {state}")
+        for callback in self._state_listeners:
+            try:
+                callback(state)
+            except Exception:
+                logger.exception("Erro em um listener de estado do scraper.")
+
+    def start_background(self):
+        """
+        Inicia o lançamento do navegador em segundo plano, se ainda não iniciado.
+
+        :return: Tarefa que resulta em True quando o navegador está pronto.
+        """
+        if self._init_task is None and self.browser is None:
+            # Lançamento compartilhado entre as buscas: fora do trace de quem pediu
+            with tracer.detached():
+                self._init_task = asyncio.create_task(self._initialize_in_background())
+        return self._init_task
+
+    async def _initialize_in_background(self):
+        self._set_state("warming")
+        try:
+            await self.initialize()
+        except Exception:
+            logger.exception("Falha ao inicializar o navegador Playwright.")
+            await self._close_browser()
+            self._init_task = None  # Permite nova tentativa na próxima busca
+            self._set_state("failed")
+            return False
+        self._set_state("ready")
+        return True
+
+    async def ensure_browser(self):
+        """
+        Garante que o navegador esteja pronto, lançando-o se necessário.
+
+        :return: True se o navegador estiver disponível.
+        """
+        if self.page_pool is not None:
+            return True
+        task = self.start_background()
+        # shield: cancelar uma busca não deve interromper o lançamento compartilhado
+        return await asyncio.shield(task)
 
     @async_timeit
     async def close(self):
         logger.info("Fechando o navegador Playwright.")
+        if self._init_task and not self._init_task.done():
+            self._init_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._init_task
+        for task in self._refresh_tasks.values():
+            task.cancel()
+        if self.cache:
+            self.cache.close()
+        if self.streamer_index is not None:
+            self.streamer_index.close()
+        if self.http_session and not self.http_session.closed:
+            await self.http_session.close()
+        await self._close_browser()
+
+    async def _close_browser(self):
+        if self.page_pool:
+            await self.page_pool.close()
+            self.page_pool = None
         if self.browser:
             await self.browser.close()
+            self.browser = None
         if self.playwright:
             await self.playwright.stop()
+            self.playwright = None
 
-    @async_timeit
-    async def scrape_vods_async(self, streamer_name, retries=3):
+    @async_timeit(
+        metric="scrape_vods_async_seconds", span_attrs={"streamer": "streamer_name"}
+    )
+    async def scrape_vods_async(self, streamer_name, on_update=None):
         """
         Realiza scraping dos VODs de um streamer específico de forma assíncrona.
 
+        Se houver resultado em cache ele é retornado imediatamente; quando
+        desatualizado, uma atualização em segundo plano mescla os VODs novos e
+        chama on_update com a lista mesclada.
+
         :param streamer_name: Nome do streamer a ser pesquisado.
-        :param retries: Número de tentativas em caso de falha.
+        :param on_update: Callback opcional (streamer_name, vods) chamado após a atualização.
         :return: Lista de dicionários com informações dos VODs.
         """
-        for attempt in range(1, retries + 1):
-            logger.info(
-                f"Tentativa {attempt} de {retries} para scraping do streamer '{streamer_name}'."
-            )
-            try:
-                # Tenta realizar o scraping
-                result = await self.realizar_scraping(streamer_name)
-                logger.debug(
-                    f"Scraping realizado com sucesso para o streamer '{streamer_name}' na tentativa {attempt}."
-                )
-                return result
-            except Exception as e:
-                # Captura qualquer exceção e faz uma nova tentativa após um tempo de espera
-                logger.exception(f"Erro na tentativa {attempt} para scraping: {e}")
-                sleep_time = random.uniform(1, 5) * (
-                    2 ** (attempt - 1)
-                )  # Estratégia de backoff exponencial
+        vods = []
+        async for batch in self.stream_vods_async(streamer_name, on_update):
+            vods.extend(batch)
+        return vods
+
+    async def stream_vods_async(
+        self,
+        streamer_name,
+        on_update=None,
+        batch_size=STREAM_BATCH_SIZE,
+    ):
+        """
+        Variante incremental de scrape_vods_async: gera os VODs em lotes à
+        medida que são encontrados, inclusive nas páginas seguintes do canal.
+
+        Falhas de rede são repetidas dentro de cada etapa (ver
+        utils.resilience.Step); esgotadas as tentativas de uma etapa, o erro é
+        propagado em vez de virar uma lista vazia. Com o circuito do site
+        aberto, a busca falha de imediato com CircuitOpenError.
+
+        :param streamer_name: Nome do streamer a ser pesquisado.
+        :param on_update: Callback opcional (streamer_name, vods) chamado após a atualização.
+        :param batch_size: Número máximo de VODs por lote.
+        :return: Gerador assíncrono de listas de VODs.
+        """
+        if self.cache:
+            cached = self.cache.get(streamer_name)
+            if cached:
+                cached_vods, is_stale = cached
                 logger.info(
-                    f"Aguardando {sleep_time:.2f} segundos antes de tentar novamente."
+                    f"{len(cached_vods)} VODs do streamer '{streamer_name}' servidos do cache."
                 )
-                await asyncio.sleep(sleep_time)  # Aguarda antes de tentar novamente
+                if is_stale:
+                    self._schedule_refresh(streamer_name, cached_vods, on_update)
+                for start in range(0, len(cached_vods), batch_size):
+                    yield cached_vods[start : start + batch_size]
+                return
+
+        vods = []
+        try:
+            async for batch in self.iter_vods(streamer_name, batch_size):
+                vods.extend(batch)
+                yield batch
+        except CircuitOpenError as e:
+            logger.error(f"Scraping de '{streamer_name}' interrompido: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Falha no scraping do streamer '{streamer_name}': {e!r}")
+            raise
+
+        if vods and self.cache:
+            self.cache.put(streamer_name, vods)
 
-        # Se todas as tentativas falharem, registra um erro
-        logger.error(
-            f"Falha ao realizar scraping para o streamer '{streamer_name}' após {retries} tentativas."
+    async def scrape_batch(self, streamer_names, concurrency=BATCH_CONCURRENCY):
+        """
+        Faz o scraping de vários streamers com concorrência limitada.
+
+        Os resultados são produzidos à medida que cada streamer termina, na
+        ordem de conclusão, e também atualizam o cache de buscas.
+
+        :param streamer_names: Nomes dos streamers.
+        :param concurrency: Número máximo de streamers processados ao mesmo tempo.
+        :return: Gerador assíncrono de dicionários com 'streamer', 'vods',
+            'latency', 'path' e 'error'.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def scrape_one(streamer_name):
+            async with semaphore:
+                start_time = time.perf_counter()
+                result = {"streamer": streamer_name, "vods": [], "error": None}
+                try:
+                    result["vods"] = await self.realizar_scraping(streamer_name)
+                    if result["vods"] and self.cache:
+                        self.cache.put(streamer_name, result["vods"])
+                    elif not result["vods"]:
+                        result["error"] = "Nenhum VOD encontrado"
+                except Exception as e:
+                    logger.exception(f"Erro no scraping em lote de '{streamer_name}'.")
+                    result["error"] = str(e)
+                result["latency"] = round(time.perf_counter() - start_time, 4)
+                result["path"] = self.last_fetch_paths.get(streamer_name)
+                return result
+
+        tasks = [asyncio.create_task(scrape_one(name)) for name in streamer_names]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _schedule_refresh(self, streamer_name, cached_vods, on_update):
+        """
+        Agenda a atualização em segundo plano de uma entrada desatualizada do cache.
+        """
+        key = streamer_name.strip().lower()
+        if key in self._refresh_tasks:
+            logger.debug(f"Atualização de '{streamer_name}' já em andamento.")
+            return
+        task = asyncio.create_task(
+            self._refresh_cached(streamer_name, cached_vods, on_update)
         )
-        return []
+        self._refresh_tasks[key] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(key, None))
 
-    @async_timeit
+    async def _refresh_cached(self, streamer_name, cached_vods, on_update):
+        """
+        Refaz o scraping de um streamer em cache e mescla os VODs novos.
+        """
+        logger.info(f"Atualizando em segundo plano o cache de '{streamer_name}'.")
+        try:
+            vods = await self.realizar_scraping(streamer_name)
+            if not vods:
+                return
+            merged = self.cache.merge(streamer_name, vods, cached_vods)
+            new_count = len(merged) - len(cached_vods)
+            logger.info(
+                f"Cache de '{streamer_name}' atualizado com {new_count} VODs novos."
+            )
+            if on_update and merged != cached_vods:
+                on_update(streamer_name, merged)
+        except asyncio.CancelledError:
+            logger.debug(f"Atualização do cache de '{streamer_name}' cancelada.")
+        except CircuitOpenError as e:
+            logger.warning(f"Atualização do cache de '{streamer_name}' adiada: {e}")
+        except Exception:
+            logger.exception(f"Erro ao atualizar o cache de '{streamer_name}'.")
+
+    @async_timeit(
+        metric="realizar_scraping_seconds", span_attrs={"streamer": "streamer_name"}
+    )
     async def realizar_scraping(self, streamer_name):
         """
         Realiza o processo de scraping para um streamer específico.
 
+        Streamers já presentes no índice local vão direto à página do canal.
+        No modo "http" cada etapa tenta primeiro o HTML estático via HTTP e só
+        recorre ao Playwright quando ele não traz resultados.
+
         :param streamer_name: Nome do streamer a ser pesquisado.
         :return: Lista de dicionários com informações dos VODs.
         """
+        vod_list = []
+        async for batch in self.iter_vods(streamer_name):
+            vod_list.extend(batch)
+        return vod_list
+
+    async def iter_vods(self, streamer_name, batch_size=STREAM_BATCH_SIZE):
+        """
+        Gera os VODs de um streamer em lotes, página a página do canal.
+
+        :param streamer_name: Nome do streamer a ser pesquisado.
+        :param batch_size: Número máximo de VODs por lote.
+        :return: Gerador assíncrono de listas de VODs.
+        """
         logger.info(f"Iniciando scraping para o streamer: '{streamer_name}'.")
-        search_url = f"https://vodvod.top/search/{streamer_name}"
-        logger.debug(f"Acessando URL de pesquisa: {search_url}")
 
-        page = await self.browser.new_page()
-        try:
-            await page.goto(search_url)  # Navega até a URL de pesquisa
-            logger.debug("Página de pesquisa carregada.")
+        indexed_url = (
+            self.streamer_index.lookup(streamer_name)
+            if self.streamer_index is not None
+            else None
+        )
+        if indexed_url:
+            logger.info(f"Canal encontrado no índice local: {indexed_url}")
+            found = False
+            async for batch in self._iter_channel_vods(
+                streamer_name, indexed_url, "index", batch_size
+            ):
+                found = True
+                yield batch
+            if found:
+                return
+            # Uma falha passageira não tira o canal do índice: ele só sai se a
+            # página carregar sem VODs ou se a pesquisa apontar outro canal
+            logger.info("Canal do índice local sem VODs; refazendo a pesquisa.")
+            if await self._canal_vazio(indexed_url):
+                logger.info(f"Canal sem VODs removido do índice local: {indexed_url}")
+                self.streamer_index.remove_channel(indexed_url)
 
-            # Aguardar até que os elementos de canal estejam presentes
-            await page.wait_for_selector("a[href*='/channels/@']", timeout=10000)
-            logger.debug("Elementos de canal encontrados na página de pesquisa.")
+        # Passo 1 e 2: Obter a página de pesquisa e extrair o link do canal
+        channel_url, search_path = await self._resolve_channel_url(streamer_name)
+        if not channel_url:
+            return
+        if indexed_url and channel_url != indexed_url:
+            self.streamer_index.remove_channel(indexed_url)
 
-            # Obter o HTML da página de pesquisa
-            search_page_html = await page.content()
-            logger.debug("Obtido HTML da página de pesquisa.")
-        except PlaywrightTimeoutError:
-            # Trata o caso de tempo limite ao esperar pelos elementos
+        # Passo 3: Acessar as páginas do canal e extrair os VODs
+        found = False
+        async for batch in self._iter_channel_vods(
+            streamer_name, channel_url, search_path, batch_size
+        ):
+            found = True
+            yield batch
+
+        if found and self.streamer_index is not None:
+            self.streamer_index.add(streamer_name, channel_url)
+
+    async def _iter_channel_vods(
+        self, streamer_name, channel_url, first_path, batch_size
+    ):
+        """
+        Percorre as páginas do canal (seguindo rel="next") gerando os VODs em lotes.
+
+        :param streamer_name: Nome do streamer pesquisado.
+        :param channel_url: URL da primeira página do canal.
+        :param first_path: Caminho que resolveu a URL do canal ("index", "http" ou "browser").
+        :param batch_size: Número máximo de VODs por lote.
+        :return: Gerador assíncrono de listas de VODs.
+        """
+        paths = [first_path]
+        seen = set()
+        visited = set()
+        page_url = channel_url
+        for page_number in range(1, MAX_CHANNEL_PAGES + 1):
+            visited.add(page_url)
+            vods, next_url, path = await self._get_channel_vods(page_url)
+            vods = [vod for vod in vods if vod["link"] not in seen]
+            if not vods:
+                break
+            paths.append(path)
+            seen.update(vod["link"] for vod in vods)
+            for start in range(0, len(vods), batch_size):
+                yield vods[start : start + batch_size]
+
+            if not next_url or next_url in visited:
+                break
+            logger.debug(
+                "Seguindo para a página %d do canal: %s", page_number + 1, next_url
+            )
+            page_url = next_url
+
+        if seen:
+            self._registrar_caminho(streamer_name, paths, len(seen))
+
+    async def _canal_vazio(self, channel_url):
+        """
+        Confirma que a página do canal carrega e não tem nenhum VOD.
+
+        :return: False também quando a página não pôde ser carregada.
+        """
+        channel_page_html = await self._fetch_html(channel_url, self.channel_step)
+        if not channel_page_html:
+            return False
+        vod_list, _ = self._extrair_pagina_canal(channel_page_html, channel_url)
+        return not vod_list
+
+    @async_timeit
+    async def _resolve_channel_url(self, streamer_name):
+        """
+        Obtém a URL do canal pela página de pesquisa.
+
+        :param streamer_name: Nome do streamer a ser pesquisado.
+        :return: Tupla (URL do canal ou None, caminho usado).
+        """
+        if self.fetch_mode == "http":
+            channel_url = await self._get_channel_url_http(streamer_name)
+            if channel_url:
+                return channel_url, "http"
+        return await self._get_channel_url_browser(streamer_name), "browser"
+
+    @async_timeit
+    async def _get_channel_vods(self, channel_url):
+        """
+        Obtém os VODs de uma página do canal.
+
+        :param channel_url: URL da página do canal.
+        :return: Tupla (lista de VODs, URL da próxima página ou None, caminho usado).
+        """
+        if self.fetch_mode == "http":
+            vod_list, next_url = await self._get_vods_http(channel_url)
+            if vod_list:
+                return vod_list, next_url, "http"
+        logger.debug(f"Acessando página do canal: {channel_url}")
+        vod_list, next_url = await self._get_vods_browser(channel_url)
+        return vod_list, next_url, "browser"
+
+    async def _get_channel_url_http(self, streamer_name):
+        """
+        Busca o link do canal no HTML estático da página de pesquisa.
+
+        :param streamer_name: Nome do streamer a ser pesquisado.
+        :return: URL do canal ou None se o HTML estático não contiver o link.
+        """
+        search_url = f"{BASE_URL}/search/{streamer_name}"
+        search_page_html = await self._fetch_html(search_url, self.search_step)
+        if not search_page_html:
+            return None
+        channel_url = self._extrair_link_canal(search_page_html)
+        if channel_url:
+            logger.info(f"Encontrado canal via HTTP: {channel_url}")
+        else:
+            logger.debug("Nenhum link de canal no HTML estático da pesquisa.")
+        return channel_url
+
+    async def _get_vods_http(self, channel_url):
+        """
+        Extrai os VODs do HTML estático da página do canal.
+
+        :param channel_url: URL da página do canal.
+        :return: Tupla (lista de VODs, URL da próxima página ou None); a lista
+            fica vazia se o HTML estático não contiver VODs.
+        """
+        channel_page_html = await self._fetch_html(channel_url, self.channel_step)
+        if not channel_page_html:
+            return [], None
+        vod_list, next_url = self._extrair_pagina_canal(channel_page_html, channel_url)
+        if not vod_list:
+            logger.debug("Nenhum VOD no HTML estático da página do canal.")
+        return vod_list, next_url
+
+    async def _get_channel_url_browser(self, streamer_name):
+        """
+        Carrega a página de pesquisa no navegador e extrai o link do canal.
+
+        Falhas de navegação são repetidas por browser_search_step e, esgotadas
+        as tentativas, propagadas.
+
+        :param streamer_name: Nome do streamer a ser pesquisado.
+        :return: URL do canal ou None se a pesquisa não trouxer nenhum canal.
+        :raises CircuitOpenError: Se o site estiver com o circuito aberto.
+        """
+        await self._require_browser()
+        search_url = f"{BASE_URL}/search/{streamer_name}"
+        logger.debug(f"Acessando URL de pesquisa: {search_url}")
+        search_page_html = await self.browser_search_step.run(
+            search_url, lambda: self._load_search_page(search_url)
+        )
+
+        channel_url = self._extrair_link_canal(search_page_html)
+        if not channel_url:
+            # Se nenhum canal for encontrado, registra um aviso
             logger.warning(
-                "Tempo limite atingido ao aguardar os elementos de canal na página de pesquisa."
+                f"Nenhum canal encontrado para o streamer '{streamer_name}'."
             )
-            return []
-        except Exception as e:
-            # Captura qualquer outra exceção durante a navegação
-            logger.exception(f"Erro inesperado ao aguardar os elementos de canal: {e}")
-            return []
-        finally:
-            await page.close()
-            logger.debug("Página de pesquisa fechada.")
+            return None
+        logger.info(f"Encontrado canal: {channel_url}")
+        return channel_url
+
+    async def _load_search_page(self, search_url):
+        async with self.page_pool.page() as page:
+            await self._goto(page, search_url)  # Navega até a URL de pesquisa
+            logger.debug("Página de pesquisa carregada.")
+            if await self._wait_for(page, "a[href*='/channels/@']"):
+                logger.debug("Elementos de canal encontrados na página de pesquisa.")
+            else:
+                logger.debug("Página de pesquisa carregada sem elementos de canal.")
+
+            # Obter o HTML da página de pesquisa
+            with tracer.span("page.content"):
+                return await page.content()
 
-        # Passo 2: Extrair o link do canal
+    @timeit_sync
+    def _extrair_link_canal(self, search_page_html):
+        """
+        Extrai o link do canal do HTML da página de pesquisa.
+
+        :param search_page_html: HTML da página de pesquisa.
+        :return: URL absoluta do canal ou None se não houver link.
+        """
         try:
             logger.debug("Iniciando extração do link do canal.")
-            search_soup = BeautifulSoup(
-                search_page_html, "html.parser"
-            )  # Analisa o HTML da página de pesquisa
-            channel_link_tag = search_soup.find(
-                "a", href=lambda href: href and "/channels/@" in href
-            )
-            if not channel_link_tag:
-                # Se nenhum canal for encontrado, registra um aviso
-                logger.warning(
-                    f"Nenhum canal encontrado para o streamer '{streamer_name}'."
-                )
-                return []
-            channel_url = f"https://vodvod.top{channel_link_tag['href']}"
-            logger.info(f"Encontrado canal: {channel_url}")
+            return extrair_link_canal(search_page_html)
         except Exception as e:
             # Captura qualquer exceção durante a extração do link do canal
             logger.exception(
                 f"Erro ao extrair o link do canal na página de pesquisa: {e}"
             )
-            return []
+            return None
 
-        # Passo 3: Acessar a página do canal e extrair os VODs
-        logger.debug(f"Acessando página do canal: {channel_url}")
-        channel_page_html = await self._get_channel_page_html(channel_url)
-        if not channel_page_html:
-            return []
+    @timeit_sync
+    def _extrair_pagina_canal(self, channel_page_html, channel_url):
+        """
+        Extrai os VODs e o link da próxima página do HTML da página do canal.
 
-        # Analisar a página do canal para extrair os VODs
+        :param channel_page_html: HTML da página do canal.
+        :param channel_url: URL da página, para resolver links relativos.
+        :return: Tupla (lista de VODs, URL da próxima página ou None).
+        """
         try:
             logger.debug("Iniciando análise do HTML da página do canal.")
-            channel_soup = BeautifulSoup(
-                channel_page_html, "html.parser"
-            )  # Analisa o HTML da página do canal
-            vods = {}  # Dicionário para armazenar VODs únicos
-
-            # Encontrar todos os links que correspondem ao padrão .m3u8
-            m3u8_links = channel_soup.find_all(
-                "a",
-                href=re.compile(r"https://api\.vodvod\.top/m3u8/\d+/\d+/index\.m3u8"),
-            )
-            logger.debug(f"Encontrados {len(m3u8_links)} links de VOD.")
-
-            for link in m3u8_links:
-                href = link["href"]
-                title = (
-                    link.get_text(strip=True) or "Sem Título"
-                )  # Extrai o título do VOD ou define como 'Sem Título'
-                vods[href] = {
-                    "title": title,
-                    "link": href,
-                    "thumbnail": None,  # Atualize se as miniaturas puderem ser extraídas
-                }
-                logger.debug(f"Adicionado VOD: {title}, URL: {href}")
-
-            vod_list = list(vods.values())  # Converte o dicionário de VODs em uma lista
+            vod_list, next_url = extrair_pagina_canal(channel_page_html, channel_url)
             logger.info(f"Encontrados {len(vod_list)} VODs na página do canal.")
-            return vod_list
+            return vod_list, next_url
         except Exception as e:
             # Captura qualquer exceção durante a análise da página do canal
             logger.exception(f"Erro ao processar o conteúdo da página do canal: {e}")
-            return []
+            return [], None
+
+    def _registrar_caminho(self, streamer_name, paths, vod_count):
+        """
+        Registra qual caminho (índice local, HTTP e/ou navegador) atendeu a busca.
+
+        :param streamer_name: Nome do streamer pesquisado.
+        :param paths: Caminhos usados em cada etapa, na ordem.
+        :param vod_count: Quantidade de VODs retornados.
+        """
+        path = "+".join(dict.fromkeys(paths))
+        self.last_fetch_path = path
+        self.last_fetch_paths[streamer_name] = path
+        self.fetch_path_counts[path] = self.fetch_path_counts.get(path, 0) + 1
+        logger.info(
+            f"Busca por '{streamer_name}' atendida pelo caminho '{path}' ({vod_count} VODs)."
+        )
+
+    async def _get_http_session(self):
+        """
+        Retorna a sessão HTTP compartilhada, criando-a na primeira chamada.
+        """
+        if self.http_session is None or self.http_session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.http_limit_per_host, ttl_dns_cache=300
+            )
+            self.http_session = aiohttp.ClientSession(
+                connector=connector,
+                headers=HTTP_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+            )
+        return self.http_session
+
+    @async_timeit
+    async def _fetch_html(self, url, step):
+        """
+        Baixa o HTML estático de uma página usando a sessão HTTP compartilhada.
+
+        :param url: URL da página.
+        :param step: Política da etapa (novas tentativas, tempo limite, hedge).
+        :return: HTML da página ou None se todas as tentativas falharem.
+        :raises CircuitOpenError: Se o site estiver com o circuito aberto.
+        """
+        logger.debug(f"Baixando HTML estático: {url}")
+        try:
+            return await step.run(url, lambda: self._get_text(url))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Falha ao baixar HTML estático de '{url}': {e!r}")
+            return None
+
+    async def _get_text(self, url):
+        session = await self._get_http_session()
+        async with session.get(url) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def _goto(self, page, url):
+        with tracer.span("page.goto", url=url):
+            await page.goto(url)
+
+    async def _wait_for(self, page, selector):
+        """
+        Aguarda o seletor na página já carregada.
+
+        :return: False se ele não aparecer a tempo; a página carregou, então
+            isso é tratado como resultado vazio, e não como falha de rede.
+        """
+        with tracer.span("page.wait_for_selector"):
+            try:
+                await page.wait_for_selector(selector, timeout=BROWSER_SELECTOR_TIMEOUT)
+            except PlaywrightTimeoutError:
+                return False
+        return True
+
+    async def _require_browser(self):
+        """
+        :raises RuntimeError: Se o navegador não puder ser lançado.
+        """
+        if not await self.ensure_browser():
+            raise RuntimeError("Navegador Playwright indisponível.")
+
+    @async_timeit
+    async def _get_vods_browser(self, channel_url):
+        """
+        Extrai os VODs da página do canal carregada no navegador.
+
+        No modo "page" a extração roda dentro da página e só os registros
+        {title, link, thumbnail} atravessam para o Python.
+
+        :param channel_url: URL da página do canal.
+        :return: Tupla (lista de VODs, URL da próxima página ou None).
+        """
+        if self.extraction_mode == "html":
+            channel_page_html = await self._get_channel_page_html(channel_url)
+            if not channel_page_html:
+                return [], None
+            return self._extrair_pagina_canal(channel_page_html, channel_url)
+
+        result = await self._with_channel_page(
+            channel_url, lambda page: page.evaluate(CHANNEL_PAGE_JS)
+        )
+        if not result:
+            return [], None
+        vod_list = montar_vods(result["records"])
+        logger.info(f"Encontrados {len(vod_list)} VODs na página do canal.")
+        return vod_list, result["next"]
 
     @async_timeit
     async def _get_channel_page_html(self, channel_url):
@@ -183,31 +730,148 @@ class Scraper:
         Navega até a página do canal e retorna o HTML.
 
         :param channel_url: URL da página do canal.
-        :return: HTML da página do canal ou None em caso de falha.
+        :return: HTML da página do canal ou None se ela não tiver VODs.
         """
-        page = await self.browser.new_page()
-        try:
-            await page.goto(channel_url)  # Navega até a página do canal
+        return await self._with_channel_page(channel_url, self._page_html)
+
+    async def _page_html(self, page):
+        # Obter o HTML da página do canal
+        with tracer.span("page.content"):
+            channel_page_html = await page.content()
+        logger.debug("Obtido HTML da página do canal.")
+        return channel_page_html
+
+    async def _with_channel_page(self, channel_url, extract):
+        """
+        Navega até a página do canal, aguarda os VODs e aplica `extract(page)`.
+
+        Falhas de navegação são repetidas por browser_channel_step e, esgotadas
+        as tentativas, propagadas.
+
+        :param channel_url: URL da página do canal.
+        :param extract: Corrotina que recebe a página carregada.
+        :return: Resultado de `extract` ou None se a página não tiver VODs.
+        :raises CircuitOpenError: Se o site estiver com o circuito aberto.
+        """
+        await self._require_browser()
+        return await self.browser_channel_step.run(
+            channel_url, lambda: self._load_channel_page(channel_url, extract)
+        )
+
+    async def _load_channel_page(self, channel_url, extract):
+        async with self.page_pool.page() as page:
+            await self._goto(page, channel_url)  # Navega até a página do canal
             logger.debug("Página do canal carregada.")
 
             # Aguardar até que os VODs estejam presentes
-            await page.wait_for_selector("a[href*='.m3u8']", timeout=10000)
+            if not await self._wait_for(page, "a[href*='.m3u8']"):
+                logger.info("Página do canal carregada sem elementos de VOD.")
+                return None
             logger.debug("Elementos de VOD encontrados na página do canal.")
 
-            # Obter o HTML da página do canal
-            channel_page_html = await page.content()
-            logger.debug("Obtido HTML da página do canal.")
-            return channel_page_html
-        except PlaywrightTimeoutError:
-            # Trata o caso de tempo limite ao esperar pelos VODs
-            logger.warning(
-                "Tempo limite atingido ao aguardar os elementos de VOD na página do canal."
-            )
-            return None
-        except Exception as e:
-            # Captura qualquer outra exceção durante a navegação
-            logger.exception(f"Erro inesperado ao aguardar os elementos de VOD: {e}")
-            return None
-        finally:
-            await page.close()
-            logger.debug("Página do canal fechada.")
+            return await extract(page)
+
+
+def _load_streamer_names(path):
+    """
+    Lê um nome de streamer por linha, ignorando linhas vazias e comentários (#).
+    """
+    with open(path, encoding="utf-8") as f:
+        names = [line.strip() for line in f]
+    return list(dict.fromkeys(n for n in names if n and not n.startswith("#")))
+
+
+async def run_batch(names_file, output_path, concurrency, fetch_mode, use_cache):
+    """
+    Executa o scraping em lote e grava os resultados em JSON Lines.
+
+    :return: Número de streamers que falharam.
+    """
+    streamer_names = _load_streamer_names(names_file)
+    logger.info(
+        f"Scraping em lote de {len(streamer_names)} streamers com concorrência {concurrency}."
+    )
+    scraper = Scraper(
+        fetch_mode=fetch_mode,
+        use_cache=use_cache,
+        page_pool_size=concurrency,
+        http_limit_per_host=concurrency,
+    )
+    latencies = []
+    failures = 0
+    start_time = time.perf_counter()
+    try:
+        if os.path.dirname(output_path):
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, "w", encoding="utf-8") as output:
+            async for result in scraper.scrape_batch(streamer_names, concurrency):
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+                latencies.append(result["latency"])
+                if result["error"]:
+                    failures += 1
+                    logger.warning(
+                        f"Falha para '{result['streamer']}' em {result['latency']:.2f}s: {result['error']}"
+                    )
+                else:
+                    logger.info(
+                        f"'{result['streamer']}': {len(result['vods'])} VODs em {result['latency']:.2f}s via {result['path']}."
+                    )
+    finally:
+        await scraper.close()
+
+    elapsed = time.perf_counter() - start_time
+    if latencies:
+        latencies.sort()
+        logger.info(
+            f"Lote concluído em {elapsed:.2f}s: {len(latencies) - failures} sucessos, "
+            f"{failures} falhas, {len(latencies) / elapsed:.2f} streamers/s, "
+            f"latência p50 {latencies[len(latencies) // 2]:.2f}s, máxima {latencies[-1]:.2f}s. "
+            f"Resultados em: {output_path}"
+        )
+    return failures
+
+
+def main(argv=None):
+    """
+    Ponto de entrada do modo sem interface: python -m utils.scraper --batch nomes.txt
+    """
+    parser = argparse.ArgumentParser(
+        description="Scraping em lote de VODs do vodvod.top, sem interface gráfica."
+    )
+    parser.add_argument(
+        "--batch", required=True, help="Arquivo com um nome de streamer por linha."
+    )
+    parser.add_argument(
+        "--output",
+        default=os.path.join("data", "batch_results.jsonl"),
+        help="Arquivo JSON Lines de saída.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=BATCH_CONCURRENCY,
+        help="Número máximo de streamers processados ao mesmo tempo.",
+    )
+    parser.add_argument("--fetch-mode", choices=("http", "browser"), default=FETCH_MODE)
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Não grava os resultados no cache de buscas.",
+    )
+    args = parser.parse_args(argv)
+
+    failures = asyncio.run(
+        run_batch(
+            args.batch,
+            args.output,
+            max(1, args.concurrency),
+            args.fetch_mode,
+            not args.no_cache,
+        )
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# utils/segment_index.py
+
+import bisect
+import os
+from array import array
+
+from utils.logger import setup_logger
+from utils.performance_monitor import timeit_sync
+from utils.playlist import parse_media_playlist
+
+# Configuração do logger
+logger = setup_logger("SegmentIndex")
+
+INDEX_MAGIC = b"VODIDX1"
+INDEX_SUFFIX = ".idx"
+
+
+class SegmentIndex:
+    """
+    Linha do tempo compacta de uma playlist de mídia.
+
+    `offsets` é um array de doubles com o início acumulado de cada segmento
+    (mais a duração total no fim), então achar o segmento de um instante é
+    uma busca binária. O índice é salvo ao lado da playlist em cache para
+    que playlists de milhares de linhas não sejam reprocessadas a cada salto.
+    """
+
+    def __init__(self, offsets, uris):
+        self.offsets = offsets  # array("d"), len(uris) + 1 posições
+        self.uris = uris
+
+    @classmethod
+    def empty(cls):
+        return cls(array("d", [0.0]), [])
+
+    @classmethod
+    def from_playlist(cls, text, base_url):
+        offsets = array("d", [0.0])
+        uris = []
+        for segment in parse_media_playlist(text, base_url):
+            offsets.append(offsets[-1] + segment.duration)
+            uris.append(segment.uri)
+        return cls(offsets, uris)
+
+    @staticmethod
+    def path_for(playlist_path):
+        return os.path.splitext(playlist_path)[0] + INDEX_SUFFIX
+
+    @classmethod
+    @timeit_sync
+    def load_or_build(cls, playlist_path, base_url):
+        """
+        Lê o índice salvo ao lado da playlist ou o gera a partir dela.
+
+        O índice só é reaproveitado se for mais novo que a playlist, o que
+        cobre o caso de o cache ter baixado uma versão nova.
+
+        :param playlist_path: Caminho da playlist em cache.
+        :param base_url: URL da playlist, usada para resolver URIs relativas.
+        :return: SegmentIndex da playlist.
+        """
+        index_path = cls.path_for(playlist_path)
+        if os.path.exists(index_path) and os.path.getmtime(
+            index_path
+        ) >= os.path.getmtime(playlist_path):
+            try:
+                return cls.load(index_path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Índice de segmentos inválido; recriando: {e}")
+
+        with open(playlist_path, encoding="utf-8") as f:
+            index = cls.from_playlist(f.read(), base_url)
+        try:
+            index.save(index_path)
+        except OSError as e:
+            logger.warning(f"Não foi possível salvar o índice de segmentos: {e}")
+        return index
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        header, _, body = data.partition(b"\n")
+        magic, _, count = header.partition(b" ")
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"cabeçalho desconhecido em {path}")
+        count = int(count)
+        offsets_size = (count + 1) * array("d").itemsize
+        offsets = array("d")
+        offsets.frombytes(body[:offsets_size])
+        uris = body[offsets_size:].decode("utf-8").split("\n") if count else []
+        if len(uris) != count:
+            raise ValueError(f"índice truncado em {path}")
+        return cls(offsets, uris)
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(INDEX_MAGIC + f" {len(self.uris)}\n".encode("ascii"))
+            f.write(self.offsets.tobytes())
+            f.write("\n".join(self.uris).encode("utf-8"))
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return len(self.uris)
+
+    @property
+    def duration(self):
+        return self.offsets[-1]
+
+    def segment_at(self, seconds):
+        """
+        :param seconds: Instante da reprodução em segundos.
+        :return: Índice do segmento que contém o instante.
+        """
+        if not self.uris:
+            raise IndexError("playlist sem segmentos")
+        index = bisect.bisect_right(self.offsets, seconds) - 1
+        return min(max(index, 0), len(self.uris) - 1)
+
+    def start_of(self, index):
+        return self.offsets[index]
+
+    def uri(self, index):
+        return self.uris[index]
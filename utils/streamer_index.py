@@ -0,0 +1,139 @@
+# utils/streamer_index.py
+
+import bisect
+import os
+import sqlite3
+
+from utils.logger import setup_logger
+
+# Configuração do logger
+logger = setup_logger("StreamerIndex")
+
+INDEX_PATH = os.path.join("data", "streamer_index.sqlite3")
+
+
+class StreamerIndex:
+    """
+    Índice local de streamers e das URLs de canal resolvidas em buscas anteriores.
+
+    As chaves normalizadas ficam em uma lista ordenada, de modo que a busca por
+    prefixo é uma busca binária seguida da leitura dos vizinhos.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self._entries = {}  # chave normalizada -> {"name": ..., "channel_url": ...}
+        self._keys = []  # Chaves ordenadas para a busca por prefixo
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS streamers (
+                key TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                channel_url TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+        self._load()
+
+    @staticmethod
+    def _key(name):
+        return name.strip().lower()
+
+    def _load(self):
+        for key, name, channel_url in self.conn.execute(
+            "SELECT key, name, channel_url FROM streamers"
+        ):
+            self._entries[key] = {"name": name, "channel_url": channel_url}
+        self._keys = sorted(self._entries)
+        logger.debug(f"{len(self._keys)} streamers carregados do índice local.")
+
+    def lookup(self, name):
+        """
+        :param name: Nome do streamer.
+        :return: URL do canal já resolvida ou None.
+        """
+        entry = self._entries.get(self._key(name))
+        return entry["channel_url"] if entry else None
+
+    def add(self, name, channel_url):
+        """
+        Registra o canal de um streamer e o identificador do próprio canal (@nome).
+
+        :param name: Nome digitado na busca.
+        :param channel_url: URL do canal resolvida pela busca.
+        """
+        names = {self._key(name): name.strip()}
+        handle = channel_url.rstrip("/").rsplit("/@", 1)[-1]
+        if "/@" in channel_url and handle:
+            names.setdefault(self._key(handle), handle)
+
+        for key, display_name in names.items():
+            entry = {"name": display_name, "channel_url": channel_url}
+            if self._entries.get(key) == entry:
+                continue
+            if key not in self._entries:
+                bisect.insort(self._keys, key)
+            self._entries[key] = entry
+            self.conn.execute(
+                "INSERT OR REPLACE INTO streamers (key, name, channel_url) VALUES (?, ?, ?)",
+                (key, display_name, channel_url),
+            )
+        self.conn.commit()
+
+    def remove(self, name):
+        key = self._key(name)
+        if self._entries.pop(key, None) is not None:
+            del self._keys[bisect.bisect_left(self._keys, key)]
+            self.conn.execute("DELETE FROM streamers WHERE key = ?", (key,))
+            self.conn.commit()
+
+    def remove_channel(self, channel_url):
+        """
+        Remove todas as entradas (nome buscado e @identificador) de um canal.
+
+        :return: Número de entradas removidas.
+        """
+        keys = [
+            key
+            for key, entry in self._entries.items()
+            if entry["channel_url"] == channel_url
+        ]
+        for key in keys:
+            del self._entries[key]
+            del self._keys[bisect.bisect_left(self._keys, key)]
+        if keys:
+            self.conn.execute(
+                "DELETE FROM streamers WHERE channel_url = ?", (channel_url,)
+            )
+            self.conn.commit()
+        return len(keys)
+
+    def complete(self, prefix, limit=10):
+        """
+        Retorna os nomes que começam com o prefixo, em ordem alfabética.
+
+        :param prefix: Texto digitado até o momento.
+        :param limit: Número máximo de sugestões.
+        :return: Lista de nomes de streamers.
+        """
+        key = self._key(prefix)
+        if not key:
+            return []
+        results = []
+        start = bisect.bisect_left(self._keys, key)
+        for candidate in self._keys[start : start + limit]:
+            if not candidate.startswith(key):
+                break
+            results.append(self._entries[candidate]["name"])
+        return results
+
+    def __len__(self):
+        return len(self._keys)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,109 @@
+# utils/task_coordinator.py
+
+import asyncio
+import functools
+
+from utils.logger import setup_logger
+from utils.metrics import REGISTRY
+
+# Configuração do logger
+logger = setup_logger("TaskCoordinator")
+
+
+class TaskCoordinator:
+    """
+    Mantém no máximo uma tarefa em andamento por "vaga" (ex.: "search", "play").
+
+    Um pedido com a mesma chave da tarefa em andamento na vaga se junta a ela
+    em vez de criar outra; um pedido com chave diferente cancela a anterior,
+    que deixa de poder aplicar seu resultado. O cancelamento chega à
+    corrotina como CancelledError, então os `async with` dela (páginas do
+    Playwright, respostas HTTP) liberam os recursos normalmente.
+    """
+
+    def __init__(self, registry=REGISTRY):
+        self._slots = {}  # vaga -> (chave, tarefa)
+        self._started = registry.counter(
+            "tasks_started_total", "Tarefas iniciadas por vaga.", ("slot",)
+        )
+        self._joined = registry.counter(
+            "tasks_joined_total",
+            "Pedidos atendidos por uma tarefa idêntica já em andamento.",
+            ("slot",),
+        )
+        self._superseded = registry.counter(
+            "tasks_superseded_total",
+            "Tarefas canceladas por um pedido mais recente.",
+            ("slot",),
+        )
+
+    def submit(self, slot, key, factory):
+        """
+        Inicia `factory()` na vaga, a menos que a mesma chave já esteja em andamento.
+
+        :param slot: Nome da vaga.
+        :param key: Identifica pedidos equivalentes (ex.: nome do streamer).
+        :param factory: Função sem argumentos que retorna a corrotina; só é
+            chamada quando uma tarefa nova é de fato criada.
+        :return: A tarefa em andamento para o pedido.
+        """
+        current = self.get(slot)
+        if current is not None:
+            current_key, task = self._slots[slot]
+            if current_key == key:
+                self._joined.inc(slot=slot)
+                logger.debug(
+                    "Pedido '%s' %r já em andamento; reaproveitado.", slot, key
+                )
+                return task
+            task.cancel()
+            self._superseded.inc(slot=slot)
+            logger.debug(
+                "Tarefa '%s' %r cancelada; substituída por %r.", slot, current_key, key
+            )
+        task = asyncio.create_task(factory())
+        self._slots[slot] = (key, task)
+        task.add_done_callback(functools.partial(self._discard, slot))
+        self._started.inc(slot=slot)
+        return task
+
+    def get(self, slot, key=None):
+        """
+        :param key: Se informada, só retorna a tarefa se for desta chave.
+        :return: Tarefa em andamento na vaga, ou None.
+        """
+        entry = self._slots.get(slot)
+        if entry is None or entry[1].done():
+            return None
+        if key is not None and entry[0] != key:
+            return None
+        return entry[1]
+
+    def is_current(self, slot, task=None):
+        """
+        Indica se `task` (por padrão a tarefa atual) ainda é a mais recente da vaga.
+        """
+        if task is None:
+            task = asyncio.current_task()
+        entry = self._slots.get(slot)
+        return entry is not None and entry[1] is task
+
+    def cancel(self, slot):
+        entry = self._slots.pop(slot, None)
+        if entry is not None:
+            entry[1].cancel()
+
+    async def cancel_all(self):
+        """
+        Cancela todas as tarefas e aguarda o seu encerramento.
+        """
+        tasks = [task for _, task in self._slots.values()]
+        self._slots.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _discard(self, slot, task):
+        entry = self._slots.get(slot)
+        if entry is not None and entry[1] is task:
+            del self._slots[slot]
@@ -0,0 +1,89 @@
+# utils/thumbnail_cache.py
+
+import contextlib
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from utils.logger import setup_logger
+
+# Configuração do logger
+logger = setup_logger("ThumbnailCache")
+
+THUMBNAIL_CACHE_DIR = os.path.join("data", "cache", "thumbnails")
+THUMBNAIL_DISK_BYTES = int(
+    os.getenv("THUMBNAIL_DISK_CACHE_BYTES", str(50 * 1024 * 1024))
+)
+
+
+class ThumbnailCache:
+    """
+    Cache em disco das miniaturas já redimensionadas, com remoção LRU por tamanho.
+
+    Cada arquivo é nomeado pelo hash da URL de origem; a ordem de uso é a
+    data de modificação, atualizada a cada leitura, então o cache não
+    precisa de um índice próprio. Os métodos podem ser chamados de threads
+    de trabalho.
+    """
+
+    def __init__(self, cache_dir=THUMBNAIL_CACHE_DIR, max_bytes=THUMBNAIL_DISK_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._entries = (
+            OrderedDict()
+        )  # nome do arquivo -> tamanho, do menos ao mais usado
+        self._size = 0
+        files = [
+            entry for entry in os.scandir(cache_dir) if entry.name.endswith(".png")
+        ]
+        for entry in sorted(files, key=lambda e: e.stat().st_mtime):
+            self._entries[entry.name] = entry.stat().st_size
+            self._size += entry.stat().st_size
+
+    @staticmethod
+    def _filename(url):
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32] + ".png"
+
+    def get(self, url):
+        """
+        :param url: URL de origem da miniatura.
+        :return: Bytes PNG da miniatura redimensionada ou None.
+        """
+        name = self._filename(url)
+        with self._lock:
+            if name not in self._entries:
+                self.stats["misses"] += 1
+                return None
+            path = os.path.join(self.cache_dir, name)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path)
+            except OSError:
+                self._size -= self._entries.pop(name)
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(name)
+            self.stats["hits"] += 1
+            return data
+
+    def put(self, url, data):
+        name = self._filename(url)
+        path = os.path.join(self.cache_dir, name)
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._size += len(data) - self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                old_name, old_size = self._entries.popitem(last=False)
+                self._size -= old_size
+                self.stats["evictions"] += 1
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.cache_dir, old_name))
@@ -0,0 +1,284 @@
+# utils/tracing.py
+
+import asyncio
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+# Este módulo não usa utils.logger: o logger importa current_trace_id daqui
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "1") == "1"
+# Spans concluídos mantidos em memória (os mais antigos são descartados)
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "20000"))
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", os.path.join("logs", "trace.json"))
+# Nomes de trilhas guardados para a exportação (as mais antigas são descartadas)
+TRACE_MAX_TRACKS = 2000
+
+# Span ativo na tarefa (ou thread) atual; copiado para as tarefas criadas nela
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    Intervalo medido dentro de um trace. Instantes em microssegundos.
+    """
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start",
+        "end",
+        "track",
+        "attrs",
+    )
+
+    def __init__(self, name, trace_id, span_id, parent_id, track, attrs):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.track = track
+        self.attrs = attrs
+        self.start = time.perf_counter_ns() // 1000
+        self.end = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+def current_trace_id():
+    """
+    :return: ID do trace da ação em andamento nesta tarefa, ou None.
+    """
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+
+class Tracer:
+    """
+    Coleta spans de cada ação do usuário (busca, reprodução) seguindo as
+    tarefas asyncio por contextvars.
+
+    trace() abre a raiz de uma ação com um ID novo; span() abre um filho do
+    span atual e não faz nada fora de um trace. Cada tarefa asyncio e cada
+    thread de trabalho vira uma trilha própria na exportação, onde os spans
+    sempre se aninham corretamente.
+    """
+
+    def __init__(self, max_spans=TRACE_MAX_SPANS, enabled=TRACING_ENABLED):
+        self.enabled = enabled
+        self.spans = deque(maxlen=max_spans)
+        self.instants = deque(maxlen=max_spans)
+        # (thread, id da tarefa) -> número da trilha, só enquanto a tarefa existe:
+        # ids de tarefas encerradas são reaproveitados pelo Python
+        self._tracks = {}
+        self._track_names = OrderedDict()  # número da trilha -> nome
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self._next_track = 0
+
+    def _new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def _track(self):
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = (threading.get_ident(), id(task) if task is not None else 0)
+        track = self._tracks.get(key)
+        if track is None:
+            name = (
+                task.get_name() if task is not None else threading.current_thread().name
+            )
+            with self._lock:
+                self._next_track += 1
+                track = self._tracks[key] = self._next_track
+                self._track_names[track] = name
+                while len(self._track_names) > TRACE_MAX_TRACKS:
+                    self._track_names.popitem(last=False)
+            if task is not None:
+                task.add_done_callback(lambda _: self._forget_track(key, track))
+        return track
+
+    def _forget_track(self, key, track):
+        with self._lock:
+            if self._tracks.get(key) == track:
+                del self._tracks[key]
+
+    @contextlib.contextmanager
+    def _open(self, name, trace_id, parent_id, attrs):
+        span = Span(name, trace_id, self._new_id(), parent_id, self._track(), attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.attrs["cancelled"] = True
+            raise
+        except Exception as e:
+            span.attrs["error"] = repr(e)
+            raise
+        finally:
+            span.end = time.perf_counter_ns() // 1000
+            _current_span.reset(token)
+            self.spans.append(span)
+
+    @contextlib.contextmanager
+    def trace(self, name, **attrs):
+        """
+        Abre a raiz de uma nova ação, com um ID de trace próprio.
+        """
+        if not self.enabled:
+            yield None
+            return
+        with self._open(name, os.urandom(4).hex(), None, attrs) as span:
+            yield span
+
+    @contextlib.contextmanager
+    def span(self, name, **attrs):
+        """
+        Abre um span filho do atual; fora de um trace não registra nada.
+        """
+        parent = _current_span.get()
+        if parent is None or not self.enabled:
+            yield None
+            return
+        with self._open(name, parent.trace_id, parent.span_id, attrs) as span:
+            yield span
+
+    @contextlib.contextmanager
+    def detached(self):
+        """
+        Executa o bloco fora de qualquer trace. Serviços de longa duração
+        (ex.: um servidor iniciado durante uma ação) herdariam o trace atual
+        em todas as tarefas que criarem depois.
+        """
+        token = _current_span.set(None)
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+
+    def instant(self, name, trace_id, **attrs):
+        """
+        Registra um evento pontual (ex.: mudança de estado do player) em um
+        trace já encerrado ou conduzido por callbacks fora das tarefas.
+        """
+        if trace_id is None or not self.enabled:
+            return
+        attrs["trace_id"] = trace_id
+        self.instants.append((name, time.perf_counter_ns() // 1000, attrs))
+
+    def trace_ids(self):
+        """
+        :return: IDs dos traces com raiz registrada, do mais antigo ao mais recente.
+        """
+        return [span.trace_id for span in list(self.spans) if span.parent_id is None]
+
+    def chrome_events(self, trace_id=None):
+        """
+        Converte os spans para o formato Trace Event do Chrome (aceito pelo
+        Perfetto e por chrome://tracing).
+
+        :param trace_id: Se informado, exporta só esse trace.
+        """
+        pid = os.getpid()
+        events = []
+        used_tracks = set()
+        for span in list(self.spans):
+            if trace_id is not None and span.trace_id != trace_id:
+                continue
+            used_tracks.add(span.track)
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": "vodplayer",
+                    "ph": "X",
+                    "ts": span.start,
+                    "dur": span.end - span.start,
+                    "pid": pid,
+                    "tid": span.track,
+                    "args": {
+                        "trace_id": span.trace_id,
+                        "span_id": span.span_id,
+                        "parent_id": span.parent_id,
+                        **{key: str(value) for key, value in span.attrs.items()},
+                    },
+                }
+            )
+        for name, instant, attrs in list(self.instants):
+            if trace_id is not None and attrs["trace_id"] != trace_id:
+                continue
+            events.append(
+                {
+                    "name": name,
+                    "cat": "vodplayer",
+                    "ph": "i",
+                    "s": "p",
+                    "ts": instant,
+                    "pid": pid,
+                    "tid": 0,
+                    "args": {key: str(value) for key, value in attrs.items()},
+                }
+            )
+        if any(event["ph"] == "i" for event in events):
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": 0,
+                    "args": {"name": "eventos"},
+                }
+            )
+        with self._lock:
+            track_names = list(self._track_names.items())
+        for track, name in track_names:
+            if track in used_tracks:
+                events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": track,
+                        "args": {"name": name},
+                    }
+                )
+        return events
+
+    def export(self, path=TRACE_EXPORT_PATH, trace_id=None):
+        """
+        Grava os spans em JSON (Trace Event) para abrir no Perfetto/chrome://tracing.
+
+        :return: Caminho do arquivo gravado.
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        data = {"traceEvents": self.chrome_events(trace_id), "displayTimeUnit": "ms"}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+
+# Tracer da aplicação
+tracer = Tracer()
+
+
+async def run_traced(name, coro, **attrs):
+    """
+    Executa a corrotina como a raiz de um novo trace.
+
+    Útil ao iniciar uma ação com asyncio.create_task a partir de um handler
+    da interface: create_task(run_traced("search", self.perform_scrape(...))).
+    """
+    with tracer.trace(name, **attrs):
+        return await coro
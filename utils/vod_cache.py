@@ -0,0 +1,138 @@
+# utils/vod_cache.py
+
+import json
+import os
+import sqlite3
+import time
+
+from utils.logger import setup_logger
+
+# Configuração do logger
+logger = setup_logger("VODCache")
+
+CACHE_DB_PATH = os.path.join("data", "cache", "vod_cache.sqlite3")
+# Até FRESH_TTL o resultado é servido sem atualização; até STALE_TTL ele é
+# servido imediatamente e atualizado em segundo plano; depois disso expira
+FRESH_TTL = float(os.getenv("VOD_CACHE_FRESH_TTL", "300"))
+STALE_TTL = float(os.getenv("VOD_CACHE_STALE_TTL", str(7 * 24 * 3600)))
+MAX_ENTRIES = int(os.getenv("VOD_CACHE_MAX_ENTRIES", "500"))
+
+
+class VODCache:
+    """
+    Cache persistente (SQLite) das listas de VODs, indexado pelo nome do streamer.
+    """
+
+    def __init__(
+        self,
+        db_path=CACHE_DB_PATH,
+        fresh_ttl=FRESH_TTL,
+        stale_ttl=STALE_TTL,
+        max_entries=MAX_ENTRIES,
+    ):
+        self.db_path = db_path
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0}
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS vod_cache (
+                streamer TEXT PRIMARY KEY,
+                vods TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+        logger.debug(f"Cache de VODs aberto em: {db_path}")
+
+    @staticmethod
+    def _key(streamer_name):
+        return streamer_name.strip().lower()
+
+    def get(self, streamer_name):
+        """
+        Busca a lista de VODs em cache para um streamer.
+
+        :param streamer_name: Nome do streamer.
+        :return: Tupla (vods, is_stale) ou None se não houver entrada válida.
+        """
+        key = self._key(streamer_name)
+        row = self.conn.execute(
+            "SELECT vods, fetched_at FROM vod_cache WHERE streamer = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is None or now - row[1] > self.stale_ttl:
+            self.stats["misses"] += 1
+            logger.debug(f"Cache miss para o streamer '{streamer_name}'.")
+            return None
+
+        self.conn.execute(
+            "UPDATE vod_cache SET accessed_at = ? WHERE streamer = ?", (now, key)
+        )
+        self.conn.commit()
+        is_stale = now - row[1] > self.fresh_ttl
+        self.stats["stale_hits" if is_stale else "hits"] += 1
+        logger.debug(
+            f"Cache hit para o streamer '{streamer_name}' "
+            f"(idade {now - row[1]:.0f}s, {'desatualizado' if is_stale else 'recente'})."
+        )
+        return json.loads(row[0]), is_stale
+
+    def put(self, streamer_name, vods):
+        """
+        Armazena a lista de VODs de um streamer com o horário da busca.
+
+        :param streamer_name: Nome do streamer.
+        :param vods: Lista de dicionários retornada por realizar_scraping.
+        """
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO vod_cache (streamer, vods, fetched_at, accessed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (self._key(streamer_name), json.dumps(vods), now, now),
+        )
+        self._evict()
+        self.conn.commit()
+
+    def merge(self, streamer_name, vods, cached_vods):
+        """
+        Mescla uma lista recém-obtida com a lista em cache e a armazena.
+
+        Os VODs novos mantêm a ordem da busca; VODs presentes apenas no cache
+        são mantidos no final.
+
+        :param streamer_name: Nome do streamer.
+        :param vods: Lista recém-obtida pelo scraping.
+        :param cached_vods: Lista servida a partir do cache.
+        :return: Lista mesclada.
+        """
+        merged = {vod["link"]: vod for vod in vods}
+        for vod in cached_vods:
+            merged.setdefault(vod["link"], vod)
+        merged_list = list(merged.values())
+        self.put(streamer_name, merged_list)
+        return merged_list
+
+    def _evict(self):
+        """
+        Remove as entradas acessadas há mais tempo além de max_entries.
+        """
+        cursor = self.conn.execute(
+            "DELETE FROM vod_cache WHERE streamer IN ("
+            "SELECT streamer FROM vod_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        if cursor.rowcount > 0:
+            self.stats["evictions"] += cursor.rowcount
+            logger.debug(f"{cursor.rowcount} entradas removidas do cache de VODs.")
+
+    def close(self):
+        self.conn.close()
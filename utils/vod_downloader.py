@@ -0,0 +1,275 @@
+# utils/vod_downloader.py
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+from utils.logger import setup_logger
+from utils.playlist import (
+    is_master_playlist,
+    parse_master_playlist,
+    parse_media_playlist,
+)
+
+# Configuração do logger
+logger = setup_logger("VODDownloader")
+
+DOWNLOAD_CONCURRENCY = int(os.getenv("VOD_DOWNLOAD_CONCURRENCY", "6"))
+DOWNLOAD_DIR = os.getenv("VOD_DOWNLOAD_DIR", os.path.join("data", "downloads"))
+PLAYLIST_CACHE_DIR = os.path.join("data", "cache", "m3u8_files")
+COPY_BUFFER_BYTES = 1024 * 1024
+
+
+def output_path_for(title, vod_url, download_dir=DOWNLOAD_DIR):
+    """
+    Monta o caminho do arquivo final a partir do título do VOD.
+
+    Um hash curto da URL entra no nome: VODs com o mesmo título (ex.: "Sem
+    Título") não podem dividir o mesmo `.part` e o mesmo diário.
+    """
+    name = re.sub(r'[\\/:*?"<>|\s]+', "_", title).strip("._") or "vod"
+    digest = hashlib.sha256(vod_url.encode("utf-8")).hexdigest()[:8]
+    return os.path.join(download_dir, f"{name[:120]}_{digest}.ts")
+
+
+class VODDownload:
+    """
+    Download completo de um VOD para um único arquivo local.
+
+    Os segmentos são baixados em paralelo para arquivos temporários em
+    `<saida>.parts/` e concatenados em ordem em `<saida>.part` por streaming,
+    sem passar inteiros pela memória. Um diário (`<saida>.journal`) registra
+    os segmentos baixados ("D índice tamanho") e concatenados ("J índice
+    offset"), de modo que um download interrompido continua de onde parou.
+    """
+
+    def __init__(
+        self,
+        downloader,
+        playlist_url,
+        output_path,
+        concurrency=DOWNLOAD_CONCURRENCY,
+        on_progress=None,
+    ):
+        self.downloader = downloader
+        self.playlist_url = playlist_url
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.on_progress = on_progress
+        self.partial_path = f"{output_path}.part"
+        self.journal_path = f"{output_path}.journal"
+        self.parts_dir = f"{output_path}.parts"
+        self.segments = []
+        self.stats = {"downloaded": 0, "resumed": 0, "bytes": 0}
+        self._ready = {}  # índice -> tamanho dos segmentos baixados e ainda não concatenados
+        self._ready_event = asyncio.Event()
+        self._next_to_join = 0
+        self._offset = 0
+        self._journal = None
+        self._started_at = None
+
+    async def run(self):
+        """
+        Executa (ou retoma) o download.
+
+        :return: Caminho do arquivo final.
+        """
+        self.segments = await self._load_segments()
+        if not self.segments:
+            raise ValueError(f"Playlist sem segmentos: {self.playlist_url}")
+
+        os.makedirs(self.parts_dir, exist_ok=True)
+        pending = self._resume()
+        self._started_at = time.perf_counter()
+        self._report_progress()
+
+        queue = asyncio.Queue()
+        for index in pending:
+            queue.put_nowait(index)
+        tasks = [
+            asyncio.create_task(self._worker(queue))
+            for _ in range(min(self.concurrency, len(pending)))
+        ]
+        tasks.append(asyncio.create_task(self._joiner()))
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # O diário é mantido para que o download possa ser retomado
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            self._journal.close()
+
+        os.replace(self.partial_path, self.output_path)
+        os.remove(self.journal_path)
+        shutil.rmtree(self.parts_dir, ignore_errors=True)
+        logger.info(
+            f"VOD salvo em {self.output_path} ({self._offset} bytes, "
+            f"{len(self.segments)} segmentos). Estatísticas: {self.stats}"
+        )
+        return self.output_path
+
+    async def _load_segments(self):
+        """
+        Baixa a playlist e retorna os segmentos. Em master playlists, usa a
+        variante de maior banda.
+        """
+        playlist_path = await self.downloader.download_m3u8(
+            self.playlist_url, PLAYLIST_CACHE_DIR
+        )
+        with open(playlist_path, encoding="utf-8") as f:
+            text = f.read()
+        media_url = self.playlist_url
+        if is_master_playlist(text):
+            variant = max(
+                parse_master_playlist(text, self.playlist_url),
+                key=lambda v: v.bandwidth,
+            )
+            logger.info(
+                f"Master playlist; baixando a variante {variant.resolution} "
+                f"({variant.bandwidth} bit/s)."
+            )
+            media_url = variant.uri
+            playlist_path = await self.downloader.download_m3u8(
+                media_url, PLAYLIST_CACHE_DIR
+            )
+            with open(playlist_path, encoding="utf-8") as f:
+                text = f.read()
+        if "#EXT-X-KEY:METHOD=AES" in text:
+            logger.warning(
+                "Playlist com segmentos criptografados; o arquivo salvo não será reproduzível."
+            )
+        return parse_media_playlist(text, media_url)
+
+    def _resume(self):
+        """
+        Lê o diário de um download anterior, descarta o que não pode ser
+        aproveitado e abre o diário para escrita.
+
+        :return: Índices dos segmentos que ainda precisam ser baixados.
+        """
+        header = {"playlist_url": self.playlist_url, "segments": len(self.segments)}
+        joined = -1
+        downloaded = {}
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            try:
+                if json.loads(lines[0]) != header:
+                    raise ValueError("diário de outra playlist")
+                for line in lines[1:]:
+                    kind, index, value = line.split()
+                    if kind == "J":
+                        joined, self._offset = int(index), int(value)
+                    elif kind == "D":
+                        downloaded[int(index)] = int(value)
+            except (IndexError, ValueError) as e:
+                # Linha final incompleta ou diário inválido: recomeça do zero
+                logger.warning(f"Diário de download descartado ({e}).")
+                joined, self._offset, downloaded = -1, 0, {}
+
+        if not os.path.exists(self.partial_path) or (
+            os.path.getsize(self.partial_path) < self._offset
+        ):
+            joined, self._offset = -1, 0
+        # Descarta o que foi escrito depois da última concatenação registrada
+        with open(self.partial_path, "ab") as f:
+            f.truncate(self._offset)
+
+        self._next_to_join = joined + 1
+        for index, size in downloaded.items():
+            part_path = self._part_path(index)
+            if (
+                index >= self._next_to_join
+                and os.path.exists(part_path)
+                and os.path.getsize(part_path) == size
+            ):
+                self._ready[index] = size
+        self.stats["resumed"] = self._next_to_join + len(self._ready)
+        if self.stats["resumed"]:
+            logger.info(
+                f"Retomando download: {self.stats['resumed']}/{len(self.segments)} "
+                "segmentos já estavam prontos."
+            )
+
+        # Reescreve o diário só com o estado aproveitado
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+        self._journal.write(json.dumps(header) + "\n")
+        if joined >= 0:
+            self._journal.write(f"J {joined} {self._offset}\n")
+        for index, size in sorted(self._ready.items()):
+            self._journal.write(f"D {index} {size}\n")
+        self._journal.flush()
+
+        return [
+            index
+            for index in range(self._next_to_join, len(self.segments))
+            if index not in self._ready
+        ]
+
+    def _part_path(self, index):
+        return os.path.join(self.parts_dir, f"{index:06d}.ts")
+
+    def _record(self, line):
+        self._journal.write(line + "\n")
+        self._journal.flush()
+
+    async def _worker(self, queue):
+        while not queue.empty():
+            index = queue.get_nowait()
+            size = await self._download_segment(index)
+            self._record(f"D {index} {size}")
+            self._ready[index] = size
+            self.stats["downloaded"] += 1
+            self.stats["bytes"] += size
+            self._ready_event.set()
+            self._report_progress()
+
+    async def _download_segment(self, index):
+        # Novas tentativas vêm de segment_file_step; o tempo limite é por leitura
+        uri = self.segments[index].uri
+        try:
+            return await self.downloader.fetch_segment_to_file(
+                uri, self._part_path(index)
+            )
+        except Exception as e:
+            logger.error("Segmento %d falhou: %r", index, e)
+            raise
+
+    async def _joiner(self):
+        """
+        Concatena os segmentos na ordem da playlist assim que ficam prontos.
+        """
+        with open(self.partial_path, "ab") as output:
+            while self._next_to_join < len(self.segments):
+                if self._next_to_join not in self._ready:
+                    self._ready_event.clear()
+                    await self._ready_event.wait()
+                    continue
+                index = self._next_to_join
+                part_path = self._part_path(index)
+                await asyncio.to_thread(self._append, output, part_path)
+                self._offset += self._ready.pop(index)
+                self._record(f"J {index} {self._offset}")
+                os.remove(part_path)
+                self._next_to_join += 1
+
+    @staticmethod
+    def _append(output, part_path):
+        with open(part_path, "rb") as part:
+            shutil.copyfileobj(part, output, COPY_BUFFER_BYTES)
+        output.flush()
+
+    def _report_progress(self):
+        if self.on_progress is None:
+            return
+        elapsed = time.perf_counter() - self._started_at
+        throughput = self.stats["bytes"] / elapsed if elapsed > 0 else 0.0
+        done = self.stats["resumed"] + self.stats["downloaded"]
+        self.on_progress(done, len(self.segments), self.stats["bytes"], throughput)
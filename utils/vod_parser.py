@@ -0,0 +1,150 @@
+# utils/vod_parser.py
+
+import os
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+# Endereços do site e da API; os benchmarks os apontam para um servidor local
+BASE_URL = os.getenv("VODVOD_BASE_URL", "https://vodvod.top").rstrip("/")
+API_URL = os.getenv("VODVOD_API_URL", "https://api.vodvod.top").rstrip("/")
+M3U8_LINK_PATTERN = re.compile(re.escape(API_URL) + r"/m3u8/\d+/\d+/index\.m3u8")
+CHANNEL_LINK_MARKER = "/channels/@"
+
+# Executado dentro da página pelo Playwright: devolve apenas os campos usados
+# e o link da próxima página, se o canal for paginado
+CHANNEL_PAGE_JS = """
+() => ({
+    records: Array.from(document.querySelectorAll("a[href*='.m3u8']"), (a) => {
+        const img = a.querySelector("img");
+        return {
+            title: (a.textContent || "").replace(/\\s+/g, " ").trim(),
+            link: a.href,
+            thumbnail: img ? img.dataset.src || img.currentSrc || img.src : null,
+        };
+    }),
+    next: (document.querySelector("a[rel~='next'], link[rel~='next']") || {}).href || null,
+})
+"""
+
+
+class _StopParsing(Exception):
+    pass
+
+
+class _AnchorCollector(HTMLParser):
+    """
+    Coleta os links <a> (href, texto e primeira imagem) sem montar uma árvore DOM.
+
+    :param href_filter: Função que decide quais hrefs coletar.
+    :param stop_after_first: Interrompe a análise no primeiro link coletado.
+    """
+
+    def __init__(self, href_filter, stop_after_first=False):
+        super().__init__()
+        self.href_filter = href_filter
+        self.stop_after_first = stop_after_first
+        self.anchors = []
+        self.next_href = None  # Link rel="next" da paginação, se houver
+        self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("a", "link"):
+            attrs = dict(attrs)
+            href = attrs.get("href")
+            if href and "next" in (attrs.get("rel") or "").split():
+                self.next_href = self.next_href or href
+            if tag == "a" and href and self.href_filter(href):
+                self._current = {"href": href, "text": [], "img": None}
+        elif tag == "img" and self._current is not None and not self._current["img"]:
+            attrs = dict(attrs)
+            # Imagens com lazy loading guardam a URL real em data-src
+            self._current["img"] = attrs.get("data-src") or attrs.get("src")
+
+    def handle_data(self, data):
+        if self._current is not None:
+            self._current["text"].append(data.strip())
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._current is not None:
+            self.anchors.append(self._current)
+            self._current = None
+            if self.stop_after_first:
+                raise _StopParsing
+
+
+def _collect(html, href_filter, stop_after_first=False):
+    collector = _AnchorCollector(href_filter, stop_after_first)
+    try:
+        collector.feed(html)
+        collector.close()
+    except _StopParsing:
+        pass
+    return collector
+
+
+def extrair_link_canal(html):
+    """
+    Extrai o primeiro link de canal do HTML da página de pesquisa.
+
+    :param html: HTML da página de pesquisa.
+    :return: URL absoluta do canal ou None se não houver link.
+    """
+    anchors = _collect(
+        html, lambda href: CHANNEL_LINK_MARKER in href, stop_after_first=True
+    ).anchors
+    return urljoin(BASE_URL, anchors[0]["href"]) if anchors else None
+
+
+def extrair_vods(html):
+    """
+    Extrai os VODs do HTML da página do canal.
+
+    :param html: HTML da página do canal.
+    :return: Lista de dicionários com 'title', 'link' e 'thumbnail', sem duplicatas.
+    """
+    return extrair_pagina_canal(html)[0]
+
+
+def extrair_pagina_canal(html, page_url=BASE_URL):
+    """
+    Extrai os VODs e o link da próxima página do HTML de uma página do canal.
+
+    :param html: HTML da página do canal.
+    :param page_url: URL da página, usada para resolver links relativos.
+    :return: Tupla (lista de VODs, URL absoluta da próxima página ou None).
+    """
+    collector = _collect(html, M3U8_LINK_PATTERN.search)
+    vods = montar_vods(
+        {
+            "title": "".join(anchor["text"]),
+            "link": anchor["href"],
+            "thumbnail": urljoin(page_url, anchor["img"]) if anchor["img"] else None,
+        }
+        for anchor in collector.anchors
+    )
+    next_url = urljoin(page_url, collector.next_href) if collector.next_href else None
+    return vods, next_url
+
+
+def montar_vods(records):
+    """
+    Normaliza registros {title, link, thumbnail} vindos de qualquer extrator.
+
+    :param records: Registros na ordem da página.
+    :return: Lista de VODs únicos por link que correspondem ao padrão .m3u8.
+    """
+    vods = {}  # Dicionário para armazenar VODs únicos
+    for record in records:
+        link = record.get("link")
+        if not link or not M3U8_LINK_PATTERN.search(link):
+            continue
+        thumbnail = record.get("thumbnail") or None
+        if thumbnail and thumbnail.startswith("data:"):
+            thumbnail = None  # Placeholder embutido, não uma miniatura real
+        vods[link] = {
+            "title": record.get("title") or "Sem Título",
+            "link": link,
+            "thumbnail": thumbnail,
+        }
+    return list(vods.values())